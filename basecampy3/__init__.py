@@ -1,2 +1,20 @@
-from .bc3_api import Basecamp3
+import sys as _sys
+
 from .log import logger
+
+if _sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """
+        Import `Basecamp3` (and with it `requests` and every endpoint) the first time it is used rather than when the
+        package is, so that `import basecampy3.constants` and `bc3 version` start quickly.
+        """
+        if name == "Basecamp3":
+            from .bc3_api import Basecamp3
+            globals()["Basecamp3"] = Basecamp3
+            return Basecamp3
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | {"Basecamp3"})
+else:  # no module __getattr__ before Python 3.7 (PEP 562)
+    from .bc3_api import Basecamp3
@@ -4,12 +4,12 @@ The Basecamp3 class should be the only thing you need to import to access just a
 import logging
 import os
 from datetime import datetime
-import dateutil.parser
-import pytz
 import requests
+from .dock_index import DockIndex
+from .identity_map import IdentityMap
 from .transport_adapter import Basecamp3TransportAdapter
 
-from . import config, constants, endpoints, exc, urls
+from . import config, constants, endpoints, exc, json_decoding, pagination, tracing, urls
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +22,9 @@ def _create_session():
 
 class Basecamp3(object):
     def __init__(self, client_id=None, client_secret=None, redirect_uri=None, access_token=None, refresh_token=None,
-                 account_id=None, conf=None, api_url=constants.API_URL):
+                 account_id=None, conf=None, api_url=constants.API_URL, oauth_url=constants.OAUTH_URL,
+                 metrics=None, tracer=None, cache_backend=None, freshness=None, retry=None, json_decoder=None,
+                 stream_pages=False, identity_map=False, relation_ttl=60):
         """
         Create a new Basecamp 3 API connection. The following combinations of parameters are valid:
 
@@ -66,6 +68,40 @@ class Basecamp3(object):
         :param conf: a BasecampConfig object with all the settings we need so that we don't have to fill out all
                          these parameters
         :type conf: basecampy3.config.BasecampConfig
+        :param api_url: the root of the Basecamp 3 API. Only needs changing to talk to something other than Basecamp,
+                        like the fake server used by the benchmarks in `tests.benchmark`.
+        :type api_url: str
+        :param oauth_url: the root of the Launchpad OAuth2 server, for the same reason as `api_url`
+        :type oauth_url: str
+        :param metrics: receives timings and sizes of every request and response (see `basecampy3.metrics`)
+        :type metrics: basecampy3.metrics.MetricsHook
+        :param tracer: traces endpoint method calls and the pages they fetch (see `basecampy3.tracing`)
+        :type tracer: basecampy3.tracing.Tracer
+        :param cache_backend: where responses are cached for revalidation. Defaults to a small in-memory
+                              DictionaryCache.
+        :type cache_backend: basecampy3.cache.ResponseCache
+        :param freshness: lets GETs be answered from the cache without waiting on Basecamp. A FreshnessPolicy for
+                          every GET or per-endpoint rules (see `basecampy3.freshness`).
+        :type freshness: basecampy3.freshness.FreshnessPolicy|basecampy3.freshness.FreshnessRules|dict
+        :param retry: which failed requests are retried and how (see `basecampy3.retry`). By default GET, PUT and
+                      DELETE requests are retried up to 3 times after connection errors, timeouts, 429, 502, 503
+                      and 504.
+        :type retry: basecampy3.retry.RetryPolicy
+        :param json_decoder: parses response bodies (as bytes) into JSON. Defaults to orjson if it is installed, or the
+                             `json` module (see `basecampy3.json_decoding`).
+        :type json_decoder: typing.Callable[[bytes], typing.Any]
+        :param stream_pages: parse each page of a list as it downloads, yielding objects as soon as they arrive and
+                             holding one at a time instead of the whole page. The first page of each list is not
+                             streamed. Streamed pages are not added to the response cache, and are parsed with the
+                             `json` module rather than `json_decoder`.
+        :type stream_pages: bool
+        :param identity_map: keep one live object per record, updated in place whenever the record is fetched again
+                             (see `basecampy3.identity_map`). True for a new IdentityMap, or an IdentityMap to use.
+        :type identity_map: bool|basecampy3.identity_map.IdentityMap
+        :param relation_ttl: how many seconds an object remembers related objects it has fetched, like a Project's
+                             `todoset` (see `basecampy3.relations`). 0 to fetch them every time, or None to remember
+                             them until they are invalidated.
+        :type relation_ttl: float|None
         """
         has_direct_values = client_id or client_secret or redirect_uri or access_token or refresh_token
         if conf and has_direct_values:
@@ -86,8 +122,24 @@ class Basecamp3(object):
             raise ValueError("Unable to find a suitable Basecamp 3 configuration. Try running `bc3 configure`.")
 
         self._conf = conf
+        self.api_url = api_url
+        self.oauth_url = oauth_url.rstrip("/")
+        self.metrics = metrics
+        self.tracer = tracer if tracer is not None else tracing.NoOpTracer()
+        self.json_decoder = json_decoder if json_decoder is not None else json_decoding.default_decoder()
+        self.stream_pages = stream_pages
+        if identity_map is True:
+            identity_map = IdentityMap()
+        elif identity_map is False:
+            identity_map = None
+        self.identity_map = identity_map
+        self.relation_ttl = relation_ttl
+        self.dock_index = DockIndex(self)
         session = _create_session()
-        session.mount("https://", adapter=Basecamp3TransportAdapter())
+        adapter = Basecamp3TransportAdapter(cache_backend=cache_backend, metrics=metrics, freshness_policy=freshness,
+                                            retry_policy=retry)
+        session.mount("https://", adapter=adapter)
+        session.mount("http://", adapter=adapter)
         self.session = self._session = session
         self._authorize()
         self.urls = urls.BasecampURLs(self.account_id, api_url)
@@ -95,6 +147,7 @@ class Basecamp3(object):
         self.answers = endpoints.Answers(self)
         self.campfires = endpoints.Campfires(self)
         self.campfire_lines = endpoints.CampfireLines(self)
+        self.documents = endpoints.Documents(self)
         self.messages = endpoints.Messages(self)
         self.message_boards = endpoints.MessageBoards(self)
         self.message_categories = endpoints.MessageCategories(self)
@@ -106,6 +159,8 @@ class Basecamp3(object):
         self.todolist_groups = endpoints.TodoListGroups(self)
         self.todos = endpoints.Todos(self)
         self.todosets = endpoints.TodoSets(self)
+        self.uploads = endpoints.Uploads(self)
+        self.vaults = endpoints.Vaults(self)
 
     @classmethod
     def from_environment(cls):
@@ -134,8 +189,8 @@ class Basecamp3(object):
 
         :return: a dict with current user data
         """
-        data = self._get_data(constants.AUTHORIZATION_JSON_URL, False)
-        return data.json()
+        data = self._get_data(self._oauth(constants.AUTHORIZATION_JSON_URL), False)
+        return self.json_decoder(data.content)
 
     @property
     def accounts(self):
@@ -144,6 +199,19 @@ class Basecamp3(object):
             if acct['product'] == 'bc3':
                 yield acct
 
+    def resume_list(self, cursor):
+        """
+        Carry on with a list (i.e. `projects.list()`) from where it was up to, even in a different process.
+
+        :param cursor: the list's `cursor`, or what its `to_json` returned
+        :type cursor: basecampy3.pagination.ListCursor|str
+        :return: the rest of the list
+        :rtype: basecampy3.pagination.ListResult
+        """
+        if not isinstance(cursor, pagination.ListCursor):
+            cursor = pagination.ListCursor.from_json(cursor)
+        return pagination.ListResult.resume(self, cursor)
+
     @classmethod
     def trade_user_code_for_access_token(cls, client_id, redirect_uri, client_secret, code, session=None):
         """
@@ -265,6 +333,9 @@ class Basecamp3(object):
         """
         if not self._conf.access_token:
             return True
+        import dateutil.parser  # only needed here, and slow to import
+        import pytz
+
         self._apply_token_to_headers()  # apply our current access_token to our session if it's not there already
         data = self.who_am_i
 
@@ -278,8 +349,14 @@ class Basecamp3(object):
         now = pytz.utc.localize(datetime.utcnow())
         return now >= expires_at
 
+    def _oauth(self, url):
+        """
+        Point one of the Launchpad URLs in `constants` at this object's `oauth_url` instead.
+        """
+        return self.oauth_url + url[len(constants.OAUTH_URL):]
+
     def _refresh_access_token(self):
-        url = constants.REFRESH_TOKEN_URL.format(self._conf)
+        url = self._oauth(constants.REFRESH_TOKEN_URL).format(self._conf)
         resp = self._session.post(url)
         if resp.status_code != 200:
             raise exc.InvalidRefreshTokenError(response=resp)
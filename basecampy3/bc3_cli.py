@@ -7,10 +7,7 @@ import logging
 import os
 import traceback
 
-from basecampy3 import Basecamp3, exc
-from basecampy3.bc3_api import _create_session
-from basecampy3.token_requestor import TokenRequester
-from basecampy3 import config, constants
+from basecampy3 import config, constants, exc
 
 try:
     # noinspection PyShadowingBuiltins
@@ -54,6 +51,10 @@ class CLI(object):
         An interactive wizard to walk a user through authorizing a Basecamp 3 API integration and storing the
         resulting tokens in basecamp.conf
         """
+        # imported here so that other subcommands don't wait on requests and every endpoint being imported
+        from basecampy3.bc3_api import Basecamp3, _create_session
+        from basecampy3.token_requestor import TokenRequester
+
         print("This will generate an access token and refresh token for using the Basecamp 3 API.")
         print("You must first create your own integration if you have not already here:")
         print("See the NOTE below about 'Redirect URI', otherwise give your integration any name and website you wish.")
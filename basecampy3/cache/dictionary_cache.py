@@ -1,11 +1,13 @@
+import time
 from collections import OrderedDict
+from threading import RLock
 from .response_cache import ResponseCache
 
 
 class DictionaryCache(ResponseCache):
     """
-    A simple cache used by default. Not good for multi-threaded or multi-host instances where you might need to cache
-    your requests in something like Redis.
+    A simple cache used by default. Safe to share between threads, but not good for multi-process or multi-host
+    instances where you might need to cache your requests in something like Redis.
     """
     def __init__(self, max_entries=20):
         """
@@ -15,6 +17,7 @@ class DictionaryCache(ResponseCache):
         self.__max_entries = 0
         self.max_entries = max_entries
         self._cache_dict = OrderedDict()
+        self._lock = RLock()
 
     @property
     def max_entries(self):
@@ -30,16 +33,41 @@ class DictionaryCache(ResponseCache):
     def get_cached_headers(self, method, url):
         try:
             key = (method, url)
-            etag, last_modified, _ = self._cache_dict[key]
+            with self._lock:
+                etag, last_modified, _, _ = self._cache_dict[key]
             return etag, last_modified
         except KeyError:
             return None, None
 
     def get_cached_response(self, method, url):
-        item = self._cache_dict[(method, url)]
-        response = item[2]  # our cached items are a tuple as etag, last_modified, and response
+        with self._lock:
+            item = self._cache_dict[(method, url)]
+        response = item[2]  # our cached items are a tuple as etag, last_modified, response, and cached_at
         return response
 
+    def get_cached_age(self, method, url):
+        with self._lock:
+            item = self._cache_dict.get((method, url))
+        if item is None or item[3] is None:
+            return None
+        return time.time() - item[3]
+
+    def touch(self, method, url):
+        key = (method, url)
+        with self._lock:
+            item = self._cache_dict.get(key)
+            if item is not None:
+                self._cache_dict[key] = item[:3] + (time.time(),)
+
+    def invalidate(self, predicate):
+        marked = []
+        with self._lock:
+            for key, item in self._cache_dict.items():
+                if item[3] is not None and predicate(*key):
+                    self._cache_dict[key] = item[:3] + (None,)
+                    marked.append(item[2])
+        return marked
+
     def set_cached(self, response):
         key = (response.request.method, response.request.url)
         etag = response.headers.get('ETag')
@@ -60,15 +88,16 @@ class DictionaryCache(ResponseCache):
         :param response: the entire response object
         :type response: requests.Response
         """
-        item = (etag, last_modified, response)
+        item = (etag, last_modified, response, time.time())
 
-        try:
-            del self._cache_dict[key]  # pop this response out of the cache if it's in there already
-        except KeyError:
-            pass
+        with self._lock:
+            try:
+                del self._cache_dict[key]  # pop this response out of the cache if it's in there already
+            except KeyError:
+                pass
 
-        while len(self._cache_dict) >= self.max_entries:  # pop off oldest entries until within limit
-            self._cache_dict.popitem(last=False)
+            while len(self._cache_dict) >= self.max_entries:  # pop off oldest entries until within limit
+                self._cache_dict.popitem(last=False)
 
-        # it's now the freshest item in the cache
-        self._cache_dict[key] = item
+            # it's now the freshest item in the cache
+            self._cache_dict[key] = item
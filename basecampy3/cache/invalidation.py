@@ -0,0 +1,144 @@
+"""
+Works out which cached GET responses a write (POST, PUT, DELETE) may have made out of date, so that they are
+revalidated with Basecamp instead of being served from the cache by a freshness policy.
+
+For a write under `buckets/{project}/...`, every recording whose ID appears in the URL is affected along with
+everything listed under it. i.e. POSTing to `buckets/1/todolists/2/todos.json` affects the to-do list
+(`buckets/1/todolists/2.json`) and its lists (`buckets/1/todolists/2/todos.json`, with any query string). The parent
+of each affected recording (read from the write's response or from the cached copy of the recording) is affected too,
+since its counts and lists change: completing `buckets/1/todos/3` affects the to-do list it is in. When the parent
+cannot be found that way (the write had no response body and the recording was never cached on its own), every list
+in the project is affected instead. The cross-project recordings list is always affected.
+
+Outside of buckets, i.e. `projects/{id}.json`, the resource and everything under it are affected, as is the collection
+it belongs to (`projects.json`).
+"""
+import fnmatch
+import re
+
+from six.moves.urllib_parse import urlsplit, urlunsplit
+
+from ..log import logger
+
+WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+_BUCKET_URL_REGEX = re.compile(r"^(?P<account>.+?/\d+)/buckets/(?P<bucket>\d+)/(?P<rest>.+?)(?:\.json)?$")
+_ACCOUNT_URL_REGEX = re.compile(r"^(?P<account>https?://[^/]+/\d+)/(?P<rest>.+?)(?:\.json)?$")
+
+
+def strip_query(url):
+    scheme, netloc, path, _, _ = urlsplit(url)
+    return urlunsplit((scheme, netloc, path, "", ""))
+
+
+def affected_patterns(url):
+    """
+    The URL patterns (shell-style, matched against URLs without their query string) of cached responses that a
+    write to `url` may have changed. Parents are not included; see `invalidate_for_write`.
+
+    :param url: the URL that was written to
+    :type url: str
+    :return: patterns of affected URLs
+    :rtype: list[str]
+    """
+    url = strip_query(url)
+    patterns = [url]
+    match = _BUCKET_URL_REGEX.match(url)
+    if match:
+        bucket = "%s/buckets/%s" % (match.group("account"), match.group("bucket"))
+        for segment in match.group("rest").split("/"):
+            if segment.isdigit():
+                patterns.extend(recording_patterns(bucket, segment))
+        patterns.append("%s/projects/recordings.json" % match.group("account"))
+        return patterns
+
+    match = _ACCOUNT_URL_REGEX.match(url)
+    if match:
+        prefix = match.group("account")
+        segments = match.group("rest").split("/")
+        for i, segment in enumerate(segments):
+            if not segment.isdigit():
+                continue
+            resource = "/".join([prefix] + segments[:i + 1])
+            patterns.extend((resource + ".json", resource + "/*"))
+            if i == len(segments) - 1:  # the write was to the resource itself, so its collection changed too
+                patterns.append("/".join([prefix] + segments[:i]) + ".json")
+    return patterns
+
+
+def recording_patterns(bucket, recording_id):
+    """
+    :return: patterns matching a recording in a bucket (whatever its type) and everything listed under it
+    :rtype: list[str]
+    """
+    return ["%s/*/%s.json" % (bucket, recording_id), "%s/*/%s/*" % (bucket, recording_id)]
+
+
+def invalidate_for_write(cache, method, url, response=None):
+    """
+    Mark the cached responses that a write may have changed as needing revalidation.
+
+    :param cache: the cache to invalidate entries in
+    :type cache: basecampy3.cache.ResponseCache
+    :param method: the HTTP method of the write
+    :type method: str
+    :param url: the URL that was written to
+    :type url: str
+    :param response: the response to the write, used to find the parent of a created or updated recording
+    :type response: requests.Response
+    :return: how many cached responses were marked
+    :rtype: int
+    """
+    if method not in WRITE_METHODS:
+        return 0
+    parents = set()
+    if response is not None:
+        parents.update(_parent_urls(response))
+    marked = cache.invalidate(_matcher(affected_patterns(url)))
+    for cached in marked:
+        parents.update(_parent_urls(cached))
+
+    if not parents:
+        match = _BUCKET_URL_REGEX.match(strip_query(url))
+        if match:  # we don't know what this recording is listed in, so revalidate every list in the project
+            marked += cache.invalidate(_matcher(["%s/buckets/%s/*/*/*.json" % (match.group("account"),
+                                                                                match.group("bucket"))]))
+    else:
+        patterns = []
+        for parent in parents:
+            match = _BUCKET_URL_REGEX.match(strip_query(parent))
+            if match and match.group("rest").split("/")[-1].isdigit():
+                bucket = "%s/buckets/%s" % (match.group("account"), match.group("bucket"))
+                patterns.extend(recording_patterns(bucket, match.group("rest").split("/")[-1]))
+            else:
+                patterns.append(strip_query(parent))
+        marked += cache.invalidate(_matcher(patterns))
+    if marked:
+        logger.debug("A %s to %s invalidated %d cached response(s).", method, url, len(marked))
+    return len(marked)
+
+
+def _matcher(patterns):
+    regex = re.compile("|".join("(?:%s)" % fnmatch.translate(p) for p in patterns))
+
+    def matches(method, url):
+        return method == "GET" and regex.match(strip_query(url)) is not None
+    return matches
+
+
+def _parent_urls(response):
+    """
+    The URL of the parent recording named in a response's JSON, if it is a single recording with a parent.
+    """
+    if "json" not in response.headers.get("Content-Type", "") or not response.content:
+        return ()
+    try:
+        data = response.json()
+    except ValueError:
+        return ()
+    if not isinstance(data, dict):
+        return ()
+    parent = data.get("parent")
+    if isinstance(parent, dict) and parent.get("url"):
+        return (parent["url"],)
+    return ()
@@ -50,3 +50,45 @@ class ResponseCache(object):
         :type response: requests.Response
         """
         raise NotImplementedError()
+
+    def get_cached_age(self, method, url):
+        """
+        How long ago the cached response for this METHOD and URL was stored or last confirmed unchanged (see
+        `touch`). Freshness policies use this to answer requests from the cache without asking Basecamp.
+
+        Caches that do not track this return None, and every request is then revalidated with Basecamp as before.
+
+        :param method: the HTTP method in all caps (i.e. 'GET', 'POST', 'PUT')
+        :type method: str
+        :param url: the URL of the request
+        :type url: str
+        :return: the age in seconds, or None if nothing is cached or the age is unknown
+        :rtype: float|None
+        """
+        return None
+
+    def touch(self, method, url):
+        """
+        Basecamp just confirmed that the cached response for this METHOD and URL is still current ("304 Not
+        Modified"), so its age starts over. Does nothing unless overridden.
+
+        :param method: the HTTP method in all caps (i.e. 'GET', 'POST', 'PUT')
+        :type method: str
+        :param url: the URL of the request
+        :type url: str
+        """
+
+    def invalidate(self, predicate):
+        """
+        Mark cached responses as needing revalidation: they are kept (along with their ETags, so Basecamp can still
+        answer "304 Not Modified") but `get_cached_age` returns None for them until they are stored or touched again.
+        Called after writes so that freshness policies never serve something we know we just changed.
+
+        Caches that do not track ages have nothing to do, and the default implementation marks nothing.
+
+        :param predicate: called with the METHOD and URL of each cached response; True means it should be marked
+        :type predicate: typing.Callable[[str, str], bool]
+        :return: the cached responses that were marked
+        :rtype: list[requests.Response]
+        """
+        return []
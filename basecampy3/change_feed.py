@@ -0,0 +1,212 @@
+"""
+A continuous feed of changes across Projects, built on the recordings list sorted by most recently updated.
+
+https://github.com/basecamp/bc3-api/blob/master/sections/recordings.md#get-recordings
+"""
+import threading
+import time
+
+from dateutil import parser
+from six.moves.urllib_parse import urljoin
+
+from .endpoints import registry
+from .endpoints._base import BasecampEndpoint
+from .exc import Basecamp3Error
+from .log import logger
+
+
+class ChangeFeed(object):
+    """
+    Polls `/projects/recordings.json` for each requested recording type (and status), newest first, and emits only
+    recordings whose `updated_at` moved past the feed's checkpoint. Oldest changes are emitted first.
+
+    Unchanged polls are cheap: the transport adapter sends `If-None-Match` so Basecamp answers "304 Not Modified", and
+    a first page with the same ETag as last time is recognized without looking at its contents. Each stream polls at
+    `min_interval` seconds while it sees changes and backs off toward `max_interval` while it is idle.
+
+    `checkpoint` is a JSON-serializable dictionary. Save it and pass it back in to pick up where a previous feed left
+    off.
+
+    ```
+    feed = ChangeFeed(bc3, types=["Todo", "Message"], projects=[1234, 5678])
+    for recording in feed:  # runs until feed.stop() is called
+        print(recording)
+    ```
+    """
+
+    RECORDINGS_URL = "{base_url}/projects/recordings.json"
+
+    def __init__(self, api, types, projects=None, statuses=("active",), checkpoint=None, backfill=False,
+                 min_interval=5, max_interval=300, backoff=2.0):
+        """
+        :param api: the Basecamp3 object to poll with
+        :type api: basecampy3.bc3_api.Basecamp3
+        :param types: the recording types to follow (i.e. "Todo", "Message", "Comment", "Document", "Upload")
+        :type types: typing.Iterable[str]
+        :param projects: Project objects or IDs to limit the feed to. By default, all active Projects are followed.
+        :type projects: typing.Iterable[basecampy3.endpoints.projects.Project|int]
+        :param statuses: which recording statuses to follow ("active", "archived", "trashed")
+        :type statuses: typing.Iterable[str]
+        :param checkpoint: the `checkpoint` of an earlier ChangeFeed to resume from
+        :type checkpoint: dict
+        :param backfill: for streams without a checkpoint, emit every existing recording on the first poll. Otherwise
+                         the first poll only records where the stream currently is.
+        :type backfill: bool
+        :param min_interval: seconds between polls of a stream that is seeing changes
+        :type min_interval: float
+        :param max_interval: the most seconds between polls of an idle stream
+        :type max_interval: float
+        :param backoff: the poll interval of an idle stream is multiplied by this after each poll without changes
+        :type backoff: float
+        """
+        if not types:
+            raise ValueError("At least one recording type must be given.")
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Intervals must satisfy 0 < min_interval <= max_interval")
+        self._api = api
+        self.url = self.RECORDINGS_URL.format(base_url=urljoin(api.api_url, "/%s" % api.account_id))
+        self.bucket = ",".join(str(int(p)) for p in projects) if projects else None
+        self.backfill = backfill
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+        checkpoint = checkpoint or {}
+        self._streams = []
+        for rectype in types:
+            for status in statuses:
+                key = "%s/%s" % (rectype, status)
+                position = checkpoint.get(key, {})
+                self._streams.append({
+                    "key": key,
+                    "type": rectype,
+                    "status": status,
+                    "updated_at": position.get("updated_at"),
+                    "ids": set(position.get("ids", ())),
+                    "etag": None,
+                    "interval": min_interval,
+                    "next_poll": 0,
+                })
+        self._stop = threading.Event()
+
+    @property
+    def checkpoint(self):
+        """
+        :return: the position of every stream, safe to serialize as JSON
+        :rtype: dict
+        """
+        return {s["key"]: {"updated_at": s["updated_at"], "ids": sorted(s["ids"])}
+                for s in self._streams if s["updated_at"] is not None}
+
+    def poll(self, force=False):
+        """
+        Poll every stream that is due (or every stream if `force` is True) once. The streams' positions only move
+        forward once every one of them was polled, so if one fails, the next poll returns the other streams' changes
+        again instead of losing them.
+
+        :param force: poll streams even if their interval has not elapsed yet
+        :type force: bool
+        :return: the recordings that changed since the last poll, oldest change first
+        :rtype: list[basecampy3.endpoints._base.BasecampObject]
+        """
+        now = time.time()
+        polled = []
+        for stream in self._streams:
+            if not force and stream["next_poll"] > now:
+                continue
+            polled.append((stream, self._poll_stream(stream)))
+
+        changes = []
+        for stream, (found, position) in polled:
+            stream.update(position)
+            if found:
+                stream["interval"] = self.min_interval
+            else:
+                stream["interval"] = min(stream["interval"] * self.backoff, self.max_interval)
+            stream["next_poll"] = time.time() + stream["interval"]
+            changes.extend(found)
+        changes.sort(key=lambda r: parser.isoparse(r.updated_at))
+        return changes
+
+    def stop(self):
+        """
+        Make iteration end after the current poll.
+        """
+        self._stop.set()
+
+    def __iter__(self):
+        self._stop.clear()
+        while not self._stop.is_set():
+            for change in self.poll():
+                yield change
+            next_poll = min(s["next_poll"] for s in self._streams)
+            self._stop.wait(max(0, next_poll - time.time()))
+
+    def _poll_stream(self, stream):
+        """
+        Fetch pages of one stream until reaching recordings at or before its checkpoint. The stream itself is left
+        as it is; `poll` applies the new position once every stream it polls has been read.
+
+        :return: the recordings that changed, oldest change first, and the stream's new ETag and checkpoint
+        :rtype: (list[basecampy3.endpoints._base.BasecampObject], dict)
+        """
+        params = {
+            "type": stream["type"],
+            "status": stream["status"],
+            "bucket": self.bucket,
+            "sort": "updated_at",
+            "direction": "desc",
+        }
+        request_args = {"method": "GET", "url": self.url, "params": {k: v for k, v in params.items() if v}}
+        since = stream["updated_at"]
+        since_dt = parser.isoparse(since) if since else None
+        baseline_only = since is None and not self.backfill
+
+        found = []
+        etag = None
+        first_page = True
+        while request_args:
+            resp = self._api._session.request(**request_args)
+            if not resp.ok:
+                raise Basecamp3Error(response=resp)
+            if first_page:
+                etag = resp.headers.get("ETag")
+                if etag and etag == stream["etag"]:
+                    logger.debug("No changes to %s since the last poll.", stream["key"])
+                    return [], {}
+                first_page = False
+
+            reached_checkpoint = False
+            for jdict in self._api.json_decoder(resp.content):
+                if since_dt is not None:
+                    updated_at = parser.isoparse(jdict["updated_at"])
+                    if updated_at < since_dt:
+                        reached_checkpoint = True
+                        break
+                    if updated_at == since_dt and jdict["id"] in stream["ids"]:
+                        continue  # already emitted, but others may share its timestamp
+                found.append(jdict)
+                if baseline_only:
+                    reached_checkpoint = True
+                    break
+
+            link_header = resp.headers.get("Link")
+            if reached_checkpoint or not link_header:
+                break
+            next_page_url = BasecampEndpoint._LINK_HEADER_URL_REGEX.findall(link_header)[0]
+            request_args = {"method": "GET", "url": next_page_url}
+
+        position = {"etag": etag}
+        if found:
+            newest = found[0]["updated_at"]
+            newest_dt = parser.isoparse(newest)
+            ids = set(j["id"] for j in found if parser.isoparse(j["updated_at"]) == newest_dt)
+            if since_dt is not None and newest_dt == since_dt:
+                ids |= stream["ids"]
+            position["updated_at"] = newest
+            position["ids"] = ids
+
+        if baseline_only:
+            return [], position
+        found.reverse()  # oldest first
+        return [registry.object_from_json(jdict, self._api) for jdict in found], position
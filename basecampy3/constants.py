@@ -20,6 +20,13 @@ in `bc3 configure`"""
 DEFAULT_REDIRECT_URI = "http://localhost:%d" % OAUTH_LOCAL_BIND_PORT
 """The default Redirect URI recommended for your Basecamp 3 OAuth2 integration. This should always be localhost"""
 
+WEBHOOK_LOCAL_BIND_ADDRESS = os.getenv("BC3_WEBHOOK_BIND_ADDRESS", "127.0.0.1")
+"""The address a `basecampy3.webhook_server.WebhookReceiver` binds to by default. Set this to 0.0.0.0 to accept
+webhooks from other hosts (i.e. Basecamp itself, when not behind a reverse proxy)."""
+
+WEBHOOK_LOCAL_BIND_PORT = int(os.getenv("BC3_WEBHOOK_BIND_PORT", "33334"))
+"""The port a `basecampy3.webhook_server.WebhookReceiver` listens on by default."""
+
 AUTHORIZE_URL = "%s/authorization/new?" \
                 "client_id={client_id}&redirect_uri={redirect_uri}&type=web_server" % OAUTH_URL
 """Confirms you want to allow an app (identified by client_id) to have access to your Basecamp 3 account"""
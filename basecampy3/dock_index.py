@@ -0,0 +1,153 @@
+"""
+The tools in each Project's dock, by Project ID, so that a tool can be found from just a Project ID:
+
+```
+todolists = bc3.todolists.list(project=123)  # no need to get Project 123 first
+```
+
+Every Project fetched by `projects.list`, `get`, `create` or `update` adds its dock to its client's index. A Project
+that isn't in the index yet is fetched the first time one of its tools is needed. The Project is fetched again before
+using its entry when:
+
+- the entry is older than the index's `ttl`
+- a request under the Project (`/buckets/<project_id>/...`) was answered with "404 Not Found", in case a tool was
+  replaced or turned off
+- the tool isn't in the indexed dock, in case it has been turned on since
+
+Each entry keeps the ETag of the Project response it came from. The transport adapter sends it back with
+`If-None-Match`, so if the Project hasn't changed the fetch costs a `304 Not Modified` and the entry is kept as it is.
+"""
+import threading
+import time
+
+from .exc import Basecamp3Error
+
+
+class DockIndex(object):
+    """
+    The dock of each Project a client has seen: Project ID -> tool name -> the tool's section of the dock (its "id",
+    "url", "title" and so on).
+    """
+
+    DEFAULT_TTL = 300
+    """Seconds an entry is used before its Project is revalidated."""
+
+    def __init__(self, api, ttl=DEFAULT_TTL):
+        """
+        :param api: the client to fetch unknown Projects with
+        :type api: basecampy3.bc3_api.Basecamp3
+        :param ttl: seconds an entry is used before its Project is revalidated. None never revalidates on age alone.
+        :type ttl: float|None
+        """
+        self._api = api
+        self.ttl = ttl
+        self._docks = {}
+        self._lock = threading.Lock()
+
+    def record(self, project):
+        """
+        Index (or re-index) a Project's dock. `revalidate` adds the ETag when the JSON came from a response for just
+        this Project.
+
+        :param project: a Project's parsed JSON
+        :type project: dict
+        """
+        dock = project.get("dock")
+        if dock is None:
+            return
+        sections = dict((section["name"], dict(section)) for section in dock)
+        with self._lock:
+            self._docks[int(project["id"])] = {"sections": sections, "etag": None, "fetched_at": time.time()}
+
+    def section(self, project_id, name):
+        """
+        :param project_id: the ID of a Project
+        :type project_id: int
+        :param name: the name of a tool in its dock, i.e. "todoset"
+        :type name: str
+        :return: the tool's section of the Project's dock
+        :rtype: dict
+        :raises AttributeError: if the Project doesn't have the tool in its dock
+        """
+        project_id = int(project_id)
+        found, current = self._lookup(project_id, name)
+        if found is None or not current:
+            self.revalidate(project_id)
+            found, current = self._lookup(project_id, name)
+        if found is None:
+            raise AttributeError("Project {project} does not have '{section}' in its dock. Does this project not use "
+                                 "{section}?".format(project=project_id, section=name))
+        return found
+
+    def section_id(self, project_id, name):
+        """
+        :return: the ID of a tool in a Project's dock (see `section`)
+        :rtype: int
+        """
+        return self.section(project_id, name)["id"]
+
+    def revalidate(self, project_id):
+        """
+        Fetch a Project again and re-index its dock if the Project changed since its entry was made.
+
+        :param project_id: the ID of a Project
+        :type project_id: int
+        """
+        project_id = int(project_id)
+        projects = self._api.projects
+        resp = self._api._session.request("GET", projects.GET_URL.format(base_url=projects.url, project_id=project_id))
+        if not resp.ok:
+            raise Basecamp3Error(response=resp)
+        etag = resp.headers.get("ETag")
+        with self._lock:
+            entry = self._docks.get(project_id)
+            if etag is not None and entry is not None and entry["etag"] == etag:
+                entry["fetched_at"] = time.time()
+                return
+        projects._wrap(projects._json(resp))  # which indexes its dock
+        with self._lock:
+            entry = self._docks.get(project_id)
+            if entry is not None:
+                entry["etag"] = etag
+
+    def expire(self, project_id):
+        """
+        Have a Project's entry revalidated the next time it is used.
+
+        :type project_id: int
+        """
+        with self._lock:
+            entry = self._docks.get(int(project_id))
+            if entry is not None:
+                entry["fetched_at"] = None
+
+    def invalidate(self, project_id=None):
+        """
+        Forget a Project's dock, or every Project's if `project_id` is None.
+
+        :type project_id: int
+        """
+        with self._lock:
+            if project_id is None:
+                self._docks.clear()
+            else:
+                self._docks.pop(int(project_id), None)
+
+    def __contains__(self, project_id):
+        return int(project_id) in self._docks
+
+    def __len__(self):
+        return len(self._docks)
+
+    def _lookup(self, project_id, name):
+        """
+        :return: the tool's section (or None) and whether the Project's entry can be used without revalidating it
+        :rtype: (dict|None, bool)
+        """
+        with self._lock:
+            entry = self._docks.get(project_id)
+            if entry is None:
+                return None, False
+            fetched_at = entry["fetched_at"]
+            current = fetched_at is not None and (self.ttl is None or time.time() - fetched_at < self.ttl)
+            return entry["sections"].get(name), current
@@ -2,6 +2,7 @@ from .answers import Answers
 from .campfire_lines import CampfireLines
 from .campfires import Campfires
 from .comments import Comments
+from .documents import Documents
 from .message_boards import MessageBoards
 from .message_categories import MessageCategories
 from .messages import Messages
@@ -13,3 +14,5 @@ from .todolist_groups import TodoListGroups
 from .todolists import TodoLists
 from .todos import Todos
 from .todosets import TodoSets
+from .uploads import Uploads
+from .vaults import Vaults
@@ -1,9 +1,18 @@
 from ..exc import *
 from . import util
 from .. import constants
+from .. import pagination
+from .. import tracing
+from ..json_decoding import iter_json_array
+from ..metrics import endpoint_template
+from ..request_context import request_context
+from collections import OrderedDict, deque
+from concurrent import futures
+from itertools import islice
 import abc
 import re
 import six
+import time
 from six.moves.urllib_parse import urljoin
 
 
@@ -34,8 +43,25 @@ class BasecampObject(object):
                 ex = ValueError("Can't refresh {object} without a URL".format(object=type(self).__name__))
                 raise ex
         new_item = self._endpoint._get(url)  # luckily this object has the URL we can refresh from
-        self._values.clear()
-        self._values.update(new_item._values)
+        if new_item is not self:  # with an identity map, this object has already been updated in place
+            self._values.clear()
+            self._values.update(new_item._values)
+        self.invalidate_relations()
+
+    def invalidate_relations(self, *names):
+        """
+        Forget related objects fetched through this object's relations (see `basecampy3.relations`), so that they are
+        fetched again the next time they are used.
+
+        :param names: which relations to forget, i.e. "todoset". Forgets all of them if none are given.
+        :type names: str
+        """
+        if not names:
+            self.__dict__.pop("_relations", None)
+            return
+        remembered = self.__dict__.get("_relations", {})
+        for name in names:
+            remembered.pop(name, None)
 
     def __getattr__(self, item):
         try:
@@ -105,7 +131,10 @@ class RecordingBase(BasecampObject):
 class BasecampEndpoint(object):
     OBJECT_CLASS = BasecampObject
     URL = constants.API_URL
-    _LINK_HEADER_URL_REGEX = re.compile(r'<(https.+)>')
+    _LINK_HEADER_URL_REGEX = re.compile(r'<(https?.+)>')
+    _BUCKET_URL_REGEX = re.compile(r'/buckets/(\d+)/')
+    STREAM_CHUNK_SIZE = 16384
+    """Bytes read at a time from a page when the API object's `stream_pages` is set."""
 
     def __init__(self, api):
         """
@@ -113,16 +142,18 @@ class BasecampEndpoint(object):
         :type api: basecampy3.bc3_api.Basecamp3
         """
         self._api = api
-        self.url = urljoin(self.URL, "/%s" % api.account_id)
+        self.url = urljoin(api.api_url, "/%s" % api.account_id)
+        if api.tracer.enabled:
+            tracing.instrument(self, api.tracer)
 
-    def _get_list(self, url, params=None, method="GET"):
+    def _get_list(self, url, params=None, method="GET", object_class=None):
         """
         Basecamp 3's API returns a paginated list of elements for most GET list endpoints. It has a geared pagination
         ratio so page 1 has 15 objects, page 2 has 30, page 3 has 50, and pages 4 and up have 100 objects each. This
-        function returns a generator that can be looped through. The next page is transparently fetched when a user's
-        loop has exhausted the current page.
+        function returns a ListResult that can be looped through. The next page is transparently fetched when a user's
+        loop has exhausted the current page. `count`, `first` and `exists` on the ListResult only fetch the first page.
 
-        Someone could probably re-write this in a way that grabbed the next page asynchronously ahead of time...
+        Inside a `basecampy3.pagination.parallel_pages` block, the pages after the first are fetched in parallel.
 
         :param url: the URL to GET a list from
         :type url: str
@@ -130,75 +161,289 @@ class BasecampEndpoint(object):
         :type params: dict
         :param method: the HTTP verb to use when fetching this URL. Usually "GET".
         :type method: str
-        :return: a generator that produces the requested objects
-        :rtype: collections.Iterable[BasecampObject]
+        :param object_class: the BasecampObject subclass to wrap each element in. Defaults to `OBJECT_CLASS`.
+        :type object_class: type
+        :return: an iterator that produces the requested objects
+        :rtype: basecampy3.pagination.ListResult
         """
         request_args = {'method': method, 'url': url}
         if params is not None:
             request_args['params'] = params
 
-        return self._paginated_generator(request_args)
+        parallel = pagination.current_settings() if method == "GET" else None
+        return pagination.ListResult(self, request_args, object_class=object_class, parallel=parallel)
 
     def _get(self, url, method="GET"):
         resp = self._api._session.request(method, url)
         if not resp.ok:
-            raise Basecamp3Error(response=resp)
-        item = resp.json()
-        return self.OBJECT_CLASS(item, self)
+            raise self._error(resp)
+        item = self._json(resp)
+        return self._wrap(item)
 
     def _create(self, url, data, method="POST", object_class=None):
         resp = self._api._session.request(method, url, json=data)
         if not resp.ok:
-            raise Basecamp3Error(response=resp)
-        json_data = resp.json()
-        if object_class is None:
-            object_class = self.OBJECT_CLASS
-        item = object_class(json_data, self)
+            raise self._error(resp)
+        json_data = self._json(resp)
+        item = self._wrap(json_data, object_class)
         return item
 
     def _update(self, url, data, method="PUT"):
         resp = self._api._session.request(method, url, json=data)
         if not resp.ok:
-            raise Basecamp3Error(response=resp)
-        json_data = resp.json()
-        item = self.OBJECT_CLASS(json_data, self)
+            raise self._error(resp)
+        json_data = self._json(resp)
+        item = self._wrap(json_data)
         return item
 
+    def _wrap(self, json_dict, object_class=None):
+        """
+        Wrap parsed JSON in a BasecampObject, or update the live object for the same record if the API object has an
+        identity map.
+
+        :param json_dict: a dictionary representing the parsed JSON of a single Basecamp object
+        :type json_dict: dict
+        :param object_class: the BasecampObject subclass to wrap it in. Defaults to `OBJECT_CLASS`.
+        :type object_class: type
+        :rtype: BasecampObject
+        """
+        if object_class is None:
+            object_class = self.OBJECT_CLASS
+        identity_map = self._api.identity_map
+        if identity_map is None:
+            return object_class(json_dict, self)
+        return identity_map.wrap(object_class, json_dict, self)
+
+    def _json(self, resp):
+        """
+        Parse a response body as JSON with the API object's `json_decoder`, timing it if the API object has a
+        MetricsHook.
+
+        :param resp: a response with a JSON body
+        :type resp: requests.Response
+        :return: the parsed JSON
+        """
+        metrics = self._api.metrics
+        if metrics is None:
+            return self._api.json_decoder(resp.content)
+        started = time.time()
+        data = self._api.json_decoder(resp.content)
+        metrics.record_parse(endpoint_template(resp.url), time.time() - started)
+        return data
+
+    def _error(self, resp):
+        """
+        The error to raise for an unsuccessful response. A "404 Not Found" under a Project may mean a tool in its dock
+        was replaced, so the Project's entry in the API object's DockIndex is revalidated the next time it is used.
+
+        :param resp: the unsuccessful response
+        :type resp: requests.Response
+        :rtype: Basecamp3Error
+        """
+        if resp.status_code == 404:
+            match = self._BUCKET_URL_REGEX.search(resp.url or "")
+            if match is not None:
+                self._api.dock_index.expire(match.group(1))
+        return Basecamp3Error(response=resp)
+
     def _no_response(self, url, data=None, method="PUT"):
         request_args = {"url": url, "method": method}
         if data is not None:
             request_args['json'] = data
         resp = self._api._session.request(**request_args)
         if not resp.ok:
-            raise Basecamp3Error(response=resp)
+            raise self._error(resp)
 
     def _delete(self, url, method="DELETE"):
         resp = self._api._session.request(method, url)
         if not resp.ok:
-            raise Basecamp3Error(response=resp)
+            raise self._error(resp)
         return resp
 
-    def _paginated_generator(self, request_args):
+    def _paginated_generator(self, request_args, object_class=None, first_response=None, cursor=None, on_page=None,
+                             first_page=None):
         """
         Automatically gets the next page when getting paginated results, yielding each object on each page.
 
+        With the API object's `stream_pages` set, each page is parsed as it downloads and objects are yielded as soon
+        as they arrive, rather than once the whole page has.
+
         :param request_args: kwargs for Session.request method
         :type request_args: dict
+        :param object_class: the BasecampObject subclass to wrap each element in. Defaults to `OBJECT_CLASS`.
+        :type object_class: type
+        :param first_response: the response to `request_args`, if it has already been fetched (without streaming)
+        :type first_response: requests.Response
+        :param cursor: kept up to date with the page being read and how many of its objects have been yielded. Its
+                       `offset` objects of the first page are skipped.
+        :type cursor: basecampy3.pagination.ListCursor
+        :param on_page: called with the objects on each page before any of them are yielded. Pages are not streamed
+                        when this is given.
+        :type on_page: typing.Callable[[list[BasecampObject]], None]
+        :param first_page: the parsed JSON of `first_response`, if it has already been parsed
+        :type first_page: list[dict]
         """
+        if object_class is None:
+            object_class = self.OBJECT_CLASS
+        stream = self._api.stream_pages
+        resp = first_response
+        skip = cursor.offset if cursor is not None else 0
+        page = 0
         while request_args:
-            resp = self._api._session.request(**request_args)
-            if not resp.ok:
-                raise Basecamp3Error(response=resp)
-            link_header = resp.headers.get("Link")
-            if link_header:
-                next_page_url = self._LINK_HEADER_URL_REGEX.findall(link_header)[0]
-                request_args = {'url': next_page_url, 'method': 'GET'}  # get ready to call the next page
-            else:
-                request_args = None  # clear it so we break the loop
-            items_json = resp.json()
-            for jdict in items_json:
-                item = self.OBJECT_CLASS(jdict, self)  # convert JSON dict into a BasecampObject
+            page += 1
+            streamed = resp is None and stream and on_page is None
+            if resp is None:
+                resp = self._request_page(request_args, page, stream=streamed)
+            if cursor is not None:
+                cursor.request = dict(request_args)
+                cursor.offset = skip
+            try:
+                link_header = resp.headers.get("Link")
+                if link_header:
+                    next_page_url = self._LINK_HEADER_URL_REGEX.findall(link_header)[0]
+                    request_args = {'url': next_page_url, 'method': 'GET'}  # get ready to call the next page
+                else:
+                    request_args = None  # clear it so we break the loop
+                if streamed:
+                    items_json = iter_json_array(resp.iter_content(self.STREAM_CHUNK_SIZE))
+                elif first_page is not None:
+                    items_json, first_page = first_page, None
+                else:
+                    items_json = self._json(resp)
+                # convert each JSON dict into a BasecampObject
+                items = (self._wrap(jdict, object_class) for jdict in islice(items_json, skip, None))
+                if on_page is not None:
+                    items = list(items)
+                    on_page(items)
+                for item in items:
+                    if cursor is not None:
+                        cursor.offset += 1
+                    yield item
+            finally:
+                if streamed:
+                    resp.close()  # give the connection back even if the caller stops part way through the page
+            resp = None
+            skip = 0
+
+    def _parallel_paginated_generator(self, request_args, settings, object_class=None, first_response=None,
+                                      cursor=None, on_page=None, first_page=None):
+        """
+        Like `_paginated_generator`, but the first page's `X-Total-Count` header is used to work out the URLs of the
+        remaining pages, which are then fetched `settings.max_workers` at a time. Lists that aren't geared the way
+        Basecamp usually gears them are paged through one page at a time instead.
+
+        :param request_args: kwargs for Session.request method
+        :type request_args: dict
+        :param settings: how many pages to fetch at once and whether to keep them in order
+        :type settings: basecampy3.pagination.ParallelPages
+        :param object_class: the BasecampObject subclass to wrap each element in. Defaults to `OBJECT_CLASS`.
+        :type object_class: type
+        :param first_response: the response to `request_args`, if it has already been fetched
+        :type first_response: requests.Response
+        :param cursor: kept up to date as in `_paginated_generator`. Only for `ordered` settings.
+        :type cursor: basecampy3.pagination.ListCursor
+        :param on_page: called with the objects on each page as in `_paginated_generator`
+        :type on_page: typing.Callable[[list[BasecampObject]], None]
+        :param first_page: the parsed JSON of `first_response`, if it has already been parsed
+        :type first_page: list[dict]
+        """
+        if object_class is None:
+            object_class = self.OBJECT_CLASS
+        resp = first_response if first_response is not None else self._request_page(request_args, 1)
+        if first_page is None:
+            first_page = self._json(resp)
+        next_url = pagination.next_page_url(resp)
+        total = pagination.total_count(resp)
+        if next_url is None or total is None or len(first_page) != pagination.GEARED_PAGE_SIZES[0]:
+            for item in self._paginated_generator(request_args, object_class=object_class, first_response=resp,
+                                                  cursor=cursor, on_page=on_page, first_page=first_page):
+                yield item
+            return
+
+        last_page = pagination.geared_page_count(total)
+        pending = list(range(2, last_page + 1))
+        pending.reverse()
+        in_flight = OrderedDict()
+        last_next_url = None
+        context = request_context()
+        executor = futures.ThreadPoolExecutor(max_workers=settings.max_workers)
+        try:
+            def fill():
+                while pending and len(in_flight) < settings.max_workers:
+                    page = pending.pop()
+                    url = pagination.page_url(next_url, page)
+                    in_flight[executor.submit(self._fetch_page, url, page, context)] = page
+
+            fill()  # start on the other pages before the caller has to deal with the first
+            for item in self._objects_on_page(first_page, request_args, object_class, cursor, on_page):
                 yield item
+            while in_flight:
+                if settings.ordered:
+                    done = [next(iter(in_flight))]
+                else:
+                    done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    page = in_flight.pop(future)
+                    items, page_next_url = future.result()
+                    fill()
+                    page_request = {'url': pagination.page_url(next_url, page), 'method': 'GET'}
+                    for item in self._objects_on_page(items, page_request, object_class, cursor, on_page):
+                        yield item
+                    if page == last_page:
+                        last_next_url = page_next_url
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+        if last_next_url is not None:  # the list grew since the first page, so carry on from the last page's link
+            for item in self._paginated_generator({'url': last_next_url, 'method': 'GET'}, object_class=object_class,
+                                                  cursor=cursor, on_page=on_page):
+                yield item
+
+    def _objects_on_page(self, items, page_request, object_class, cursor, on_page):
+        """
+        Wrap the items of one page for `_parallel_paginated_generator`, keeping the cursor up to date.
+        """
+        if cursor is not None:
+            cursor.request = dict(page_request)
+            cursor.offset = 0
+        objects = [self._wrap(jdict, object_class) for jdict in items]
+        if on_page is not None:
+            on_page(objects)
+        for item in objects:
+            if cursor is not None:
+                cursor.offset += 1
+            yield item
+
+    def _fetch_page(self, url, page, context):
+        """
+        Fetch one page for `_parallel_paginated_generator`. Runs in a worker thread, with the `priority`,
+        `allow_stale` and `retry_policy` settings of the thread that started the list.
+
+        :return: the page's items and the URL of the page after it, if there is one
+        :rtype: (list[dict], str|None)
+        """
+        with context:
+            resp = self._request_page({'url': url, 'method': 'GET'}, page)
+        return self._json(resp), pagination.next_page_url(resp)
+
+    def _request_page(self, request_args, page, stream=False):
+        """
+        Request one page of a list, in a span of its own.
+
+        :param request_args: kwargs for Session.request method
+        :type request_args: dict
+        :param page: which page this is, for tracing
+        :type page: int
+        :param stream: leave the body to be read as it downloads
+        :type stream: bool
+        :rtype: requests.Response
+        """
+        with tracing.span(self._api.tracer, "page", {"page": page, "http.url": request_args["url"]}):
+            resp = self._api._session.request(stream=stream, **request_args)
+        if not resp.ok:
+            raise self._error(resp)
+        return resp
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -247,3 +492,48 @@ class RecordingEndpointBase(BasecampEndpoint):
         project_id, recording_id = util.project_or_object(project, recording)
         url = self.TRASH_URL.format(base_url=self.url, project_id=project_id, recording_id=recording_id)
         self._no_response(url, method="PUT")
+
+
+def _bounded_crawl(seed, fetch, expand, max_workers):
+    """
+    Crawl a tree of listings breadth-first in a thread pool, with at most `max_workers` of them in flight at once. Used
+    by the walkers and exporters that fetch a listing, find more listings in it, and fetch those in turn.
+
+    :param seed: the first tasks to fetch
+    :type seed: typing.Iterable
+    :param fetch: fetches one task (i.e. every page of one listing). Runs in a worker thread, with the `priority`,
+                  `allow_stale` and `retry_policy` settings of the thread that started the crawl.
+    :type fetch: typing.Callable[[typing.Any], typing.Any]
+    :param expand: called in the crawling thread with each task and what fetching it returned, as soon as it is
+                   fetched. Returns the tasks it leads to and the things to yield for it.
+    :type expand: typing.Callable[[typing.Any, typing.Any], tuple[typing.Iterable, typing.Iterable]]
+    :param max_workers: the maximum number of tasks to have in flight at once
+    :type max_workers: int
+    :return: a generator of everything `expand` returns to yield. Closing it cancels the tasks not started yet.
+    """
+    pending = deque(seed)
+    in_flight = {}
+    context = request_context()
+
+    def run(task):
+        with context:
+            return fetch(task)
+
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < max_workers:
+                task = pending.popleft()
+                in_flight[executor.submit(run, task)] = task
+
+            done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                task = in_flight.pop(future)
+                children, outputs = expand(task, future.result())
+                pending.extend(children)
+                for output in outputs:
+                    yield output
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
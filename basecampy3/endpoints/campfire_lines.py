@@ -1,5 +1,12 @@
+import threading
+import time
+from collections import deque
+from concurrent import futures
+
 from ._base import BasecampEndpoint, BasecampObject
 from ..constants import DOCK_NAME_CAMPFIRE
+from ..exc import CampfireQueueFullError
+from ..log import logger
 from . import util
 
 
@@ -17,6 +24,182 @@ class CampfireLine(BasecampObject):
             return super(CampfireLine, self).__str__()
 
 
+class CampfireWriter(object):
+    """
+    Posts lines to a Campfire from a background thread so that callers never wait on Basecamp or the rate limiter.
+
+    `post` puts a line in a bounded queue and returns a `concurrent.futures.Future` for the CampfireLine it ends up
+    in. While one line is being sent, the lines queued behind it are joined into a single message (up to `max_lines`
+    lines and `max_length` characters), so a burst of 500 alerts costs a few requests instead of 500. Set `coalesce`
+    to False to post every line on its own.
+
+    The sender thread only runs while there is something to send, and it is not a daemon thread, so queued lines are
+    still delivered when the program exits. Use `flush` to wait for them, or `close` to stop taking new lines.
+
+    ```
+    with CampfireWriter(project.campfire) as writer:
+        for alert in alerts:
+            writer.post(alert)
+    ```
+    """
+
+    def __init__(self, campfire, max_queue=1000, coalesce=True, max_lines=25, max_length=4000, separator="<br>"):
+        """
+        :param campfire: the Campfire to post to
+        :type campfire: basecampy3.endpoints.campfires.Campfire
+        :param max_queue: the most lines waiting to be sent before `post` refuses (or waits for) more
+        :type max_queue: int
+        :param coalesce: join consecutive queued lines into one message
+        :type coalesce: bool
+        :param max_lines: the most lines joined into one message
+        :type max_lines: int
+        :param max_length: the most characters in a joined message. A single longer line is still sent on its own.
+        :type max_length: int
+        :param separator: what goes between joined lines
+        :type separator: str
+        """
+        if max_queue < 1 or max_lines < 1:
+            raise ValueError("max_queue and max_lines must be at least 1")
+        self.project_id, self.campfire_id = util.project_or_object(None, campfire)
+        self._endpoint = campfire._endpoint._api.campfire_lines
+        self.max_queue = max_queue
+        self.coalesce = coalesce
+        self.max_lines = max_lines
+        self.max_length = max_length
+        self.separator = separator
+        self._queue = deque()  # of (content, future)
+        self._sending = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def post(self, content, block=False, timeout=None):
+        """
+        Queue a line to be posted.
+
+        :param content: the line, which can be HTML-formatted
+        :type content: str
+        :param block: if the queue is full, wait for room instead of raising CampfireQueueFullError
+        :type block: bool
+        :param timeout: the most seconds to wait for room when `block` is True. None waits forever.
+        :type timeout: float
+        :return: a future that resolves to the CampfireLine this line was posted in
+        :rtype: concurrent.futures.Future
+        """
+        future = futures.Future()
+        with self._condition:
+            if self._closed:
+                raise ValueError("Cannot post to a closed CampfireWriter")
+            deadline = None if timeout is None else time.time() + timeout
+            while len(self._queue) >= self.max_queue:
+                remaining = None if deadline is None else deadline - time.time()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise CampfireQueueFullError(message="%d lines are already waiting to be posted to Campfire %s"
+                                                         % (len(self._queue), self.campfire_id))
+                self._condition.wait(remaining)
+            self._queue.append((content, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="campfire-writer-%s" % self.campfire_id)
+                self._thread.start()
+        return future
+
+    def flush(self, timeout=None):
+        """
+        Wait for every queued line to be posted.
+
+        :param timeout: the most seconds to wait. None waits forever.
+        :type timeout: float
+        :return: True if everything was posted, False if the timeout ran out first
+        :rtype: bool
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._queue or self._sending:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout=None, cancel=False):
+        """
+        Stop taking new lines and wait for the queued ones to be posted.
+
+        :param timeout: the most seconds to wait. None waits forever.
+        :type timeout: float
+        :param cancel: cancel the lines that have not started sending instead of waiting for them
+        :type cancel: bool
+        :return: True if everything queued was posted (or cancelled), False if the timeout ran out first
+        :rtype: bool
+        """
+        with self._condition:
+            self._closed = True
+            if cancel:
+                while self._queue:
+                    self._queue.popleft()[1].cancel()
+                self._condition.notify_all()
+        return self.flush(timeout)
+
+    @property
+    def pending(self):
+        """
+        :return: how many lines are waiting to be sent
+        :rtype: int
+        """
+        with self._condition:
+            return len(self._queue)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._queue:
+                    self._sending = False
+                    self._thread = None
+                    self._condition.notify_all()
+                    return
+                batch = self._take_batch()
+                self._sending = True
+                self._condition.notify_all()  # there's room in the queue now
+            if batch:
+                self._send(batch)
+
+    def _take_batch(self):
+        """
+        Take the lines for the next message off the queue, skipping ones whose futures were cancelled. Called with the
+        condition held.
+        """
+        batch = []
+        length = 0
+        while self._queue and len(batch) < self.max_lines:
+            content, future = self._queue[0]
+            added = len(content) + (len(self.separator) if batch else 0)
+            if batch and (not self.coalesce or length + added > self.max_length):
+                break
+            self._queue.popleft()
+            if future.set_running_or_notify_cancel():
+                batch.append((content, future))
+                length += added
+        return batch
+
+    def _send(self, batch):
+        content = self.separator.join(c for c, _ in batch)
+        try:
+            line = self._endpoint.create(content, project=self.project_id, campfire=self.campfire_id)
+        except Exception as ex:
+            logger.warning("Unable to post %d line(s) to Campfire %s: %s", len(batch), self.campfire_id, ex)
+            for _, future in batch:
+                future.set_exception(ex)
+        else:
+            for _, future in batch:
+                future.set_result(line)
+
+
 class CampfireLines(BasecampEndpoint):
     OBJECT_CLASS = CampfireLine
 
@@ -35,7 +218,8 @@ class CampfireLines(BasecampEndpoint):
         :param campfire: a Campfire object or Campfire ID
         :return: a list of messages in the project
         """
-        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE)
+        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE,
+                                                         dock_index=self._api.dock_index)
         url = self.LIST_URL.format(base_url=self.url, project_id=project_id, campfire_id=campfire_id)
         return self._get_list(url)
 
@@ -49,7 +233,8 @@ class CampfireLines(BasecampEndpoint):
         :return: a Campfire Line object
         """
         campfire_line = int(campfire_line)
-        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE)
+        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE,
+                                                         dock_index=self._api.dock_index)
         url = self.GET_URL.format(base_url=self.url, project_id=project_id, campfire_id=campfire_id,
                                   campfire_line_id=campfire_line)
         return self._get(url)
@@ -64,7 +249,8 @@ class CampfireLines(BasecampEndpoint):
         :param campfire: a Campfire object or Campfire ID
         :return: the newly created Campfire Line
         """
-        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE)
+        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE,
+                                                         dock_index=self._api.dock_index)
         data = {
             'content': content,
         }
@@ -81,7 +267,8 @@ class CampfireLines(BasecampEndpoint):
         :param campfire: a Campfire object or Campfire ID
         """
         campfire_line = int(campfire_line)
-        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE)
+        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE,
+                                                         dock_index=self._api.dock_index)
         url = self.DELETE_URL.format(base_url=self.url, project_id=project_id, campfire_id=campfire_id,
                                      campfire_line_id=campfire_line)
         self._delete(url)
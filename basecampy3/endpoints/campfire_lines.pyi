@@ -1,3 +1,4 @@
+from concurrent import futures
 from typing import ClassVar, Iterable, Literal, NoReturn, Optional, Type, Union
 
 from ._base import BasecampEndpoint, BasecampObject
@@ -22,6 +23,32 @@ class CampfireLine(BasecampObject):
     content: str
 
 
+class CampfireWriter(object):
+    project_id: int
+    campfire_id: int
+    max_queue: int
+    coalesce: bool
+    max_lines: int
+    max_length: int
+    separator: str
+
+    def __init__(self, campfire: campfires.Campfire, max_queue: int = 1000, coalesce: bool = True,
+                 max_lines: int = 25, max_length: int = 4000, separator: str = "<br>") -> None: ...
+
+    def post(self, content: str, block: bool = False, timeout: Optional[float] = None) -> futures.Future: ...
+
+    def flush(self, timeout: Optional[float] = None) -> bool: ...
+
+    def close(self, timeout: Optional[float] = None, cancel: bool = False) -> bool: ...
+
+    @property
+    def pending(self) -> int: ...
+
+    def __enter__(self) -> CampfireWriter: ...
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> NoReturn: ...
+
+
 class CampfireLines(BasecampEndpoint):
     OBJECT_CLASS: ClassVar[Type[CampfireLine]]
 
@@ -1,6 +1,6 @@
 from ._base import BasecampObject, BasecampEndpoint
 from ..constants import DOCK_NAME_CAMPFIRE
-from . import util
+from . import campfire_lines, util
 
 
 class Campfire(BasecampObject):
@@ -39,6 +39,16 @@ class Campfire(BasecampObject):
         """
         return self._endpoint._api.campfire_lines.create(content, campfire=self)
 
+    def writer(self, **kwargs):
+        """
+        A CampfireWriter that posts lines to this Campfire in the background, joining bursts of lines into fewer
+        messages. See `basecampy3.endpoints.campfire_lines.CampfireWriter` for the keyword arguments.
+
+        :return: a new CampfireWriter
+        :rtype: basecampy3.endpoints.campfire_lines.CampfireWriter
+        """
+        return campfire_lines.CampfireWriter(self, **kwargs)
+
     def __str__(self):
         return "Campfire %s: '%s'" % (self.id, self.bucket['name'])
 
@@ -59,7 +69,8 @@ class Campfires(BasecampEndpoint):
 
         :return: a Campfire object if found, raises an error if not found
         """
-        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE)
+        project_id, campfire_id = util.project_or_object(project, campfire, section_name=DOCK_NAME_CAMPFIRE,
+                                                         dock_index=self._api.dock_index)
         url = self.GET_URL.format(base_url=self.url, project_id=project_id, campfire_id=campfire_id)
         return self._get(url)
 
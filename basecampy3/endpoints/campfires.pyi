@@ -31,6 +31,8 @@ class Campfire(BasecampObject):
 
     def post_message(self, content: str) -> campfire_lines.CampfireLine: ...
 
+    def writer(self, **kwargs) -> campfire_lines.CampfireWriter: ...
+
 
 class Campfires(BasecampEndpoint):
     OBJECT_CLASS: ClassVar[Type[Campfire]]
@@ -5,7 +5,6 @@ https://github.com/basecamp/bc3-api/blob/master/sections/comments.md
 Comments on all kinds of things.
 """
 
-from dateutil import parser, tz
 from . import _base
 from .. import constants
 
@@ -13,6 +12,7 @@ from .. import constants
 class Comment(_base.RecordingBase):
 
     def __str__(self):
+        from dateutil import parser, tz  # only needed here, and slow to import
         try:
             created_at = parser.isoparse(self.created_at)
             created_at_local = created_at.astimezone(tz.tzlocal())
@@ -0,0 +1,36 @@
+"""
+Documents
+https://github.com/basecamp/bc3-api/blob/master/sections/documents.md
+
+Rich text documents stored in a Vault (the "Docs & Files" section of a Project).
+"""
+
+from . import recordings, vaults
+
+
+class Document(recordings.Recording):
+    def __str__(self):
+        try:
+            return "Document {0.id}: '{0.title}'".format(self)
+        except Exception:
+            return super(Document, self).__str__()
+
+
+class Documents(vaults.VaultContentsEndpoint):
+    OBJECT_CLASS = Document
+
+    GET_URL = "{base_url}/buckets/{project_id}/documents/{recording_id}.json"
+    LIST_URL = "{base_url}/buckets/{project_id}/vaults/{vault_id}/documents.json"
+
+    def get(self, document, project=None):
+        """
+        Get a Document by its ID and a Project's ID or just a Document object.
+
+        :param document: a Document object or ID
+        :type document: Document|int
+        :param project: a Project object or ID (optional if `document` is an object)
+        :type project: basecampy3.endpoints.projects.Project|int
+        :return: a Document object
+        :rtype: Document
+        """
+        return self._get_contents(document, project)
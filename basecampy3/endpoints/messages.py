@@ -1,5 +1,6 @@
 from ..constants import DOCK_NAME_MESSAGE_BOARD
 from . import recordings, util
+from ..relations import relation
 
 
 class Message(recordings.Recording):
@@ -26,9 +27,12 @@ class Message(recordings.Recording):
         except AttributeError:
             return ""
 
-    @property
+    @relation
     def message_board(self):
-
+        """
+        :return: the MessageBoard this Message was posted on
+        :rtype: basecampy3.endpoints.message_boards.MessageBoard
+        """
         board_id = self.parent['id']
         project_id = self.bucket['id']
         return self._endpoint._api.message_boards.get(project=project_id, board=board_id)
@@ -75,7 +79,8 @@ class Messages(recordings.RecordingEndpoint):
         :return: the newly posted Message
         :rtype: Message
         """
-        project_id, board_id = util.project_or_object(project, board, section_name=DOCK_NAME_MESSAGE_BOARD)
+        project_id, board_id = util.project_or_object(project, board, section_name=DOCK_NAME_MESSAGE_BOARD,
+                                                      dock_index=self._api.dock_index)
         data = {
             "subject": subject,
             "status": status,
@@ -110,7 +115,8 @@ class Messages(recordings.RecordingEndpoint):
         :return: a list of Message objects
         :rtype: collections.Iterable[Message]
         """
-        project_id, board_id = util.project_or_object(project, board, section_name=DOCK_NAME_MESSAGE_BOARD)
+        project_id, board_id = util.project_or_object(project, board, section_name=DOCK_NAME_MESSAGE_BOARD,
+                                                      dock_index=self._api.dock_index)
         url = self.LIST_URL.format(base_url=self.url, project_id=project_id, board_id=board_id)
         return self._get_list(url)
 
@@ -133,7 +139,8 @@ class Messages(recordings.RecordingEndpoint):
         if subject is False and content is False and category is False:
             raise ValueError("At least one of subject, content, and category parameters should have a value to "
                              "be changed.")
-        project_id, message_id = util.project_or_object(project, message, section_name=DOCK_NAME_MESSAGE_BOARD)
+        project_id, message_id = util.project_or_object(project, message, section_name=DOCK_NAME_MESSAGE_BOARD,
+                                                        dock_index=self._api.dock_index)
         data = {}
         if subject is not False:
             data['subject'] = "" if subject is None else subject
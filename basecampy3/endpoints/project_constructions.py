@@ -1,5 +1,15 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent import futures
+
+import six
+
 from ._base import BasecampEndpoint, BasecampObject
 from . import projects, templates
+from ..exc import ProjectCreationTimedOutError
+from ..log import logger
 
 
 class ProjectConstruction(BasecampObject):
@@ -7,14 +17,15 @@ class ProjectConstruction(BasecampObject):
     def project(self):
         """
         When the status of a Project Construction is "completed", we also get the Project data in the JSON response.
-        This allows us to construct a Project object without another hit to the API.
+        This allows us to construct a Project object without another hit to the API. It goes through the Projects
+        endpoint, so the API object's identity map and dock index see it like any other Project.
 
         :return: None if the Project isn't ready yet or a Project object if it is
         :rtype: projects.Project
         """
         if 'project' not in self._values:
             return None
-        return projects.Project(json_dict=self._values['project'], endpoint=self._endpoint._api.projects)
+        return self._endpoint._api.projects._wrap(self._values['project'])
 
     @property
     def ready(self):
@@ -30,12 +41,162 @@ class ProjectConstruction(BasecampObject):
         return int(self.id)
 
 
+class ConstructionPoller(object):
+    """
+    Polls any number of pending ProjectConstructions from one shared scheduler thread. Each construction is checked
+    after `initial_delay` seconds, and the wait before its next check is multiplied by `backoff` (up to `max_delay`)
+    every time it is still not ready. Whoever is waiting on a construction gets a `concurrent.futures.Future` that
+    resolves to the finished Project. Cancelling that future stops the construction from being polled.
+
+    The scheduler thread only runs while there is something to poll.
+    """
+
+    def __init__(self, initial_delay=0.5, max_delay=8.0, backoff=2.0):
+        """
+        :param initial_delay: seconds to wait before the first check of a new construction
+        :type initial_delay: float
+        :param max_delay: the longest wait between two checks of the same construction
+        :type max_delay: float
+        :param backoff: the wait between checks is multiplied by this after every check that was not ready
+        :type backoff: float
+        """
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self._pending = []  # heap of (next_check, tie_breaker, entry)
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def watch(self, construction, timeout=None, future=None, started=None):
+        """
+        Start polling a ProjectConstruction.
+
+        :param construction: the ProjectConstruction returned by `ProjectConstructions.create_project`
+        :type construction: ProjectConstruction
+        :param timeout: seconds until the future fails with ProjectCreationTimedOutError. None waits forever.
+        :type timeout: float
+        :param future: resolve this (still pending) future instead of creating a new one
+        :type future: concurrent.futures.Future
+        :param started: when the timeout started counting, as a `time.time()` value. Defaults to now.
+        :type started: float
+        :return: a future that resolves to the new Project
+        :rtype: concurrent.futures.Future
+        """
+        if future is None:
+            future = futures.Future()
+        if construction.ready:
+            self._resolve(future, construction)
+            return future
+
+        now = time.time()
+        if started is None:
+            started = now
+        entry = {
+            "construction": construction,
+            "future": future,
+            "delay": self.initial_delay,
+            "deadline": None if timeout is None else started + timeout,
+            "timeout": timeout,
+        }
+        with self._condition:
+            heapq.heappush(self._pending, (now + self.initial_delay, next(self._counter), entry))
+            if self._thread is None:
+                self._start_thread()
+            self._condition.notify()
+        return future
+
+    def _start_thread(self):
+        """
+        Start the scheduler thread. Called with the condition held.
+        """
+        self._thread = threading.Thread(target=self._run, name="bc3-construction-poller")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while True:
+                        if not self._pending:
+                            self._thread = None  # a later watch() starts a new thread
+                            return
+                        next_check = self._pending[0][0]
+                        wait = next_check - time.time()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    _, _, entry = heapq.heappop(self._pending)
+                self._check(entry)
+        finally:
+            with self._condition:
+                if self._thread is threading.current_thread():  # stopped by an error, not for lack of work
+                    logger.error("The project construction poller stopped unexpectedly.")
+                    self._thread = None
+                    if self._pending:
+                        self._start_thread()
+
+    def _check(self, entry):
+        """
+        Refresh one construction and either resolve its future or schedule its next check. Errors are passed to the
+        future rather than raised, so that they don't stop the scheduler thread.
+        """
+        construction = entry["construction"]
+        future = entry["future"]
+        if future.cancelled():
+            return
+        try:
+            construction.refresh()
+            if construction.ready:
+                self._resolve(future, construction)
+                return
+        except Exception as ex:
+            self._resolve(future, exception=ex)
+            return
+
+        now = time.time()
+        if entry["deadline"] is not None and now >= entry["deadline"]:
+            msg = u"Project took more than {seconds} seconds to be created.".format(seconds=entry["timeout"])
+            self._resolve(future, exception=ProjectCreationTimedOutError(message=msg))
+            return
+        entry["delay"] = min(entry["delay"] * self.backoff, self.max_delay)
+        next_check = now + entry["delay"]
+        if entry["deadline"] is not None:
+            next_check = min(next_check, entry["deadline"])
+        logger.debug("Project construction %s is %s. Checking again in %.1f seconds.",
+                     construction.id, construction.status, next_check - now)
+        with self._condition:
+            heapq.heappush(self._pending, (next_check, next(self._counter), entry))
+
+    @staticmethod
+    def _resolve(future, construction=None, exception=None):
+        """
+        Resolve a future with a finished construction's Project or with an error, unless it was cancelled.
+        """
+        if not future.set_running_or_notify_cancel():
+            return
+        if exception is None:
+            try:
+                future.set_result(construction.project)
+                return
+            except Exception as ex:
+                exception = ex
+        future.set_exception(exception)
+
+
 class ProjectConstructions(BasecampEndpoint):
     OBJECT_CLASS = ProjectConstruction
 
     PROJECT_CREATION_STATUS_URL = "{base_url}/templates/{template_id}/project_constructions/{project_construction_id}.json"
     CREATE_FROM_TEMPLATE_URL = "{base_url}/templates/{template_id}/project_constructions.json"
 
+    MAX_CONCURRENT_SUBMISSIONS = 4
+
+    def __init__(self, api):
+        super(ProjectConstructions, self).__init__(api)
+        self.poller = ConstructionPoller()
+
     def create_project(self, template, name, description=""):
         """
         Creates a new project from the given template. Requires a name and optionally a description.
@@ -83,3 +244,71 @@ class ProjectConstructions(BasecampEndpoint):
         url = self.PROJECT_CREATION_STATUS_URL.format(base_url=self.url, template_id=template,
                                                       project_construction_id=construction)
         return self._get(url)
+
+    def wait(self, construction, timeout=None):
+        """
+        Poll a ProjectConstruction on the shared scheduler. Returns a future so many constructions can be waited on at
+        once; call `.result()` on it to block until the Project is ready.
+
+        :param construction: the ProjectConstruction to poll
+        :type construction: ProjectConstruction
+        :param timeout: seconds until the future fails with ProjectCreationTimedOutError. None waits forever.
+        :type timeout: float
+        :return: a future that resolves to the new Project
+        :rtype: concurrent.futures.Future
+        """
+        return self.poller.watch(construction, timeout=timeout)
+
+    def create_projects(self, template, projects_to_create, timeout=None, max_workers=None):
+        """
+        Create many Projects from one Template at once. Construction requests are sent from a small thread pool and
+        every pending construction is then polled on the shared scheduler with exponential backoff.
+
+        ```
+        pending = bc3.project_constructions.create_projects(template, ["Client A", ("Client B", "Description")])
+        for future in concurrent.futures.as_completed(pending):
+            print(future.result().name)
+        ```
+
+        :param template: a Template object or ID
+        :type template: templates.Template|int
+        :param projects_to_create: names of the new Projects, or (name, description) tuples
+        :type projects_to_create: typing.Iterable[str|tuple[str, str]]
+        :param timeout: seconds from submission until a Project's future fails with ProjectCreationTimedOutError.
+                        None waits forever.
+        :type timeout: float
+        :param max_workers: how many construction requests to have in flight at once
+        :type max_workers: int
+        :return: one future per Project, in the same order as `projects_to_create`, each resolving to a Project.
+                 Cancelling one stops its construction from being requested or polled.
+        :rtype: list[concurrent.futures.Future]
+        """
+        if max_workers is None:
+            max_workers = self.MAX_CONCURRENT_SUBMISSIONS
+        template = int(template)
+        executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        results = []
+        for spec in projects_to_create:
+            if isinstance(spec, six.string_types):
+                name, description = spec, ""
+            else:
+                name, description = spec
+            future = futures.Future()
+            executor.submit(self._submit, future, template, name, description, timeout)
+            results.append(future)
+        executor.shutdown(wait=False)
+        return results
+
+    def _submit(self, future, template, name, description, timeout):
+        """
+        Send one construction request and hand the result to the poller. Runs in a worker thread.
+        """
+        if future.cancelled():
+            return
+        started = time.time()
+        try:
+            construction = self.create_project(template, name, description)
+        except Exception as ex:
+            ConstructionPoller._resolve(future, exception=ex)
+            return
+        self.poller.watch(construction, timeout=timeout, future=future, started=started)
@@ -1,12 +1,11 @@
 from . import _base, people, util
 from .. import constants
+from ..relations import relation
 from ..exc import *
 
 import requests
 import six
 
-import time
-
 
 @six.python_2_unicode_compatible
 class Project(_base.BasecampObject):
@@ -64,7 +63,7 @@ class Project(_base.BasecampObject):
         """
         self._endpoint.update(self.id, name=name, description=description)
 
-    @property
+    @relation
     def campfire(self):
         """
         :return: the Campfire object associated with this Project.
@@ -73,7 +72,7 @@ class Project(_base.BasecampObject):
         section = self._get_dock_section(constants.DOCK_NAME_CAMPFIRE)
         return self._endpoint._api.campfires.get(campfire=section['id'], project=self.id)
 
-    @property
+    @relation
     def message_board(self):
         """
         :return: the MessageBoard object associated with this Project
@@ -82,7 +81,7 @@ class Project(_base.BasecampObject):
         section = self._get_dock_section(constants.DOCK_NAME_MESSAGE_BOARD)
         return self._endpoint._api.message_boards.get(board=section['id'], project=self.id)
 
-    @property
+    @relation
     def todoset(self):
         """
         :return: the TodoSet object associated with this Project
@@ -91,15 +90,73 @@ class Project(_base.BasecampObject):
         section = self._get_dock_section(constants.DOCK_NAME_TODOS)
         return self._endpoint._api.todosets.get(todoset=section['id'], project=self.id)
 
-    @property
+    def iter_all_todos(self, status=None, completed=False, max_workers=None, dedupe=True, annotate=True):
+        """
+        Every TodoItem in this Project. The TodoSet is taken from the dock rather than fetched, so this starts straight
+        away with listing TodoLists. See `basecampy3.endpoints.todosets.TodoWalker` for details.
+
+        :param status: set this to "archived" or "trashed" for only TodoItems that match that status
+        :type status: str
+        :param completed: True for only completed TodoItems, False (the default) for only incomplete ones, or None for
+                          both
+        :type completed: bool|None
+        :param max_workers: the maximum number of listings to have in flight at once
+        :type max_workers: int
+        :param dedupe: skip TodoItems that were already yielded
+        :type dedupe: bool
+        :param annotate: set `todolist` and `todolist_group` on each TodoItem to the objects it was listed under
+        :type annotate: bool
+        :return: an iterable TodoWalker producing TodoItems
+        :rtype: basecampy3.endpoints.todosets.TodoWalker
+        """
+        section = self._get_dock_section(constants.DOCK_NAME_TODOS)
+        if section is None:
+            return iter(())
+        todosets = self._endpoint._api.todosets
+        todoset = todosets.OBJECT_CLASS(dict(section, bucket={"id": self.id, "name": self.name, "type": "Project"}),
+                                        todosets)
+        return todoset.iter_all_todos(status=status, completed=completed, max_workers=max_workers, dedupe=dedupe,
+                                      annotate=annotate)
+
+    @relation
+    def vault(self):
+        """
+        :return: the root Vault ("Docs & Files") associated with this Project
+        :rtype: basecampy3.endpoints.vaults.Vault
+        """
+        section = self._get_dock_section(constants.DOCK_NAME_VAULT)
+        return self._endpoint._api.vaults.get(vault=section['id'], project=self.id)
+
+    @relation
     def people(self):
         """
         A list of people who currently have access to this Project.
 
         :return: a list of Person objects
-        :rtype: collections.Iterable[basecampy3.endpoints.people.Person]
+        :rtype: list[basecampy3.endpoints.people.Person]
+        """
+        return list(self._endpoint._api.people.list(project=self.id))
+
+    def export(self, path, max_workers=None, comments=True, resume=True, compress=None):
+        """
+        Write everything in this Project to a JSON Lines file. See `basecampy3.export.ProjectExporter` for details.
+
+        :param path: the file to write to. It is gzip-compressed if it ends with ".gz".
+        :type path: str
+        :param max_workers: the maximum number of listings to have in flight at once
+        :type max_workers: int
+        :param comments: whether to export comments
+        :type comments: bool
+        :param resume: carry on from an interrupted export to the same `path`. Otherwise, start over.
+        :type resume: bool
+        :param compress: gzip the output regardless of the file extension (True) or never (False)
+        :type compress: bool
+        :return: how many records were written
+        :rtype: int
         """
-        return self._endpoint._api.people.list(project=self.id)
+        from ..export import ProjectExporter
+        return ProjectExporter(self, path, max_workers=max_workers, comments=comments, resume=resume,
+                               compress=compress).run()
 
     def list_answers_in_question(self, question):
         """
@@ -175,7 +232,7 @@ class Projects(_base.BasecampEndpoint):
         project = int(project)
         url = self.MODIFY_ACCESS_URL.format(base_url=self.url, project_id=project)
         resp = self._api._session.put(url, json=data)
-        result = resp.json()
+        result = self._json(resp)
         new_user = people.Person(json_dict=result['granted'][0], endpoint=self._api.people)
         return new_user
 
@@ -374,6 +431,7 @@ class Projects(_base.BasecampEndpoint):
         project = int(project)
         url = self.TRASH_URL.format(base_url=self.url, project_id=project)
         self._delete(url)
+        self._api.dock_index.invalidate(project)
 
     def update(self, project, name=False, description=False):
         """
@@ -401,7 +459,7 @@ class Projects(_base.BasecampEndpoint):
     def _create_from_template(self, name, description, template, timeout=CREATION_FROM_TEMPLATE_TIMEOUT):
         """
         Synchronously creates a Project from a Template, handling the polling of a ProjectConstruction object so that
-        the user doesn't have to.
+        the user doesn't have to. Polling backs off exponentially on the shared ConstructionPoller.
 
         If a Project is not finished being created before the end of `timeout`, ProjectCreationTimedOutError is raised.
 
@@ -418,15 +476,13 @@ class Projects(_base.BasecampEndpoint):
         """
         creation_status = self._api.project_constructions.create_project(template=template, name=name,
                                                                          description=description)
-        counter = 0
-        # usually projects get created pretty fast. Pause for 1 second before checking again.
-        while not creation_status.ready:
-            time.sleep(1)
-            creation_status.refresh()
-            counter += 1
-            if counter >= timeout:
-                msg = u"Project took more than " \
-                      u"{seconds} seconds to be created.".format(seconds=timeout)
-                ex = ProjectCreationTimedOutError(message=msg)
-                raise ex
-        return creation_status.project
+        return self._api.project_constructions.wait(creation_status, timeout=timeout).result()
+
+    def _wrap(self, json_dict, object_class=None):
+        """
+        Wrap a Project as usual, adding its dock to the API object's DockIndex along the way.
+        """
+        item = super(Projects, self)._wrap(json_dict, object_class)
+        if isinstance(item, Project):
+            self._api.dock_index.record(json_dict)
+        return item
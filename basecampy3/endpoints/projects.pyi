@@ -1,10 +1,10 @@
 import datetime
-from typing import ClassVar, Iterable, NoReturn, Optional, Type, Union
+from typing import ClassVar, Iterable, List, NoReturn, Optional, Type, Union
 
 import re
 import requests
 
-from . import _base, answers, campfires, message_boards, people, templates, todosets
+from . import _base, answers, campfires, message_boards, people, templates, todos, todosets, vaults
 from ..exc import *
 
 
@@ -42,8 +42,18 @@ class Project(_base.BasecampObject):
     @property
     def todoset(self) -> Optional[todosets.TodoSet]: ...
 
+    def iter_all_todos(self, status: Optional[str] = None, completed: Optional[bool] = False,
+                       max_workers: Optional[int] = None, dedupe: bool = True,
+                       annotate: bool = True) -> Iterable[todos.TodoItem]: ...
+
+    @property
+    def vault(self) -> Optional[vaults.Vault]: ...
+
     @property
-    def people(self) -> Iterable[people.Person]: ...
+    def people(self) -> List[people.Person]: ...
+
+    def export(self, path: str, max_workers: Optional[int] = None, comments: bool = True, resume: bool = True,
+               compress: Optional[bool] = None) -> int: ...
 
     def list_answers_in_question(self, question: int) -> Iterable[answers.Answer]: ...
 
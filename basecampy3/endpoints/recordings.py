@@ -1,4 +1,5 @@
 from . import _base, comments
+from ..relations import relation
 
 
 class Recording(_base.RecordingBase):
@@ -23,6 +24,14 @@ class Recording(_base.RecordingBase):
             self._comments = comments.Comments(self._endpoint._api, self)
         return self._comments
 
+    @relation
+    def comment_list(self):
+        """
+        :return: the active comments on this Recording. `comments.list()` fetches them again every time.
+        :rtype: list[basecampy3.endpoints.comments.Comment]
+        """
+        return list(self.comments.list())
+
 
 class RecordingEndpoint(_base.RecordingEndpointBase):
     OBJECT_CLASS = Recording
@@ -0,0 +1,58 @@
+"""
+Maps the "type" field found in Basecamp 3 JSON to the BasecampObject subclass and endpoint that represent it. Used
+when JSON arrives from somewhere other than an endpoint call (i.e. a webhook payload or the cross-project recordings
+list) and we still want the proper object back.
+"""
+
+from . import (_base, answers, campfire_lines, campfires, comments, documents, message_boards, messages, projects,
+               recordings, todolists, todos, todosets, uploads, vaults)
+
+
+RECORDING_TYPES = {
+    "Chat::Lines::RichText": ("campfire_lines", campfire_lines.CampfireLine),
+    "Chat::Lines::Text": ("campfire_lines", campfire_lines.CampfireLine),
+    "Chat::Transcript": ("campfires", campfires.Campfire),
+    "Comment": (None, comments.Comment),
+    "Document": ("documents", documents.Document),
+    "Message": ("messages", messages.Message),
+    "Message::Board": ("message_boards", message_boards.MessageBoard),
+    "Project": ("projects", projects.Project),
+    "Question::Answer": ("answers", answers.Answer),
+    "Todo": ("todos", todos.TodoItem),
+    "Todolist": ("todolists", todolists.TodoList),
+    "Todoset": ("todosets", todosets.TodoSet),
+    "Upload": ("uploads", uploads.Upload),
+    "Vault": ("vaults", vaults.Vault),
+}
+"""
+Basecamp "type" -> (name of the endpoint attribute on Basecamp3, BasecampObject subclass). An endpoint name of None
+means there is no standalone endpoint for that type and a generic RecordingEndpoint is used instead.
+"""
+
+
+def object_from_json(json_dict, api=None):
+    """
+    Wrap a parsed JSON dictionary in the BasecampObject subclass matching its "type" field. Unknown types become a
+    generic Recording if they belong to a Project, or a plain BasecampObject otherwise.
+
+    :param json_dict: a dictionary representing the parsed JSON of a single Basecamp object
+    :type json_dict: dict
+    :param api: the Basecamp3 object to bind the new object to. Without one, the object's fields can be read but
+                methods that call the API will not work.
+    :type api: basecampy3.bc3_api.Basecamp3
+    :return: the JSON wrapped in an appropriate BasecampObject
+    :rtype: _base.BasecampObject
+    """
+    endpoint_name, object_class = RECORDING_TYPES.get(json_dict.get("type"), (None, None))
+    if object_class is None:
+        object_class = recordings.Recording if "bucket" in json_dict else _base.BasecampObject
+
+    endpoint = None
+    if api is not None:
+        if endpoint_name is not None:
+            endpoint = getattr(api, endpoint_name)
+        else:
+            endpoint = recordings.RecordingEndpoint(api)
+        if api.identity_map is not None:
+            return api.identity_map.wrap(object_class, json_dict, endpoint)
+    return object_class(json_dict, endpoint)
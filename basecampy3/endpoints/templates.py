@@ -11,6 +11,19 @@ class Template(BasecampObject):
     def create_project(self, name, description=""):
         return self._endpoint._api.project_constructions.create_project(self, name, description)
 
+    def create_projects(self, projects_to_create, timeout=None):
+        """
+        Create many Projects from this Template at once. See `ProjectConstructions.create_projects`.
+
+        :param projects_to_create: names of the new Projects, or (name, description) tuples
+        :type projects_to_create: typing.Iterable[str|tuple[str, str]]
+        :param timeout: seconds until a Project's future fails with ProjectCreationTimedOutError
+        :type timeout: float
+        :return: one future per Project, each resolving to a Project
+        :rtype: list[concurrent.futures.Future]
+        """
+        return self._endpoint._api.project_constructions.create_projects(self, projects_to_create, timeout=timeout)
+
     def trash(self):
         return self._endpoint.trash(self)
 
@@ -131,7 +131,8 @@ class TodoLists(recordings.RecordingEndpoint):
         params = {}
         if status is not None:
             params['status'] = status
-        project_id, todoset_id = util.project_or_object(project, todoset, section_name=constants.DOCK_NAME_TODOS)
+        project_id, todoset_id = util.project_or_object(project, todoset, section_name=constants.DOCK_NAME_TODOS,
+                                                        dock_index=self._api.dock_index)
         url = self.LIST_URL.format(base_url=self.url, project_id=project_id, todoset_id=todoset_id)
         return self._get_list(url, params=params)
 
@@ -165,7 +166,8 @@ class TodoLists(recordings.RecordingEndpoint):
         :return: a new TodoList object
         :rtype: TodoList
         """
-        project_id, todoset_id = util.project_or_object(project, todoset, section_name=constants.DOCK_NAME_TODOS)
+        project_id, todoset_id = util.project_or_object(project, todoset, section_name=constants.DOCK_NAME_TODOS,
+                                                        dock_index=self._api.dock_index)
         data = {
             "name": name,
             "description": description
@@ -35,6 +35,107 @@ class TodoSet(_base.BasecampObject):
         """
         return self._endpoint._api.todolists.list(todoset=self)
 
+    def iter_all_todos(self, status=None, completed=False, max_workers=None, dedupe=True, annotate=True):
+        """
+        Every TodoItem in every TodoList and TodoListGroup in this TodoSet. See `TodoWalker` for details.
+
+        :param status: set this to "archived" or "trashed" for only TodoItems that match that status
+        :type status: str
+        :param completed: True for only completed TodoItems, False (the default) for only incomplete ones, or None for
+                          both
+        :type completed: bool|None
+        :param max_workers: the maximum number of listings to have in flight at once
+        :type max_workers: int
+        :param dedupe: skip TodoItems that were already yielded
+        :type dedupe: bool
+        :param annotate: set `todolist` and `todolist_group` on each TodoItem to the objects it was listed under
+        :type annotate: bool
+        :return: an iterable TodoWalker producing TodoItems
+        :rtype: TodoWalker
+        """
+        return TodoWalker(self, status=status, completed=completed, max_workers=max_workers, dedupe=dedupe,
+                          annotate=annotate)
+
+
+class TodoWalker(object):
+    """
+    Yields every TodoItem in a TodoSet: the TodoItems directly in each TodoList and the ones in each of its
+    TodoListGroups. The TodoLists and TodoListGroups themselves are the active ones.
+
+    Listings are fetched in a thread pool. The TodoLists, each TodoList's TodoItems and TodoListGroups, and each
+    TodoListGroup's TodoItems are all separate listings; at most `max_workers` of them are in flight at any one time,
+    and TodoItems are yielded as soon as the listing they came from completes.
+
+    With `annotate`, each TodoItem gets a `todolist` attribute (the TodoList it is in) and a `todolist_group`
+    attribute (its TodoListGroup, or None), so reports don't need to look them up again.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(self, todoset, status=None, completed=False, max_workers=None, dedupe=True, annotate=True):
+        """
+        :param todoset: the TodoSet to list the TodoItems of
+        :type todoset: TodoSet
+        :param status: set this to "archived" or "trashed" for only TodoItems that match that status
+        :type status: str
+        :param completed: True for only completed TodoItems, False for only incomplete ones, or None for both
+        :type completed: bool|None
+        :param max_workers: the maximum number of listings to have in flight at once
+        :type max_workers: int
+        :param dedupe: skip TodoItems that were already yielded
+        :type dedupe: bool
+        :param annotate: set `todolist` and `todolist_group` on each TodoItem
+        :type annotate: bool
+        """
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.todoset = todoset
+        self.status = status
+        self.completed = (False, True) if completed is None else (completed,)
+        self.max_workers = max_workers
+        self.dedupe = dedupe
+        self.annotate = annotate
+
+    def __iter__(self):
+        seen = set()
+
+        def expand(task, items):
+            kind, todolist, group, _ = task
+            if kind == "todolists":
+                children = []
+                for child in items:
+                    children.append(("groups", child, None, None))
+                    children.extend(("todos", child, None, c) for c in self.completed)
+                return children, ()
+            if kind == "groups":
+                return [("todos", todolist, child, c) for child in items for c in self.completed], ()
+            todos = []
+            for todo in items:
+                if self.dedupe:
+                    if todo.id in seen:
+                        continue
+                    seen.add(todo.id)
+                if self.annotate:
+                    todo.todolist = todolist
+                    todo.todolist_group = group
+                todos.append(todo)
+            return (), todos
+
+        return _base._bounded_crawl([("todolists", None, None, None)], lambda task: self._list(*task), expand,
+                                    self.max_workers)
+
+    def _list(self, kind, todolist, group, completed):
+        """
+        Fetch every page of one listing. Runs in a worker thread.
+        """
+        if kind == "todolists":
+            return list(self.todoset.list())
+        if kind == "groups":
+            return list(todolist.list_groups())
+        return list((group or todolist).list(status=self.status, completed=completed))
+
 
 class TodoSets(_base.BasecampEndpoint):
     OBJECT_CLASS = TodoSet
@@ -52,6 +153,7 @@ class TodoSets(_base.BasecampEndpoint):
         :return: a TodoSet object
         :rtype: TodoSet
         """
-        project_id, todoset_id = util.project_or_object(project, todoset, section_name=constants.DOCK_NAME_TODOS)
+        project_id, todoset_id = util.project_or_object(project, todoset, section_name=constants.DOCK_NAME_TODOS,
+                                                        dock_index=self._api.dock_index)
         url = self.GET_URL.format(base_url=self.url, project_id=project_id, todoset_id=todoset_id)
         return self._get(url)
@@ -0,0 +1,36 @@
+"""
+Uploads
+https://github.com/basecamp/bc3-api/blob/master/sections/uploads.md
+
+Files uploaded to a Vault (the "Docs & Files" section of a Project).
+"""
+
+from . import recordings, vaults
+
+
+class Upload(recordings.Recording):
+    def __str__(self):
+        try:
+            return "Upload {0.id}: '{0.filename}'".format(self)
+        except Exception:
+            return super(Upload, self).__str__()
+
+
+class Uploads(vaults.VaultContentsEndpoint):
+    OBJECT_CLASS = Upload
+
+    GET_URL = "{base_url}/buckets/{project_id}/uploads/{recording_id}.json"
+    LIST_URL = "{base_url}/buckets/{project_id}/vaults/{vault_id}/uploads.json"
+
+    def get(self, upload, project=None):
+        """
+        Get an Upload by its ID and a Project's ID or just an Upload object.
+
+        :param upload: an Upload object or ID
+        :type upload: Upload|int
+        :param project: a Project object or ID (optional if `upload` is an object)
+        :type project: basecampy3.endpoints.projects.Project|int
+        :return: an Upload object
+        :rtype: Upload
+        """
+        return self._get_contents(upload, project)
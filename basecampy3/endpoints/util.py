@@ -1,11 +1,12 @@
-def project_or_object(project=None, basecamp_object=None, section_name=None):
+def project_or_object(project=None, basecamp_object=None, section_name=None, dock_index=None):
     """
     The purpose of this function is to provide a Project ID and Object ID given certain kinds of information or to raise
     the appropriate error if the information given isn't enough.
 
     Given a project object or ID and/or basecamp_object or ID, determines if the ID for both can be found.
     If `project` is an object and `section_name` is given, the ID of the `basecamp_object` can be determined by
-    searching the Project object's `dock` list.
+    searching the Project object's `dock` list. If `project` is only an ID, the section is found in `dock_index`
+    instead.
 
     If a `basecamp_object` is given, the Project ID can be found by looking at its "bucket" dictionary.
 
@@ -23,6 +24,9 @@ def project_or_object(project=None, basecamp_object=None, section_name=None):
                                 or both `project` and `basecamp_object` are IDs
     :type section_name:     str
 
+    :param dock_index:      the client's index of Project docks, to find the section in when `project` is an ID
+    :type dock_index:       basecampy3.dock_index.DockIndex
+
     :return:                a tuple where the first element is the Project's ID and the second element is the
                                 Basecamp Object's ID
     :rtype:                 (int, int)
@@ -37,6 +41,8 @@ def project_or_object(project=None, basecamp_object=None, section_name=None):
             raise ValueError("To find an object's ID with only a Project given, you must specify the section's name "
                              "as it appears in the Project's dock. (i.e. todoset, chat, schedule, vault, inbox, "
                              "message_board)")
+        if dock_index is not None and not hasattr(project, "dock"):
+            return int(project), dock_index.section_id(project, section_name)
         for section in project.dock:
             if section['name'] == section_name:
                 object_id = section['id']
@@ -0,0 +1,241 @@
+"""
+Vaults
+https://github.com/basecamp/bc3-api/blob/master/sections/vaults.md
+
+Folders in the "Docs & Files" section of a Project. Every Project has one root Vault in its dock. Vaults can contain
+Documents, Uploads, and other Vaults.
+"""
+
+from . import _base, recordings, util
+from .. import constants
+
+
+class Vault(recordings.Recording):
+    def list_documents(self):
+        """
+        :return: the Documents directly inside this Vault
+        :rtype: collections.Iterable[basecampy3.endpoints.documents.Document]
+        """
+        return self._endpoint._api.documents.list(project=self.project_id, vault=self)
+
+    def list_uploads(self):
+        """
+        :return: the Uploads directly inside this Vault
+        :rtype: collections.Iterable[basecampy3.endpoints.uploads.Upload]
+        """
+        return self._endpoint._api.uploads.list(project=self.project_id, vault=self)
+
+    def list_vaults(self):
+        """
+        :return: the Vaults directly inside this Vault
+        :rtype: collections.Iterable[Vault]
+        """
+        return self._endpoint.list(project=self.project_id, vault=self)
+
+    def walk(self, max_workers=None, previous_state=None):
+        """
+        Crawl this Vault and every Vault nested under it. See `VaultWalker` for details.
+
+        :param max_workers: the maximum number of folder listings to have in flight at once
+        :type max_workers: int
+        :param previous_state: the `state` of an earlier VaultWalker. The Documents and Uploads of Vaults that have
+                               not changed since then are not listed again.
+        :type previous_state: dict
+        :return: an iterable VaultWalker producing (path, Document or Upload) tuples
+        :rtype: VaultWalker
+        """
+        return VaultWalker(self, max_workers=max_workers, previous_state=previous_state)
+
+    def __str__(self):
+        try:
+            return "Vault {0.id}: '{0.title}'".format(self)
+        except Exception:
+            return super(Vault, self).__str__()
+
+
+class VaultWalker(object):
+    """
+    Crawls a tree of Vaults breadth-first, yielding a `(path, item)` tuple for every Document and Upload found. `path`
+    is the titles of the Vaults leading to the item joined with "/", starting with the root Vault's title.
+
+    Folder listings are fetched in a thread pool. At most `max_workers` listings are in flight at any one time, and
+    entries are yielded as soon as the listing they came from completes, so the whole tree is never held in memory.
+
+    After iterating, `state` holds a JSON-serializable snapshot of every Vault seen. Pass it as `previous_state` to a
+    later VaultWalker for an incremental crawl that only yields the contents of Vaults whose `updated_at` or child
+    counts changed. The Vaults inside every Vault are still listed, since a change deep in the tree does not touch the
+    Vaults above it, but those listings are usually answered with "304 Not Modified" from the cache.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+    PATH_SEPARATOR = "/"
+
+    _CHILD_KINDS = ("vaults", "documents", "uploads")
+
+    def __init__(self, root, max_workers=None, previous_state=None):
+        """
+        :param root: the Vault to start crawling from
+        :type root: Vault
+        :param max_workers: the maximum number of folder listings to have in flight at once
+        :type max_workers: int
+        :param previous_state: the `state` of an earlier VaultWalker of the same tree
+        :type previous_state: dict
+        """
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.root = root
+        self.max_workers = max_workers
+        self.state = {}
+        self._previous_state = previous_state or {}
+
+    def __iter__(self):
+        api = self.root._endpoint._api
+        endpoints = {
+            "vaults": api.vaults,
+            "documents": api.documents,
+            "uploads": api.uploads,
+        }
+
+        self._remember(self.root, parent_id=None)
+
+        def expand(task, items):
+            kind, path, vault = task
+            if kind != "vaults":
+                return (), ((path, item) for item in items)
+            children = []
+            for child in items:
+                self._remember(child, parent_id=vault.id)
+                children.extend(self._listings(child, self.PATH_SEPARATOR.join((path, child.title))))
+            return children, ()
+
+        for entry in _base._bounded_crawl(self._listings(self.root, self.root.title),
+                                          lambda task: self._list(endpoints[task[0]], task[2]), expand,
+                                          self.max_workers):
+            yield entry
+
+    @staticmethod
+    def _list(endpoint, vault):
+        """
+        Fetch every page of one listing. Runs in a worker thread.
+        """
+        return list(endpoint.list(project=vault.project_id, vault=vault))
+
+    def _listings(self, vault, path):
+        """
+        The listings needed to see the contents of `vault`. Listings whose count is known to be zero are skipped
+        since they would only cost a request, and so are the Documents and Uploads of a Vault unchanged since the
+        previous crawl.
+        """
+        unchanged = self._is_unchanged(vault)
+        for kind in self._CHILD_KINDS:
+            if vault._values.get("%s_count" % kind) == 0:
+                continue
+            if unchanged and kind != "vaults":
+                continue
+            yield kind, path, vault
+
+    @staticmethod
+    def _signature(vault):
+        values = vault._values
+        return [values.get("updated_at"), values.get("vaults_count"),
+                values.get("documents_count"), values.get("uploads_count")]
+
+    def _is_unchanged(self, vault):
+        previous = self._previous_state.get(str(vault.id))
+        return previous is not None and previous["signature"] == self._signature(vault)
+
+    def _remember(self, vault, parent_id):
+        self.state[str(vault.id)] = {"signature": self._signature(vault), "parent": parent_id}
+
+
+class VaultContentsEndpoint(recordings.RecordingEndpoint):
+    """
+    The shared base of the endpoints for recordings kept in Vaults (Documents and Uploads). Subclasses set `GET_URL`
+    with a `{recording_id}` placeholder and `LIST_URL` with a `{vault_id}` placeholder.
+    """
+
+    def list(self, project=None, vault=None):
+        """
+        Get the recordings of this kind directly inside the given Vault. Those in nested Vaults are not included.
+
+        :param project: a Project object or ID
+        :type project: basecampy3.endpoints.projects.Project|int
+        :param vault: a Vault object or ID (optional if `project` is a Project object)
+        :type vault: Vault|int
+        :return: a generator of recordings of this endpoint's `OBJECT_CLASS`
+        :rtype: collections.Iterable[recordings.Recording]
+        """
+        project_id, vault_id = util.project_or_object(project, vault, section_name=constants.DOCK_NAME_VAULT,
+                                                      dock_index=self._api.dock_index)
+        url = self.LIST_URL.format(base_url=self.url, project_id=project_id, vault_id=vault_id)
+        return self._get_list(url)
+
+    def _get_contents(self, recording, project=None):
+        """
+        Get one recording by its ID and a Project's ID or just the recording object.
+        """
+        project_id, recording_id = util.project_or_object(project, recording)
+        url = self.GET_URL.format(base_url=self.url, project_id=project_id, recording_id=recording_id)
+        return self._get(url)
+
+
+class Vaults(recordings.RecordingEndpoint):
+    OBJECT_CLASS = Vault
+
+    GET_URL = "{base_url}/buckets/{project_id}/vaults/{vault_id}.json"
+    LIST_URL = "{base_url}/buckets/{project_id}/vaults/{vault_id}/vaults.json"
+
+    def get(self, project=None, vault=None):
+        """
+        Get a Vault either from a Project ID and a Vault ID or just a Project object (which gets the Project's root
+        "Docs & Files" Vault).
+
+        :param project: a Project object or ID
+        :type project: basecampy3.endpoints.projects.Project|int
+        :param vault: a Vault object or ID
+        :type vault: Vault|int
+        :return: a Vault object
+        :rtype: Vault
+        """
+        project_id, vault_id = util.project_or_object(project, vault, section_name=constants.DOCK_NAME_VAULT,
+                                                      dock_index=self._api.dock_index)
+        url = self.GET_URL.format(base_url=self.url, project_id=project_id, vault_id=vault_id)
+        return self._get(url)
+
+    def list(self, project=None, vault=None):
+        """
+        Get the Vaults directly inside the given Vault.
+
+        :param project: a Project object or ID
+        :type project: basecampy3.endpoints.projects.Project|int
+        :param vault: the parent Vault object or ID (optional if `project` is a Project object)
+        :type vault: Vault|int
+        :return: a generator of Vault objects
+        :rtype: collections.Iterable[Vault]
+        """
+        project_id, vault_id = util.project_or_object(project, vault, section_name=constants.DOCK_NAME_VAULT,
+                                                      dock_index=self._api.dock_index)
+        url = self.LIST_URL.format(base_url=self.url, project_id=project_id, vault_id=vault_id)
+        return self._get_list(url)
+
+    def walk(self, project=None, vault=None, max_workers=None, previous_state=None):
+        """
+        Crawl a Vault and every Vault nested under it, yielding a `(path, item)` tuple for each Document and Upload.
+        If only a Project object is given, the Project's root "Docs & Files" Vault is crawled.
+
+        :param project: a Project object or ID
+        :type project: basecampy3.endpoints.projects.Project|int
+        :param vault: a Vault object or ID to start from
+        :type vault: Vault|int
+        :param max_workers: the maximum number of folder listings to have in flight at once
+        :type max_workers: int
+        :param previous_state: the `state` of an earlier VaultWalker. The contents of unchanged Vaults are skipped.
+        :type previous_state: dict
+        :return: an iterable VaultWalker
+        :rtype: VaultWalker
+        """
+        if not isinstance(vault, Vault):
+            vault = self.get(project=project, vault=vault)
+        return vault.walk(max_workers=max_workers, previous_state=previous_state)
@@ -36,6 +36,10 @@ class ProjectCreationTimedOutError(Basecamp3Error):
     pass
 
 
+class CampfireQueueFullError(Basecamp3Error):
+    pass
+
+
 class NoDefaultConfigurationFound(Basecamp3Error):
     def __init__(self, response=None, message=None):
         super(NoDefaultConfigurationFound, self).__init__(response, message)
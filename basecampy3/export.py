@@ -0,0 +1,234 @@
+"""
+Exports everything in a Project to a JSON Lines file, optionally gzip-compressed.
+
+The Project's dock (to-dos, message board, Campfire, schedule, Docs & Files, check-ins and email forwards) is crawled
+by following the listings of child recordings found on every recording (i.e. `todolists_url`, `todos_url`,
+`comments_url`). Other `*_url` keys, like a to-do's `completion_url`, are not listings and are left alone.
+
+```
+exporter = ProjectExporter(project, "marketing.jsonl.gz")
+count = exporter.run()
+```
+"""
+import gzip
+import io
+import json
+import os
+import re
+from collections import deque
+
+import six
+from six.moves.urllib_parse import urlencode
+
+from .endpoints._base import _bounded_crawl
+from .exc import Basecamp3Error
+from .log import logger
+from .rated_semaphore import BULK, priority
+
+
+class ProjectExporter(object):
+    """
+    Writes every recording in a Project, one JSON object per line, starting with the Project itself. Only active
+    recordings are exported (plus completed to-dos), since that is what Basecamp's listings return.
+
+    Listings are fetched in a thread pool. At most `max_workers` listings are in flight at any one time, and each is
+    written out as soon as it completes, so the Project is never held in memory.
+
+    Progress is kept in a journal next to the export (`path` + ".journal"). If an export is interrupted, running it
+    again with `resume=True` carries on from the last listing that was completely written. The journal is removed once
+    the export finishes.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+    JOURNAL_SUFFIX = ".journal"
+
+    LISTING_URL_KEYS = frozenset(("todolists_url", "todos_url", "groups_url", "comments_url", "messages_url",
+                                  "lines_url", "entries_url", "questions_url", "answers_url", "vaults_url",
+                                  "documents_url", "uploads_url", "forwards_url", "replies_url"))
+    """`*_url` keys that point to a listing of child recordings."""
+
+    EXTRA_LISTINGS = {
+        "todos_url": ({"completed": "true"},),
+    }
+    """Listings that need fetching again with other parameters to get everything (completed to-dos are separate)."""
+
+    _LINK_HEADER_URL_REGEX = re.compile(r'<(https?.+)>')
+
+    def __init__(self, project, path, max_workers=None, comments=True, resume=True, compress=None):
+        """
+        :param project: the Project to export
+        :type project: basecampy3.endpoints.projects.Project
+        :param path: the file to write to
+        :type path: str
+        :param max_workers: the maximum number of listings to have in flight at once
+        :type max_workers: int
+        :param comments: whether to export comments
+        :type comments: bool
+        :param resume: carry on from an interrupted export to the same `path`. Otherwise, start over.
+        :type resume: bool
+        :param compress: gzip the output. By default, it is compressed if `path` ends with ".gz".
+        :type compress: bool
+        """
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if compress is None:
+            compress = path.endswith(".gz")
+        self.project = project
+        self.path = path
+        self.journal_path = path + self.JOURNAL_SUFFIX
+        self.max_workers = max_workers
+        self.comments = comments
+        self.resume = resume
+        self.compress = compress
+        self._session = project._endpoint._api._session
+        self._decode = project._endpoint._api.json_decoder
+
+    def run(self):
+        """
+        Export the Project.
+
+        :return: how many records were written by this run
+        :rtype: int
+        """
+        done, pending, offset = self._load_journal() if self.resume else (set(), None, 0)
+        if pending is not None and (not os.path.exists(self.path) or os.path.getsize(self.path) < offset):
+            logger.warning("%s is missing or shorter than its journal says, so the export is starting over.",
+                           self.path)
+            done, pending, offset = set(), None, 0
+        if pending is None:  # starting over
+            offset = 0
+            pending = deque(self._listings(self.project._values))
+            records = [self.project._values]
+        else:
+            logger.info("Resuming the export of %s: %d listings done, %d to go.", self.project, len(done),
+                        len(pending))
+            records = None
+
+        count = 0
+        mode = "r+b" if offset else "wb"
+        with io.open(self.path, mode) as output, io.open(self.journal_path, "ab" if offset else "wb") as journal:
+            output.seek(offset)
+            output.truncate()
+            if records is not None:
+                offset = self._write(output, records)
+                self._journal(journal, None, offset, list(pending))
+                count += len(records)
+
+            written = [count]
+
+            def unstarted(urls):
+                fresh = []
+                for url in urls:
+                    if url not in done:
+                        done.add(url)
+                        fresh.append(url)
+                return fresh
+
+            def expand(url, records):
+                children = [child for record in records for child in self._listings(record)]
+                offset = self._write(output, records)
+                self._journal(journal, url, offset, children)
+                written[0] += len(records)
+                return unstarted(children), ()
+
+            for _ in _bounded_crawl(unstarted(pending), self._fetch, expand, self.max_workers):
+                pass
+            count = written[0]
+
+        os.remove(self.journal_path)
+        return count
+
+    def _fetch(self, url):
+        """
+        Fetch every page of one listing (or a single recording). Runs in a worker thread, as BULK priority so that an
+        export does not hold up other requests.
+        """
+        records = []
+        while url:
+            with priority(BULK):
+                resp = self._session.get(url)
+            if not resp.ok:
+                raise Basecamp3Error(response=resp)
+            data = self._decode(resp.content)
+            if isinstance(data, dict):
+                return [data]
+            records.extend(data)
+            link_header = resp.headers.get("Link")
+            url = self._LINK_HEADER_URL_REGEX.findall(link_header)[0] if link_header else None
+        return records
+
+    def _listings(self, record):
+        """
+        The URLs to fetch to export everything under a record. Listings whose count is known to be zero are skipped
+        since they would only cost a request.
+        """
+        urls = [tool["url"] for tool in record.get("dock", ()) if tool.get("enabled", True) and tool.get("url")]
+        for key, value in record.items():
+            if key not in self.LISTING_URL_KEYS:
+                continue
+            if not isinstance(value, six.string_types) or not value.endswith(".json"):
+                continue
+            if key == "comments_url" and not self.comments:
+                continue
+            if record.get(key[:-len("_url")] + "_count") == 0:
+                continue
+            urls.append(value)
+            for params in self.EXTRA_LISTINGS.get(key, ()):
+                urls.append("%s?%s" % (value, urlencode(sorted(params.items()))))
+        return urls
+
+    def _write(self, output, records):
+        """
+        Append records to the export and flush them to disk.
+
+        :return: the size of the export afterwards
+        :rtype: int
+        """
+        data = b"".join(json.dumps(record, sort_keys=True).encode("utf-8") + b"\n" for record in records)
+        if self.compress:
+            # each batch is its own gzip member so that the file can be truncated back to any batch when resuming
+            buf = io.BytesIO()
+            with gzip.GzipFile(fileobj=buf, mode="wb") as gz:
+                gz.write(data)
+            data = buf.getvalue()
+        output.write(data)
+        output.flush()
+        os.fsync(output.fileno())
+        return output.tell()
+
+    @staticmethod
+    def _journal(journal, url, offset, children):
+        """
+        Note that a listing was written completely, where the export ended after it, and what it leads to.
+        """
+        entry = {"url": url, "offset": offset, "children": children}
+        journal.write(json.dumps(entry).encode("utf-8") + b"\n")
+        journal.flush()
+
+    def _load_journal(self):
+        """
+        :return: the listings already written, the listings still to fetch (None if there is nothing to resume), and
+                 the size of the export after the last completely written listing
+        :rtype: (set[str], deque[str]|None, int)
+        """
+        done = set()
+        discovered = []
+        offset = 0
+        try:
+            with io.open(self.journal_path, "rb") as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line.decode("utf-8"))
+                    except ValueError:
+                        break  # cut off by the interruption
+                    if entry["url"] is not None:
+                        done.add(entry["url"])
+                    discovered.extend(entry["children"])
+                    offset = entry["offset"]
+        except IOError:
+            return done, None, 0
+        if not offset:
+            return set(), None, 0
+        return done, deque(url for url in discovered if url not in done), offset
@@ -0,0 +1,152 @@
+"""
+Freshness policies let GET requests be answered straight from the response cache instead of waiting on Basecamp.
+
+A `FreshnessPolicy(max_age=30)` means: if the cached response is younger than 30 seconds, use it without asking
+Basecamp at all. If it is older, use it anyway and revalidate it in the background, so the next caller gets a fresher
+copy. `stale_while_revalidate` limits how old a response can be and still be served while revalidating; past that,
+callers wait for Basecamp as usual.
+
+Policies can be given for every request (`Basecamp3(freshness=FreshnessPolicy(30))`), per endpoint
+(`Basecamp3(freshness={"/projects.json": FreshnessPolicy(300)})`), or for the calls made inside a `with` block:
+
+```
+with allow_stale(max_age=30):
+    projects = list(bc3.projects.list())
+```
+"""
+import fnmatch
+import threading
+
+from .metrics import endpoint_template
+
+_local = threading.local()
+
+
+class FreshnessPolicy(object):
+    """
+    How old a cached response may be before a GET has to wait for Basecamp.
+    """
+
+    def __init__(self, max_age=0, stale_while_revalidate=None):
+        """
+        :param max_age: seconds a cached response is used as-is, without contacting Basecamp
+        :type max_age: float
+        :param stale_while_revalidate: seconds past `max_age` that a cached response is still used while a fresh one
+                                       is fetched in the background. None means no limit; 0 means never serve stale.
+        :type stale_while_revalidate: float|None
+        """
+        if max_age < 0 or (stale_while_revalidate is not None and stale_while_revalidate < 0):
+            raise ValueError("max_age and stale_while_revalidate cannot be negative")
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+
+    def is_fresh(self, age):
+        """
+        :param age: seconds since the cached response was received or last revalidated
+        :type age: float
+        :return: whether the cached response can be used without contacting Basecamp
+        :rtype: bool
+        """
+        return age < self.max_age
+
+    def can_serve_stale(self, age):
+        """
+        :param age: seconds since the cached response was received or last revalidated
+        :type age: float
+        :return: whether the cached response can be used while it is revalidated in the background
+        :rtype: bool
+        """
+        if self.stale_while_revalidate is None:
+            return True
+        return age < self.max_age + self.stale_while_revalidate
+
+    def __repr__(self):
+        return "FreshnessPolicy(max_age=%r, stale_while_revalidate=%r)" % (self.max_age, self.stale_while_revalidate)
+
+
+ALWAYS_REVALIDATE = FreshnessPolicy(0, 0)
+"""Every GET checks with Basecamp (the behavior without any policy). Useful to override a broader policy."""
+
+
+class FreshnessRules(object):
+    """
+    Chooses a FreshnessPolicy by the endpoint a URL belongs to.
+    """
+
+    def __init__(self, rules=None, default=None):
+        """
+        :param rules: (pattern, FreshnessPolicy) pairs, or a dictionary of them. Patterns are matched against the
+                      endpoint template of the URL (see `basecampy3.metrics.endpoint_template`), i.e.
+                      "/buckets/{id}/todolists/{id}/todos.json", and can use shell-style wildcards like
+                      "/buckets/*/todos/*". The first match wins.
+        :type rules: dict|list[tuple[str, FreshnessPolicy]]
+        :param default: the policy for URLs no rule matches. None means always revalidate.
+        :type default: FreshnessPolicy|None
+        """
+        if isinstance(rules, dict):
+            rules = rules.items()
+        self.rules = list(rules or ())
+        self.default = default
+
+    def policy_for(self, url):
+        """
+        :param url: the URL of a GET request
+        :type url: str
+        :return: the policy to apply to it, if any
+        :rtype: FreshnessPolicy|None
+        """
+        if not self.rules:
+            return self.default
+        template = endpoint_template(url)
+        for pattern, policy in self.rules:
+            if fnmatch.fnmatchcase(template, pattern):
+                return policy
+        return self.default
+
+    @classmethod
+    def coerce(cls, value):
+        """
+        :param value: a FreshnessRules object, a single FreshnessPolicy for every URL, a dictionary of rules, or None
+        :return: an equivalent FreshnessRules object
+        :rtype: FreshnessRules
+        """
+        if isinstance(value, FreshnessRules):
+            return value
+        if isinstance(value, FreshnessPolicy) or value is None:
+            return cls(default=value)
+        return cls(rules=value)
+
+
+class allow_stale(object):
+    """
+    Apply a FreshnessPolicy to every GET made by this thread inside a `with` block, taking precedence over the
+    policies the transport adapter was configured with.
+    """
+
+    def __init__(self, max_age=0, stale_while_revalidate=None, policy=None):
+        """
+        :param max_age: see `FreshnessPolicy`
+        :type max_age: float
+        :param stale_while_revalidate: see `FreshnessPolicy`
+        :type stale_while_revalidate: float|None
+        :param policy: use this policy instead of building one from `max_age` and `stale_while_revalidate`
+        :type policy: FreshnessPolicy
+        """
+        self.policy = policy if policy is not None else FreshnessPolicy(max_age, stale_while_revalidate)
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_local, "policy", None)
+        _local.policy = self.policy
+        return self.policy
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.policy = self._previous
+
+
+def current_policy():
+    """
+    :return: the policy set by the innermost `allow_stale` block in this thread, if any
+    :rtype: FreshnessPolicy|None
+    """
+    return getattr(_local, "policy", None)
@@ -0,0 +1,63 @@
+"""
+An optional identity map, so that each Basecamp record is one live object per client:
+
+```
+bc3 = Basecamp3(identity_map=True)
+project = bc3.projects.get(123)
+assert bc3.projects.get(123) is project
+assert any(p is project for p in bc3.projects.list())
+```
+
+Fetching a record again (by `get`, a list, or `refresh`) updates the existing object in place, so every reference to it
+sees the new values. Objects are held weakly: once nothing else refers to one, it is forgotten.
+"""
+import threading
+import weakref
+
+
+class IdentityMap(object):
+    """
+    Live BasecampObjects by their class and ID.
+    """
+
+    def __init__(self):
+        self._objects = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def wrap(self, object_class, json_dict, endpoint):
+        """
+        Get the live object for a record, updated with `json_dict`, or wrap `json_dict` in a new one.
+
+        :param object_class: the BasecampObject subclass to wrap the record in
+        :type object_class: type
+        :param json_dict: the record's parsed JSON
+        :type json_dict: dict
+        :param endpoint: the endpoint a new object belongs to
+        :type endpoint: basecampy3.endpoints._base.BasecampEndpoint
+        :rtype: basecampy3.endpoints._base.BasecampObject
+        """
+        object_id = json_dict.get("id") if isinstance(json_dict, dict) else None
+        if object_id is None:
+            return object_class(json_dict, endpoint)
+        key = (object_class, object_id)
+        with self._lock:
+            existing = self._objects.get(key)
+            if existing is None:
+                new = object_class(json_dict, endpoint)
+                self._objects[key] = new
+                return new
+            if existing._values is not json_dict and existing._values != json_dict:
+                existing._values.clear()
+                existing._values.update(json_dict)
+                existing.invalidate_relations()
+            return existing
+
+    def get(self, object_class, object_id):
+        """
+        :return: the live object of this class and ID, if there is one
+        :rtype: basecampy3.endpoints._base.BasecampObject|None
+        """
+        return self._objects.get((object_class, object_id))
+
+    def __len__(self):
+        return len(self._objects)
@@ -0,0 +1,110 @@
+"""
+Decoding JSON response bodies straight from their bytes.
+
+`requests.Response.json()` decodes the body to text first (guessing the encoding with chardet when the response
+doesn't name one) and then parses the text with the `json` module. Basecamp always sends UTF-8, so that work can be
+skipped. When orjson is installed (`pip install basecampy3[orjson]`), it parses the bytes directly and several times
+faster than `json`.
+
+A decoder is any callable that takes a response body as bytes and returns the parsed JSON. Give one to
+`Basecamp3(json_decoder=...)` to use something else:
+
+```
+bc3 = Basecamp3(json_decoder=rapidjson.loads)
+```
+
+`iter_json_array` parses a JSON array as its bytes arrive instead, for `Basecamp3(stream_pages=True)`.
+"""
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def stdlib_decoder(content):
+    """
+    Parse UTF-8 JSON with the `json` module.
+
+    :param content: a response body
+    :type content: bytes
+    :return: the parsed JSON
+    """
+    return json.loads(content.decode("utf-8"))
+
+
+def default_decoder():
+    """
+    :return: `orjson.loads` if orjson is installed, otherwise `stdlib_decoder`
+    :rtype: typing.Callable[[bytes], typing.Any]
+    """
+    try:
+        import orjson
+    except ImportError:
+        return stdlib_decoder
+    return orjson.loads
+
+
+def iter_json_array(chunks):
+    """
+    Parse a JSON array incrementally, yielding each element as soon as all of its bytes have arrived. Only the
+    element being parsed is held in memory, not the whole array.
+
+    Elements are parsed with the `json` module, since most JSON libraries can only parse complete documents.
+
+    :param chunks: the UTF-8 bytes of a JSON array, in pieces of any size (i.e. `Response.iter_content(16384)`)
+    :type chunks: typing.Iterable[bytes]
+    :return: a generator of the array's elements
+    :raises ValueError: if the bytes are not a JSON array, or the array is cut off
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = u""
+    started = after_value = incomplete = False
+    empty = True
+    chunks = iter(chunks)
+    while True:
+        chunk = next(chunks, None)
+        eof = chunk is None
+        new = text.decode(b"" if eof else chunk, final=eof)
+        if incomplete and not eof and "}" not in new and "]" not in new:
+            buf += new  # the element still being received can't have ended yet, so don't parse it again
+            continue
+        buf += new
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            char = buf[pos]
+            if not started:
+                if char != "[":
+                    raise ValueError("Expected a JSON array, not %r" % buf[pos:pos + 20])
+                started = True
+                pos += 1
+            elif char == "]" and (after_value or empty):
+                return
+            elif after_value:
+                if char != ",":
+                    raise ValueError("Expected ',' or ']' between array elements, not %r" % char)
+                after_value = False
+                pos += 1
+            else:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    if eof:
+                        raise
+                    incomplete = True
+                    break
+                if end == len(buf) and not eof:  # a number could carry on in the next chunk
+                    incomplete = True
+                    break
+                incomplete = False
+                after_value = True
+                empty = False
+                pos = end
+                yield value
+        buf = buf[pos:]
+        if eof:
+            raise ValueError("The JSON array was cut off")
@@ -0,0 +1,417 @@
+"""
+Instrumentation for the requests Basecamp3 makes. Pass a MetricsHook to `Basecamp3(metrics=...)` and it is told about
+every HTTP request (how long it waited on the rate limiter, how long the network took, whether it was a cache hit, how
+many bytes went each way) and how long each response took to parse as JSON.
+
+`HistogramCollector` keeps everything in memory and can render it in the Prometheus text format. `StatsDExporter`
+sends each measurement to a StatsD daemon over UDP. Both can be used at once with `FanOutHook`.
+
+```
+collector = HistogramCollector()
+bc3 = Basecamp3(metrics=collector)
+list(bc3.projects.list())
+print(collector.cache_hit_ratio)
+print(collector.to_prometheus())
+```
+"""
+import abc
+import bisect
+import re
+import socket
+import threading
+from collections import defaultdict
+
+import six
+from six.moves.urllib_parse import urlparse
+
+from .log import logger
+
+_ID_SEGMENT_REGEX = re.compile(r"^\d+(\.json)?$")
+
+
+def endpoint_template(url):
+    """
+    Reduce a URL to the API endpoint it belongs to by dropping the host, account ID, and query string, and replacing
+    IDs in the path with "{id}". i.e. "https://3.basecampapi.com/999/buckets/1/todos/2.json?page=2" becomes
+    "/buckets/{id}/todos/{id}.json".
+
+    :param url: a Basecamp 3 API URL
+    :type url: str
+    :return: the endpoint the URL belongs to
+    :rtype: str
+    """
+    segments = urlparse(url).path.split("/")[1:]
+    if segments and segments[0].isdigit():
+        segments = segments[1:]  # the account ID
+    for i, segment in enumerate(segments):
+        match = _ID_SEGMENT_REGEX.match(segment)
+        if match:
+            segments[i] = "{id}" + (match.group(1) or "")
+    return "/" + "/".join(segments)
+
+
+class RequestSample(object):
+    """
+    The measurements taken for one HTTP request.
+    """
+    __slots__ = ("method", "endpoint", "status_code", "duration", "wait", "network", "cache_hit", "bytes_sent",
+                 "bytes_received", "attempt", "coalesced")
+
+    def __init__(self, method, endpoint, status_code, duration, wait=0.0, network=0.0, cache_hit=False, bytes_sent=0,
+                 bytes_received=0, attempt=1, coalesced=False):
+        """
+        :param method: the HTTP verb
+        :type method: str
+        :param endpoint: the endpoint template from `endpoint_template`
+        :type endpoint: str
+        :param status_code: the HTTP status code the server answered with (304 for a revalidated cache hit)
+        :type status_code: int
+        :param duration: seconds from the start of the request until its response was read
+        :type duration: float
+        :param wait: seconds of `duration` spent blocked on the rate limiter
+        :type wait: float
+        :param network: seconds of `duration` spent sending the request and reading the response
+        :type network: float
+        :param cache_hit: whether the response was served from the cache, either because the server said "304 Not
+                          Modified" or because the cached response was fresh enough to use without asking
+        :type cache_hit: bool
+        :param bytes_sent: size of the request body
+        :type bytes_sent: int
+        :param bytes_received: size of the response body (0 for a cache hit)
+        :type bytes_received: int
+        :param attempt: 1 for the first try, 2 and up for retries of the same request
+        :type attempt: int
+        :param coalesced: the request was never sent because an identical one was already in flight. Its response
+                          was shared, and `duration` is how long this request waited for it.
+        :type coalesced: bool
+        """
+        self.method = method
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.duration = duration
+        self.wait = wait
+        self.network = network
+        self.cache_hit = cache_hit
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.attempt = attempt
+        self.coalesced = coalesced
+
+    def __repr__(self):
+        return "RequestSample(%s)" % ", ".join("%s=%r" % (k, getattr(self, k)) for k in self.__slots__)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class MetricsHook(object):
+    """
+    Extend this class to send request metrics wherever you want. Hooks are called from whichever thread made the
+    request, so implementations must be thread-safe, and they should be fast since they run inline with every request.
+    """
+
+    @abc.abstractmethod
+    def record_request(self, sample):
+        """
+        Called once per HTTP request after its response has been read.
+
+        :param sample: the measurements of the request
+        :type sample: RequestSample
+        """
+        raise NotImplementedError()
+
+    def record_parse(self, endpoint, seconds):
+        """
+        Called each time a response body is parsed as JSON. Does nothing unless overridden.
+
+        :param endpoint: the endpoint template of the response's URL
+        :type endpoint: str
+        :param seconds: how long parsing took
+        :type seconds: float
+        """
+
+
+class FanOutHook(MetricsHook):
+    """
+    Passes every measurement on to several hooks.
+    """
+
+    def __init__(self, *hooks):
+        """
+        :param hooks: the MetricsHook objects to notify
+        :type hooks: MetricsHook
+        """
+        self.hooks = hooks
+
+    def record_request(self, sample):
+        for hook in self.hooks:
+            hook.record_request(sample)
+
+    def record_parse(self, endpoint, seconds):
+        for hook in self.hooks:
+            hook.record_parse(endpoint, seconds)
+
+
+class Histogram(object):
+    """
+    Counts observations into cumulative buckets the way a Prometheus histogram does. Not thread-safe by itself.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: the upper bounds of the buckets, in increasing order. An infinite bucket is always added.
+        :type buckets: typing.Sequence[float]
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by interpolating within the bucket it falls in.
+
+        :param q: between 0 and 1, i.e. 0.95 for the 95th percentile
+        :type q: float
+        :return: the estimated value, or None if nothing has been observed
+        :rtype: float|None
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower  # the infinite bucket has no upper bound to interpolate toward
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def cumulative_counts(self):
+        """
+        :return: (upper bound, number of observations less than or equal to it) for each bucket, ending with "+Inf"
+        :rtype: list[tuple[str, int]]
+        """
+        bounds = ["%g" % b for b in self.buckets] + ["+Inf"]
+        total = 0
+        result = []
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class HistogramCollector(MetricsHook):
+    """
+    Keeps request metrics in memory, labelled by HTTP method and endpoint template. Safe to share between threads
+    and between several Basecamp3 objects.
+    """
+
+    def __init__(self, buckets=Histogram.DEFAULT_BUCKETS, namespace="basecampy3"):
+        """
+        :param buckets: the upper bounds (in seconds) of the latency histogram buckets
+        :type buckets: typing.Sequence[float]
+        :param namespace: prefix for metric names in `to_prometheus`
+        :type namespace: str
+        """
+        self.namespace = namespace
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._latency = defaultdict(self._histogram)  # (method, endpoint) -> Histogram
+            self._parse = defaultdict(self._histogram)  # endpoint -> Histogram
+            self._wait = self._histogram()
+            self._network = self._histogram()
+            self._responses = defaultdict(int)  # (method, endpoint, status code) -> count
+            self._counters = defaultdict(int)
+
+    def _histogram(self):
+        return Histogram(self._buckets)
+
+    def record_request(self, sample):
+        with self._lock:
+            self._latency[(sample.method, sample.endpoint)].observe(sample.duration)
+            self._wait.observe(sample.wait)
+            self._network.observe(sample.network)
+            self._responses[(sample.method, sample.endpoint, sample.status_code)] += 1
+            counters = self._counters
+            counters["requests"] += 1
+            counters["bytes_sent"] += sample.bytes_sent
+            counters["bytes_received"] += sample.bytes_received
+            if sample.coalesced:
+                counters["coalesced"] += 1
+            elif sample.method == "GET":
+                counters["cache_hits" if sample.cache_hit else "cache_misses"] += 1
+            if sample.status_code == 429:
+                counters["throttled"] += 1
+            if sample.attempt > 1:
+                counters["retries"] += 1
+
+    def record_parse(self, endpoint, seconds):
+        with self._lock:
+            self._parse[endpoint].observe(seconds)
+
+    @property
+    def cache_hit_ratio(self):
+        """
+        :return: the fraction of GET requests served from the cache (after a "304 Not Modified", or without a
+                 request while fresh), or None if no GETs were made
+        :rtype: float|None
+        """
+        with self._lock:
+            hits, misses = self._counters["cache_hits"], self._counters["cache_misses"]
+        return float(hits) / (hits + misses) if hits + misses else None
+
+    def summary(self):
+        """
+        :return: the totals and, for each endpoint, request count and latency percentiles in seconds
+        :rtype: dict
+        """
+        with self._lock:
+            endpoints = {}
+            for (method, endpoint), histogram in self._latency.items():
+                endpoints["%s %s" % (method, endpoint)] = {
+                    "count": histogram.count,
+                    "mean": histogram.mean,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+            result = dict(self._counters)
+            result.update({
+                "rate_limit_wait_seconds": self._wait.sum,
+                "network_seconds": self._network.sum,
+                "json_parse_seconds": sum(h.sum for h in self._parse.values()),
+                "endpoints": endpoints,
+            })
+        hits, misses = result.get("cache_hits", 0), result.get("cache_misses", 0)
+        result["cache_hit_ratio"] = float(hits) / (hits + misses) if hits + misses else None
+        return result
+
+    def to_prometheus(self):
+        """
+        :return: every metric in the Prometheus text exposition format, ready to serve from a /metrics page
+        :rtype: str
+        """
+        ns = self.namespace
+        lines = []
+
+        def histogram(name, doc, histograms):
+            lines.append("# HELP %s_%s %s" % (ns, name, doc))
+            lines.append("# TYPE %s_%s histogram" % (ns, name))
+            for labels, h in sorted(histograms.items()):
+                label_text = ",".join('%s="%s"' % (k, _escape_label(v)) for k, v in labels)
+                prefix = label_text + "," if label_text else ""
+                for bound, count in h.cumulative_counts():
+                    lines.append('%s_%s_bucket{%sle="%s"} %d' % (ns, name, prefix, bound, count))
+                suffix = "{%s}" % label_text if label_text else ""
+                lines.append("%s_%s_sum%s %.6f" % (ns, name, suffix, h.sum))
+                lines.append("%s_%s_count%s %d" % (ns, name, suffix, h.count))
+
+        def counter(name, doc, value):
+            lines.append("# HELP %s_%s %s" % (ns, name, doc))
+            lines.append("# TYPE %s_%s counter" % (ns, name))
+            lines.append("%s_%s %d" % (ns, name, value))
+
+        with self._lock:
+            histogram("request_duration_seconds", "Time from starting a request until its response was read.",
+                      {(("method", m), ("endpoint", e)): h for (m, e), h in self._latency.items()})
+            histogram("rate_limit_wait_seconds", "Time requests spent blocked on the rate limiter.",
+                      {(): self._wait})
+            histogram("network_seconds", "Time requests spent sending and receiving.", {(): self._network})
+            histogram("json_parse_seconds", "Time spent parsing response bodies as JSON.",
+                      {(("endpoint", e),): h for e, h in self._parse.items()})
+
+            lines.append("# HELP %s_responses_total Responses by method, endpoint, and status code." % ns)
+            lines.append("# TYPE %s_responses_total counter" % ns)
+            for (method, endpoint, status), count in sorted(self._responses.items()):
+                lines.append('%s_responses_total{method="%s",endpoint="%s",status="%d"} %d'
+                             % (ns, method, _escape_label(endpoint), status, count))
+
+            counters = self._counters
+            counter("cache_hits_total", "GET requests served from the cache, after a 304 Not Modified or while fresh.",
+                    counters["cache_hits"])
+            counter("cache_misses_total", "GET requests that downloaded a response.", counters["cache_misses"])
+            counter("bytes_sent_total", "Request body bytes sent.", counters["bytes_sent"])
+            counter("bytes_received_total", "Response body bytes received.", counters["bytes_received"])
+            counter("throttled_total", "Responses with status 429 Too Many Requests.", counters["throttled"])
+            counter("coalesced_total", "GET requests that shared the response of an identical request in flight.",
+                    counters["coalesced"])
+            counter("retries_total", "Requests that were retries of an earlier attempt.", counters["retries"])
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StatsDExporter(MetricsHook):
+    """
+    Sends each measurement to a StatsD daemon over UDP as it happens. UDP is fire-and-forget, so nothing breaks (or
+    blocks) if no daemon is listening.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8125, prefix="basecampy3"):
+        """
+        :param host: the StatsD daemon's address
+        :type host: str
+        :param port: the StatsD daemon's port
+        :type port: int
+        :param prefix: prepended to every metric name
+        :type prefix: str
+        """
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record_request(self, sample):
+        name = "%s.%s" % (sample.method.lower(), _statsd_name(sample.endpoint))
+        lines = [
+            "request.%s:%.3f|ms" % (name, sample.duration * 1000),
+            "rate_limit_wait:%.3f|ms" % (sample.wait * 1000),
+            "status.%d:1|c" % sample.status_code,
+            "bytes_sent:%d|c" % sample.bytes_sent,
+            "bytes_received:%d|c" % sample.bytes_received,
+        ]
+        if sample.coalesced:
+            lines.append("coalesced:1|c")
+        elif sample.method == "GET":
+            lines.append("cache.%s:1|c" % ("hit" if sample.cache_hit else "miss"))
+        if sample.attempt > 1:
+            lines.append("retries:1|c")
+        self._send(lines)
+
+    def record_parse(self, endpoint, seconds):
+        self._send(["json_parse.%s:%.3f|ms" % (_statsd_name(endpoint), seconds * 1000)])
+
+    def close(self):
+        self._socket.close()
+
+    def _send(self, lines):
+        packet = "\n".join("%s.%s" % (self.prefix, line) for line in lines).encode("utf-8")
+        try:
+            self._socket.sendto(packet, self.address)
+        except (socket.error, OSError) as ex:
+            logger.debug("Unable to send metrics to StatsD at %s:%s: %s", self.address[0], self.address[1], ex)
+
+
+def _statsd_name(endpoint):
+    """
+    "/buckets/{id}/todos/{id}.json" -> "buckets.id.todos.id"
+    """
+    name = re.sub(r"\.json$", "", endpoint).strip("/")
+    return re.sub(r"[^A-Za-z0-9_]+", ".", name).strip(".") or "root"
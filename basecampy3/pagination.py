@@ -0,0 +1,457 @@
+"""
+Paging through Basecamp's lists: `ListResult` (what list methods return), cursors to resume a list from in a later
+process, and fetching pages in parallel.
+
+A list's `cursor` can be saved at any point and used to carry on from the same object later, even in a new process:
+
+```
+todos = todolist.list()
+for todo in todos:
+    handle(todo)
+    save_checkpoint(todos.cursor.to_json())
+...
+todos = bc3.resume_list(ListCursor.from_json(load_checkpoint()))
+```
+
+Basecamp pages its lists in gears: 15 items on the first page, 30 on the second, 50 on the third and 100 on every page
+after that. The first page's `X-Total-Count` header says how many items there are in all, so every page's URL is
+known from the first response. Inside a `parallel_pages` block, lists fetch the rest of their pages concurrently
+instead of one after another:
+
+```
+with parallel_pages(max_workers=4):
+    todos = list(todolist.list())
+```
+
+Each page still waits on the client's rate limiter like any other request.
+"""
+import json
+import re
+import sys
+import threading
+
+import six
+from six.moves.urllib_parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from . import relations, tracing
+
+GEARED_PAGE_SIZES = (15, 30, 50, 100)
+"""How many items Basecamp puts on pages 1, 2, 3, and every page after."""
+
+_local = threading.local()
+_LINK_HEADER_URL_REGEX = re.compile(r'<(https?.+)>')
+
+
+class ParallelPages(object):
+    """
+    How the pages of a list are fetched in parallel.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+
+    def __init__(self, max_workers=None, ordered=True):
+        """
+        :param max_workers: the maximum number of pages to have in flight at once
+        :type max_workers: int
+        :param ordered: yield items in the order Basecamp lists them. Otherwise, each page's items are yielded as soon
+                        as it arrives, whatever its place in the list.
+        :type ordered: bool
+        """
+        if max_workers is None:
+            max_workers = self.DEFAULT_MAX_WORKERS
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.ordered = ordered
+
+    def __repr__(self):
+        return "ParallelPages(max_workers=%r, ordered=%r)" % (self.max_workers, self.ordered)
+
+
+class parallel_pages(object):
+    """
+    Fetch the pages of every list started by this thread inside a `with` block in parallel.
+
+    The setting is taken when a list method is called, so a generator made inside the block fetches its pages in
+    parallel even if it is looped through after the block.
+    """
+
+    def __init__(self, max_workers=None, ordered=True, settings=None):
+        """
+        :param max_workers: see `ParallelPages`
+        :type max_workers: int
+        :param ordered: see `ParallelPages`
+        :type ordered: bool
+        :param settings: use these settings instead of building them from `max_workers` and `ordered`
+        :type settings: ParallelPages
+        """
+        self.settings = settings if settings is not None else ParallelPages(max_workers, ordered)
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_local, "settings", None)
+        _local.settings = self.settings
+        return self.settings
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.settings = self._previous
+
+
+def current_settings():
+    """
+    :return: the settings of the innermost `parallel_pages` block in this thread, if any
+    :rtype: ParallelPages|None
+    """
+    return getattr(_local, "settings", None)
+
+
+def geared_page_count(total):
+    """
+    :param total: how many items are in a list
+    :type total: int
+    :return: how many pages Basecamp splits that many items into
+    :rtype: int
+    """
+    pages = 0
+    while total > 0:
+        total -= GEARED_PAGE_SIZES[min(pages, len(GEARED_PAGE_SIZES) - 1)]
+        pages += 1
+    return max(pages, 1)
+
+
+def next_page_url(response):
+    """
+    :return: the URL of the page after this one, from the response's `Link` header
+    :rtype: str|None
+    """
+    link_header = response.headers.get("Link")
+    return _LINK_HEADER_URL_REGEX.findall(link_header)[0] if link_header else None
+
+
+def page_url(url, page):
+    """
+    :param url: the URL of any page of a list
+    :type url: str
+    :param page: which page to point to, starting at 1
+    :type page: int
+    :return: the URL with its `page` query parameter changed to `page`
+    :rtype: str
+    """
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k != "page"]
+    params.append(("page", str(page)))
+    return urlunsplit((scheme, netloc, path, urlencode(params), fragment))
+
+
+def total_count(response):
+    """
+    :return: how many items are in the whole list, from a page's `X-Total-Count` header, if it has one
+    :rtype: int|None
+    """
+    try:
+        return int(response.headers["X-Total-Count"])
+    except (KeyError, ValueError):
+        return None
+
+
+class ListCursor(object):
+    """
+    Where a ListResult is up to: the request for the page it is reading and how many objects of that page have been
+    yielded. It holds only strings and numbers, so it can be stored as JSON (see `to_json`).
+
+    Basecamp lists are paged by position, so if objects are added to or removed from the list before it is resumed,
+    some objects may be skipped or yielded twice.
+    """
+
+    def __init__(self, request, offset=0, endpoint=None, object_class=None):
+        """
+        :param request: kwargs for Session.request to fetch the page being read
+        :type request: dict
+        :param offset: how many objects of that page have already been yielded
+        :type offset: int
+        :param endpoint: the module and name of the endpoint class the list belongs to, i.e.
+                         "basecampy3.endpoints.projects.Projects"
+        :type endpoint: str
+        :param object_class: the module and name of the class each object is wrapped in, if not the endpoint's
+        :type object_class: str
+        """
+        self.request = request
+        self.offset = offset
+        self.endpoint = endpoint
+        self.object_class = object_class
+
+    def to_dict(self):
+        return {"request": dict(self.request), "offset": self.offset, "endpoint": self.endpoint,
+                "object_class": self.object_class}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(dict(data["request"]), data.get("offset", 0), data.get("endpoint"), data.get("object_class"))
+
+    def to_json(self):
+        """
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text):
+        """
+        :param text: what `to_json` returned
+        :type text: str
+        :rtype: ListCursor
+        """
+        return cls.from_dict(json.loads(text))
+
+    def copy(self):
+        return self.from_dict(self.to_dict())
+
+    def __eq__(self, other):
+        return isinstance(other, ListCursor) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "ListCursor(%r, offset=%r)" % (self.request, self.offset)
+
+
+class ListResult(object):
+    """
+    The objects in a Basecamp list. Iterating over it fetches one page at a time, as the objects on the previous page
+    run out (or several at once inside a `parallel_pages` block).
+
+    `count`, `first` and `exists` only fetch the first page, so they are cheap even for long lists:
+
+    ```
+    todos = todolist.list()
+    print("%d to-dos" % todos.count())
+    ```
+
+    The first page is only fetched once, whichever of these is used first.
+
+    `cursor` says where the list is up to, so that it can be resumed later with `resume`. A list that is fetched in
+    parallel only has a cursor if it is `ordered`.
+
+    `prefetch` fetches relations of the objects on each page (see `basecampy3.relations`) concurrently as it arrives.
+    """
+
+    def __init__(self, endpoint, request_args, object_class=None, parallel=None, cursor=None):
+        """
+        :param endpoint: the endpoint the list belongs to
+        :type endpoint: basecampy3.endpoints._base.BasecampEndpoint
+        :param request_args: kwargs for Session.request to fetch the first page
+        :type request_args: dict
+        :param object_class: the BasecampObject subclass to wrap each element in. Defaults to the endpoint's.
+        :type object_class: type
+        :param parallel: fetch the pages after the first in parallel with these settings
+        :type parallel: ParallelPages
+        :param cursor: start where this cursor is up to, instead of from the start of the list
+        :type cursor: ListCursor
+        """
+        self._endpoint = endpoint
+        self._request_args = request_args
+        self._object_class = object_class
+        self._parallel = parallel
+        if cursor is None:
+            cursor = ListCursor(dict(request_args), endpoint=_class_path(type(endpoint)),
+                                object_class=_class_path(object_class) if object_class is not None else None)
+        self._cursor = cursor
+        self._skip = cursor.offset
+        self._response = None
+        self._first_items = None
+        self._items = None
+        self._span = None
+        self._prefetch = None
+
+    @classmethod
+    def resume(cls, api, cursor):
+        """
+        Carry on with a list from where a cursor says it was up to.
+
+        :param api: the Basecamp3 object to fetch the rest of the list with
+        :type api: basecampy3.bc3_api.Basecamp3
+        :param cursor: the `cursor` of the list to resume
+        :type cursor: ListCursor
+        :rtype: ListResult
+        """
+        endpoint = None
+        for value in vars(api).values():
+            if _class_path(type(value)) == cursor.endpoint:
+                endpoint = value
+                break
+        if endpoint is None:
+            raise ValueError("The cursor is for an unknown endpoint: %r" % cursor.endpoint)
+        object_class = _find_class(cursor.object_class) if cursor.object_class is not None else None
+        return cls(endpoint, dict(cursor.request), object_class=object_class, cursor=cursor.copy())
+
+    @property
+    def cursor(self):
+        """
+        :return: where this list is up to. Later changes to the list don't change the cursor returned.
+        :rtype: ListCursor
+        """
+        if self._parallel is not None and not self._parallel.ordered:
+            raise ValueError("A list fetched in parallel out of order cannot be resumed")
+        return self._cursor.copy()
+
+    def count(self):
+        """
+        :return: how many objects are in the list
+        :rtype: int
+        """
+        resp = self._first_response()
+        total = total_count(resp)
+        if total is not None:
+            return total
+        # no X-Total-Count, so page through the rest of the list to count it
+        total = len(self._first_page())
+        next_url = next_page_url(resp)
+        if next_url is not None:
+            total += sum(1 for _ in self._endpoint._paginated_generator({'url': next_url, 'method': 'GET'}))
+        return total
+
+    def first(self):
+        """
+        :return: the first object in the list (or the next one, for a resumed list), or None if there isn't one
+        :rtype: basecampy3.endpoints._base.BasecampObject|None
+        """
+        items = self._first_page()[self._skip:]
+        if not items:
+            return None
+        return self._endpoint._wrap(dict(items[0]), self._object_class)  # the list's own copy is wrapped later
+
+    def exists(self):
+        """
+        :return: whether the list has anything in it
+        :rtype: bool
+        """
+        total = total_count(self._first_response())
+        if total is not None:
+            return total > 0
+        return bool(self._first_page())
+
+    def prefetch(self, names, max_workers=4):
+        """
+        Fetch these relations of every object on each page, concurrently, before the page's objects are yielded:
+
+        ```
+        for project in bc3.projects.list().prefetch(("todoset", "people")):
+            print(project.todoset.todos_remaining_count)  # already fetched
+        ```
+
+        :param names: the names of relations of the list's objects, i.e. "todoset"
+        :type names: typing.Iterable[str]
+        :param max_workers: the maximum number of relations to fetch at once
+        :type max_workers: int
+        :return: this ListResult
+        :rtype: ListResult
+        :raises ValueError: if a name isn't a relation of the list's objects, or the list has already been started
+        """
+        if isinstance(names, six.string_types):
+            names = (names,)
+        names = tuple(names)
+        object_class = self._object_class if self._object_class is not None else self._endpoint.OBJECT_CLASS
+        unknown = set(names) - relations.relation_names(object_class)
+        if unknown:
+            raise ValueError("%s has no relations named %s" % (object_class.__name__, ", ".join(sorted(unknown))))
+        if self._items is not None:
+            raise ValueError("Relations must be prefetched before looping through the list")
+        self._prefetch = (names, max_workers)
+        return self
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._items is None:
+            self._items = self._start()
+        return next(self._items)
+
+    next = __next__  # Python 2
+
+    def close(self):
+        """
+        Stop fetching pages, i.e. when a loop over the list ends early.
+        """
+        if self._items is not None:
+            self._items.close()
+        elif self._span is not None:
+            self._span.end()
+            self._span = None
+
+    def _first_response(self, end_span=True):
+        """
+        :param end_span: end the traced list method's span, since nothing more will be fetched under it
+        :type end_span: bool
+        :return: the first page of the list
+        :rtype: requests.Response
+        """
+        if self._response is None:
+            if self._span is None:
+                self._response = self._endpoint._request_page(self._request_args, 1)
+            else:
+                with tracing._Activation(self._span):
+                    self._response = self._endpoint._request_page(self._request_args, 1)
+        if end_span and self._span is not None:
+            self._span.end()
+            self._span = None
+        return self._response
+
+    def _first_page(self):
+        """
+        :return: the parsed JSON of the first page of the list, which is only parsed once
+        :rtype: list[dict]
+        """
+        if self._first_items is None:
+            self._first_items = self._endpoint._json(self._first_response())
+        return self._first_items
+
+    def _start(self):
+        """
+        :return: a generator of every object in the list
+        """
+        first = self._first_response(end_span=False)
+        on_page = None
+        if self._prefetch is not None:
+            names, max_workers = self._prefetch
+
+            def on_page(objects):
+                relations.prefetch(objects, names, max_workers)
+        if self._parallel is not None:
+            cursor = self._cursor if self._parallel.ordered else None
+            items = self._endpoint._parallel_paginated_generator(self._request_args, self._parallel,
+                                                                  object_class=self._object_class, first_response=first,
+                                                                  cursor=cursor, on_page=on_page,
+                                                                  first_page=self._first_items)
+        else:
+            items = self._endpoint._paginated_generator(self._request_args, object_class=self._object_class,
+                                                         first_response=first, cursor=self._cursor,
+                                                         on_page=on_page, first_page=self._first_items)
+        if self._span is not None:
+            items = tracing._traced_generator(items, self._span)
+            self._span = None
+        return items
+
+    def _trace_with(self, span):
+        """
+        Called by `basecampy3.tracing.instrument` with the span of the list method that returned this. The pages are
+        fetched as children of it. It ends when the list has been looped through or closed, or when `count`, `first`
+        or `exists` is used before looping.
+        """
+        self._span = span
+
+
+def _class_path(cls):
+    return "%s.%s" % (cls.__module__, cls.__name__)
+
+
+def _find_class(path):
+    """
+    Find a class by its module and name, without importing anything, since the path comes from a stored cursor.
+    """
+    module_name, _, name = path.rpartition(".")
+    cls = getattr(sys.modules.get(module_name), name, None)
+    if not isinstance(cls, type):
+        raise ValueError("The cursor is for an unknown class: %r" % path)
+    return cls
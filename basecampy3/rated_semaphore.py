@@ -1,4 +1,6 @@
 import logging
+import threading
+from collections import deque
 from threading import Timer
 
 try:
@@ -62,3 +64,205 @@ class RatedSemaphore(BoundedSemaphore):
         Not allowed. Only the internal timer can call release.
         """
         pass  # called by the `with` statement so just ignore it
+
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+
+DEFAULT_WEIGHTS = {INTERACTIVE: 16, NORMAL: 4, BULK: 1}
+"""How many requests of each class are let through, relative to the others, while all of them are waiting."""
+
+_local = threading.local()
+
+
+class priority(object):
+    """
+    Tag every request made by this thread inside a `with` block with a priority class for PriorityRatedSemaphore.
+    Requests made outside of any block are NORMAL.
+
+    ```
+    with priority(BULK):
+        project.export("backup.jsonl.gz")
+    ```
+    """
+
+    def __init__(self, name):
+        """
+        :param name: INTERACTIVE, NORMAL, BULK, or any other class the semaphore has a weight for
+        :type name: str
+        """
+        self.name = name
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_local, "priority", None)
+        _local.priority = self.name
+        return self.name
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.priority = self._previous
+
+
+def current_priority():
+    """
+    :return: the priority class set by the innermost `priority` block in this thread, or NORMAL
+    :rtype: str
+    """
+    return getattr(_local, "priority", None) or NORMAL
+
+
+class PriorityRatedSemaphore(object):
+    """
+    A rate limiter like RatedSemaphore (`value` requests per `period` seconds, in bursts of up to `value`) that
+    decides who goes next by priority class instead of first-come-first-served.
+
+    Each class has its own queue. When a request is allowed, it goes to the class that is furthest behind its share
+    of requests (weighted fair queuing), so with the default weights a waiting INTERACTIVE request is let through 16
+    times as often as a waiting BULK one, but BULK requests are never starved. A class that had nothing waiting does
+    not build up credit while idle. Within a class, requests go in the order they arrived.
+
+    Tokens are refilled from the clock whenever someone is waiting, so waits are exactly as long as needed and no
+    timer thread is involved. `stats` reports the queue depth and time spent waiting for each class.
+
+    ```
+    semaphore = PriorityRatedSemaphore(50, 10)
+    with priority(INTERACTIVE), semaphore:
+        call_a_thing()
+    ```
+    """
+
+    def __init__(self, value=1, period=1, weights=None):
+        """
+        :param value: the number of tokens in a given period, which is also the largest burst allowed
+        :type value: int
+        :param period: the time, in seconds, in a period
+        :type period: float
+        :param weights: the relative share of each priority class. Defaults to `DEFAULT_WEIGHTS`.
+        :type weights: dict[str, float]
+        """
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        if not weights or min(weights.values()) <= 0:
+            raise ValueError("Every priority class needs a positive weight")
+        self.value = value
+        self.period = float(period)
+        self.weights = weights
+        self._tokens = float(value)
+        self._refilled_at = time.time()
+        self._condition = threading.Condition()
+        self._queues = {name: deque() for name in weights}
+        self._virtual_time = 0.0
+        self._finish = {name: 0.0 for name in weights}
+        self._stats = {name: _ClassStats() for name in weights}
+
+    def acquire(self, blocking=True, timeout=None):
+        """
+        Wait for a token in the current thread's priority class.
+
+        :param blocking: wait for a token instead of returning False right away when none is available
+        :type blocking: bool
+        :param timeout: the most seconds to wait. None waits as long as it takes.
+        :type timeout: float
+        :return: whether a token was taken
+        :rtype: bool
+        """
+        name = current_priority()
+        if name not in self._queues:
+            raise ValueError("Unknown priority class %r (choose from %s)" % (name, ", ".join(sorted(self.weights))))
+        started = time.time()
+        deadline = None if timeout is None else started + timeout
+        ticket = object()
+        with self._condition:
+            queue = self._queues[name]
+            if not queue:
+                # a class that was idle starts level with the others instead of with credit saved up
+                self._finish[name] = max(self._finish[name], self._virtual_time)
+            queue.append(ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1 and queue[0] is ticket and self._next_class() == name:
+                        break
+                    if not blocking:
+                        return False
+                    if self._tokens >= 1:
+                        wait = None  # someone else goes first; they will notify us
+                    else:
+                        wait = (1 - self._tokens) * self.period / self.value
+                    if deadline is not None:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._condition.wait(wait)
+                self._tokens -= 1
+                self._virtual_time = self._finish[name] = self._finish[name] + 1.0 / self.weights[name]
+                self._stats[name].record(time.time() - started)
+                return True
+            finally:
+                if ticket in queue:
+                    queue.remove(ticket)
+                self._condition.notify_all()
+
+    __enter__ = acquire
+
+    def release(self):
+        """
+        Not allowed. Tokens come back with time.
+        """
+        pass  # called by the `with` statement so just ignore it
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def stats(self):
+        """
+        :return: for each priority class, how many requests are waiting now ("waiting"), how many were let through
+                 ("acquired"), and the total, mean and longest seconds they waited ("total_wait", "mean_wait",
+                 "max_wait")
+        :rtype: dict[str, dict[str, float]]
+        """
+        with self._condition:
+            return {name: dict(self._stats[name].as_dict(), waiting=len(self._queues[name]))
+                    for name in self.weights}
+
+    def _refill(self):
+        now = time.time()
+        self._tokens = min(float(self.value), self._tokens + (now - self._refilled_at) * self.value / self.period)
+        self._refilled_at = now
+
+    def _next_class(self):
+        """
+        :return: the waiting class whose next request would finish earliest in virtual time
+        """
+        best = None
+        best_finish = None
+        for name, queue in self._queues.items():
+            if not queue:
+                continue
+            finish = self._finish[name] + 1.0 / self.weights[name]
+            if best is None or finish < best_finish:
+                best, best_finish = name, finish
+        return best
+
+
+class _ClassStats(object):
+    __slots__ = ("acquired", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait):
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self):
+        return {
+            "acquired": self.acquired,
+            "total_wait": self.total_wait,
+            "mean_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "max_wait": self.max_wait,
+        }
@@ -0,0 +1,88 @@
+"""
+Related objects that are fetched once and remembered, like a Project's `todoset` or `campfire`.
+
+Each object remembers its relations for the client's `relation_ttl` seconds (`Basecamp3(relation_ttl=...)`, 60 by
+default), so `project.todoset` in a loop only fetches the TodoSet once. `invalidate_relations()` forgets them sooner,
+and they are also forgotten when the object is refreshed.
+
+The relations of every object on a page of a list can be fetched concurrently as the page arrives:
+
+```
+for project in bc3.projects.list().prefetch(("todoset", "people")):
+    print(project.name, len(project.people), project.todoset.todos_remaining_count)
+```
+"""
+import time
+from concurrent import futures
+
+from .log import logger
+from .request_context import request_context
+
+
+class relation(object):
+    """
+    Decorates a method of a BasecampObject that fetches something related to it, turning it into a property that
+    remembers what it fetched (see the module documentation).
+    """
+
+    def __init__(self, fetch):
+        """
+        :param fetch: fetches the related object(s). Takes the object it belongs to.
+        :type fetch: typing.Callable[[basecampy3.endpoints._base.BasecampObject], typing.Any]
+        """
+        self.fetch = fetch
+        self.name = fetch.__name__
+        self.__doc__ = fetch.__doc__
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        memo = obj.__dict__.setdefault("_relations", {})
+        ttl = obj._endpoint._api.relation_ttl
+        remembered = memo.get(self.name)
+        if remembered is not None and (ttl is None or time.time() - remembered[1] < ttl):
+            return remembered[0]
+        value = self.fetch(obj)
+        if ttl != 0:
+            memo[self.name] = (value, time.time())
+        return value
+
+
+def relation_names(cls):
+    """
+    :return: the names of the relations of a BasecampObject subclass
+    :rtype: set[str]
+    """
+    return set(name for klass in cls.__mro__ for name, value in vars(klass).items() if isinstance(value, relation))
+
+
+def prefetch(objects, names, max_workers=4):
+    """
+    Fetch the named relations of several objects concurrently, so that they are remembered when they are used.
+    Relations that can't be fetched are left for when they are used, so that they raise their errors then. Nothing is
+    fetched if the client's `relation_ttl` is 0, since nothing would be remembered.
+
+    :param objects: BasecampObjects, i.e. one page of a list
+    :type objects: list[basecampy3.endpoints._base.BasecampObject]
+    :param names: which relations to fetch
+    :type names: typing.Iterable[str]
+    :param max_workers: the maximum number of relations to fetch at once
+    :type max_workers: int
+    """
+    names = tuple(names)
+    if not objects or not names or objects[0]._endpoint._api.relation_ttl == 0:
+        return
+    context = request_context()
+
+    def fetch(obj, name):
+        with context:
+            getattr(obj, name)
+
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        tasks = [executor.submit(fetch, obj, name) for obj in objects for name in names]
+        for task in futures.as_completed(tasks):
+            if task.exception() is not None:
+                logger.debug("Unable to prefetch a relation: %s", task.exception())
+    finally:
+        executor.shutdown(wait=False)
@@ -0,0 +1,48 @@
+"""
+Carrying a thread's per-call request settings into the worker threads that make requests on its behalf.
+
+`priority`, `allow_stale` and `retry_policy` blocks only apply to the thread that entered them. Code that hands
+requests to a thread pool captures them with `request_context()` in the calling thread and enters it in each worker:
+
+```
+context = request_context()
+
+def work(url):
+    with context:
+        return session.get(url)
+```
+"""
+import threading
+
+from .freshness import allow_stale, current_policy as current_freshness
+from .rated_semaphore import current_priority, priority
+from .retry import current_policy as current_retry_policy, retry_policy
+
+
+class request_context(object):
+    """
+    The `priority`, `allow_stale` and `retry_policy` settings of the thread that created it, applied to the thread
+    inside a `with` block. Several threads can be inside it at once.
+    """
+
+    def __init__(self):
+        self.priority = current_priority()
+        self.freshness = current_freshness()
+        self.retry = current_retry_policy()
+        self._local = threading.local()
+
+    def __enter__(self):
+        blocks = [priority(self.priority)]
+        if self.freshness is not None:
+            blocks.append(allow_stale(policy=self.freshness))
+        if self.retry is not None:
+            blocks.append(retry_policy(self.retry))
+        for block in blocks:
+            block.__enter__()
+        self._local.blocks = blocks
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for block in reversed(self._local.blocks):
+            block.__exit__(exc_type, exc_val, exc_tb)
+        self._local.blocks = None
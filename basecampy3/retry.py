@@ -0,0 +1,164 @@
+"""
+Retrying requests that failed for reasons that are likely to go away: dropped connections, timeouts, "429 Too Many
+Requests", and the 502/503/504 responses Basecamp gives while it is deploying or overloaded.
+
+Every client retries with `RetryPolicy()` unless given another policy (`Basecamp3(retry=...)`). The policy for the
+calls made inside a `with` block can be changed too:
+
+```
+with retry_policy(RetryPolicy(max_attempts=8, retry_posts=True)):
+    project.campfire.post_message("Deploy finished")
+```
+"""
+import random
+import threading
+
+import six
+from requests import exceptions
+
+_local = threading.local()
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a failed attempt at a request is tried again, and how long to wait first.
+
+    Waits grow exponentially (`backoff`, 2 * `backoff`, 4 * `backoff`, ...) up to `max_backoff`, with "full jitter": the
+    actual wait is random between 0 and that, so that many clients failing at once don't all come back at once. A
+    `Retry-After` header on the response is honored instead when it asks for longer.
+
+    GET, HEAD, OPTIONS, PUT and DELETE are retried since repeating them is harmless. A POST may have been acted on even
+    though its response was lost, so POSTs are only retried if `retry_posts` is set, or when Basecamp answered
+    "429 Too Many Requests" (which means it did nothing). Requests whose body is a file or generator cannot be sent
+    again and are never retried.
+    """
+
+    IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+    RETRY_STATUSES = frozenset((429, 502, 503, 504))
+
+    RETRY_EXCEPTIONS = (exceptions.ConnectionError, exceptions.Timeout)
+    """ConnectionError includes ConnectTimeout; Timeout adds ReadTimeout."""
+
+    def __init__(self, max_attempts=4, backoff=0.5, max_backoff=30.0, retry_posts=False, statuses=None):
+        """
+        :param max_attempts: the most times a request is sent, including the first. 1 means never retry.
+        :type max_attempts: int
+        :param backoff: the longest wait, in seconds, before the first retry
+        :type backoff: float
+        :param max_backoff: the longest wait before any retry, not counting waits asked for by `Retry-After`
+        :type max_backoff: float
+        :param retry_posts: retry POSTs too, accepting that one could be carried out twice
+        :type retry_posts: bool
+        :param statuses: the response statuses that are retried. Defaults to `RETRY_STATUSES`.
+        :type statuses: typing.Iterable[int]
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if backoff < 0 or max_backoff < 0:
+            raise ValueError("backoff and max_backoff cannot be negative")
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_posts = retry_posts
+        self.statuses = self.RETRY_STATUSES if statuses is None else frozenset(statuses)
+
+    def should_retry(self, request, attempt, response=None, exception=None):
+        """
+        :param request: the request that failed
+        :type request: requests.PreparedRequest
+        :param attempt: which attempt failed: 1 for the first
+        :type attempt: int
+        :param response: the response to the attempt, if there was one
+        :type response: requests.Response
+        :param exception: what the attempt raised, if it raised
+        :type exception: Exception
+        :return: whether to try the request again
+        :rtype: bool
+        """
+        if attempt >= self.max_attempts or not _can_resend(request):
+            return False
+        if exception is not None:
+            if not isinstance(exception, self.RETRY_EXCEPTIONS):
+                return False
+        elif response is None or response.status_code not in self.statuses:
+            return False
+        if request.method in self.IDEMPOTENT_METHODS or self.retry_posts:
+            return True
+        return response is not None and response.status_code == 429
+
+    def delay(self, attempt, response=None):
+        """
+        :param attempt: which attempt failed: 1 for the first
+        :type attempt: int
+        :param response: the response to the attempt, if there was one
+        :type response: requests.Response
+        :return: seconds to wait before the next attempt
+        :rtype: float
+        """
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        retry_after = _retry_after(response)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def __repr__(self):
+        return "RetryPolicy(max_attempts=%r, backoff=%r, max_backoff=%r, retry_posts=%r)" % (
+            self.max_attempts, self.backoff, self.max_backoff, self.retry_posts)
+
+
+NO_RETRIES = RetryPolicy(max_attempts=1)
+"""Send every request once. Useful to switch retries off for a block of calls."""
+
+
+class retry_policy(object):
+    """
+    Use a RetryPolicy for every request made by this thread inside a `with` block, instead of the client's.
+    """
+
+    def __init__(self, policy):
+        """
+        :param policy: the policy to use
+        :type policy: RetryPolicy
+        """
+        self.policy = policy
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_local, "policy", None)
+        _local.policy = self.policy
+        return self.policy
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.policy = self._previous
+
+
+def current_policy():
+    """
+    :return: the policy set by the innermost `retry_policy` block in this thread, if any
+    :rtype: RetryPolicy|None
+    """
+    return getattr(_local, "policy", None)
+
+
+def _can_resend(request):
+    """
+    :return: whether the request's body can be sent again. File objects and generators can only be read once.
+    """
+    return request.body is None or isinstance(request.body, (bytes, six.text_type))
+
+
+def _retry_after(response):
+    """
+    :return: the seconds a response's `Retry-After` header asks for, if it has one in seconds
+    :rtype: float|None
+    """
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:  # an HTTP date, which Basecamp doesn't send
+        return None
@@ -0,0 +1,72 @@
+"""
+Collapses concurrent identical calls into one. Used by `Basecamp3TransportAdapter` so that many threads asking for the
+same URL at the same moment cause a single request to Basecamp.
+"""
+import threading
+
+
+class _Call(object):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    The first thread to call `do` with a key runs the function. Threads that call `do` with the same key before it
+    finishes wait for it and get the same result (or exception) instead of running the function themselves. Once the
+    function returns, the next call with that key runs it again; results are never cached.
+
+    ```
+    flight = SingleFlight()
+    response, shared = flight.do(url, lambda: session.get(url))
+    ```
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """
+        :param key: calls with equal keys are collapsed into one. Must be hashable.
+        :param func: called with no arguments by whichever thread gets there first
+        :type func: typing.Callable[[], typing.Any]
+        :return: the result of `func`, and whether this thread only waited for another thread's result
+        :rtype: tuple[typing.Any, bool]
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        """
+        :return: how many keys currently have a call running
+        :rtype: int
+        """
+        with self._lock:
+            return len(self._calls)
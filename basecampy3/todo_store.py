@@ -0,0 +1,248 @@
+"""
+A local copy of every to-do in the account, kept in SQLite and synced from the cross-project recordings list, so that
+questions like "which to-dos assigned to this person are overdue?" are answered without crawling every Project.
+
+```
+store = TodoStore(bc3, "todos.sqlite3", refresh=FreshnessPolicy(max_age=300))
+for todo in store.query(assignee=me, overdue=True):
+    print(todo.bucket["name"], todo.title, todo.due_on)
+```
+"""
+import datetime
+import json
+import sqlite3
+import threading
+import time
+
+import six
+
+from .change_feed import ChangeFeed
+from .endpoints import registry
+from .log import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    due_on TEXT,
+    updated_at TEXT NOT NULL,
+    json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS todos_project ON todos (project_id, status, completed);
+CREATE INDEX IF NOT EXISTS todos_due_on ON todos (due_on, status, completed);
+CREATE TABLE IF NOT EXISTS todo_assignees (
+    person_id INTEGER NOT NULL,
+    todo_id INTEGER NOT NULL,
+    PRIMARY KEY (person_id, todo_id)
+);
+CREATE INDEX IF NOT EXISTS todo_assignees_todo ON todo_assignees (todo_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class TodoStore(object):
+    """
+    To-dos from every Project, stored locally with indexes on Project, assignee, due date and completion.
+
+    `sync` fetches only the to-dos that changed since the last sync, newest first, using a `ChangeFeed` on
+    `/projects/recordings.json?type=Todo&sort=updated_at`. The first sync fetches every to-do in the account. Active,
+    archived and trashed to-dos are all followed, so a to-do that is trashed stops matching active queries.
+
+    How stale query results may be is up to `refresh`, a `basecampy3.freshness.FreshnessPolicy`: if the last sync is
+    younger than its `max_age`, queries are answered locally. Within `stale_while_revalidate` after that, they are
+    answered locally while a sync runs in the background. Otherwise the query waits for a sync. Without a policy,
+    the store is only synced when `sync` is called.
+    """
+
+    STATUSES = ("active", "archived", "trashed")
+
+    def __init__(self, api, path=":memory:", refresh=None, projects=None):
+        """
+        :param api: the Basecamp3 object to sync with
+        :type api: basecampy3.bc3_api.Basecamp3
+        :param path: the SQLite database file to keep the to-dos in. A file lets later runs pick up where this one left
+                     off instead of fetching every to-do again.
+        :type path: str
+        :param refresh: when queries should sync first. None means only when `sync` is called.
+        :type refresh: basecampy3.freshness.FreshnessPolicy
+        :param projects: Project objects or IDs to limit the store to. By default, every Project is included.
+        :type projects: typing.Iterable[basecampy3.endpoints.projects.Project|int]
+        """
+        self._api = api
+        self.refresh = refresh
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        checkpoint = self._get_meta("checkpoint")
+        self._feed = ChangeFeed(api, types=["Todo"], projects=projects, statuses=self.STATUSES,
+                                checkpoint=json.loads(checkpoint) if checkpoint else None, backfill=True)
+        self._background = None
+
+    @property
+    def synced_at(self):
+        """
+        :return: when the last sync finished (as a UNIX timestamp), or None if the store has never been synced
+        :rtype: float|None
+        """
+        value = self._get_meta("synced_at")
+        return float(value) if value is not None else None
+
+    @property
+    def age(self):
+        """
+        :return: seconds since the last sync finished, or None if the store has never been synced
+        :rtype: float|None
+        """
+        synced_at = self.synced_at
+        return None if synced_at is None else time.time() - synced_at
+
+    def sync(self):
+        """
+        Fetch the to-dos that changed since the last sync and store them. If any status fails to sync, nothing is
+        stored and the next sync fetches the same changes again.
+
+        :return: how many to-dos were added or updated
+        :rtype: int
+        """
+        with self._sync_lock:
+            changes = self._feed.poll(force=True)
+            with self._lock, self._db:
+                for todo in changes:
+                    self._store(todo._values)
+                self._set_meta("checkpoint", json.dumps(self._feed.checkpoint))
+                self._set_meta("synced_at", repr(time.time()))
+        if changes:
+            logger.debug("Synced %d changed to-do(s).", len(changes))
+        return len(changes)
+
+    def query(self, assignee=None, project=None, completed=False, due_before=None, due_after=None, overdue=False,
+              status="active", limit=None):
+        """
+        Find to-dos in the store, soonest due first (to-dos without a due date last). All given filters must match.
+
+        :param assignee: only to-dos assigned to this Person object or ID
+        :type assignee: basecampy3.endpoints.people.Person|int
+        :param project: only to-dos in this Project object or ID
+        :type project: basecampy3.endpoints.projects.Project|int
+        :param completed: True for only completed to-dos, False (the default) for only incomplete ones, or None for
+                          both
+        :type completed: bool|None
+        :param due_before: only to-dos due before this date
+        :type due_before: datetime.date|str
+        :param due_after: only to-dos due after this date
+        :type due_after: datetime.date|str
+        :param overdue: only incomplete to-dos that were due before today
+        :type overdue: bool
+        :param status: "active", "archived", "trashed", or None for any
+        :type status: str|None
+        :param limit: return at most this many to-dos
+        :type limit: int
+        :return: the matching to-dos
+        :rtype: list[basecampy3.endpoints.todos.TodoItem]
+        """
+        self._refresh_if_needed()
+        if overdue:
+            completed = False
+            today = datetime.date.today().isoformat()
+            due_before = min(_date(due_before), today) if due_before is not None else today
+
+        sql = ["SELECT todos.json FROM todos"]
+        where = []
+        args = []
+        if assignee is not None:
+            sql.append("JOIN todo_assignees ON todo_assignees.todo_id = todos.id")
+            where.append("todo_assignees.person_id = ?")
+            args.append(int(assignee))
+        if project is not None:
+            where.append("todos.project_id = ?")
+            args.append(int(project))
+        if completed is not None:
+            where.append("todos.completed = ?")
+            args.append(1 if completed else 0)
+        if due_before is not None:
+            where.append("todos.due_on < ?")
+            args.append(_date(due_before))
+        if due_after is not None:
+            where.append("todos.due_on > ?")
+            args.append(_date(due_after))
+        if status is not None:
+            where.append("todos.status = ?")
+            args.append(status)
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY todos.due_on IS NULL, todos.due_on, todos.id")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            args.append(int(limit))
+
+        with self._lock:
+            rows = self._db.execute(" ".join(sql), args).fetchall()
+        return [registry.object_from_json(json.loads(row[0]), self._api) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM todos").fetchone()[0]
+
+    def _refresh_if_needed(self):
+        """
+        Sync now, in the background, or not at all, as `refresh` says.
+        """
+        if self.refresh is None:
+            return
+        age = self.age
+        if age is not None and self.refresh.is_fresh(age):
+            return
+        if age is not None and self.refresh.can_serve_stale(age):
+            with self._lock:
+                if self._background is not None and self._background.is_alive():
+                    return
+                self._background = threading.Thread(target=self._sync_in_background, name="todo-store-sync")
+                self._background.daemon = True
+                self._background.start()
+            return
+        self.sync()
+
+    def _sync_in_background(self):
+        try:
+            self.sync()
+        except Exception:
+            logger.exception("Unable to sync the to-do store in the background.")
+
+    def _store(self, values):
+        todo_id = values["id"]
+        self._db.execute("INSERT OR REPLACE INTO todos (id, project_id, status, completed, due_on, updated_at, json) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (todo_id, values["bucket"]["id"], values.get("status", "active"),
+                          1 if values.get("completed") else 0, values.get("due_on"), values["updated_at"],
+                          json.dumps(values)))
+        self._db.execute("DELETE FROM todo_assignees WHERE todo_id = ?", (todo_id,))
+        self._db.executemany("INSERT OR IGNORE INTO todo_assignees (person_id, todo_id) VALUES (?, ?)",
+                             [(person["id"], todo_id) for person in values.get("assignees") or ()])
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def _date(value):
+    """
+    :return: a date as the YYYY-MM-DD string Basecamp uses for `due_on`
+    :rtype: str
+    """
+    if isinstance(value, six.string_types):
+        return value
+    return value.isoformat()[:10]
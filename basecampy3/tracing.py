@@ -0,0 +1,354 @@
+"""
+Optional tracing of what basecampy3 does. Pass a Tracer to `Basecamp3(tracer=...)` and every public endpoint method
+(i.e. `Projects.find` or `Todos.list`) gets a span, each page of a paginated list gets a child span, and spans that
+make HTTP requests are given attributes for cache status and time spent waiting on the rate limiter.
+
+Without a tracer, nothing is wrapped and tracing costs nothing.
+
+```
+tracer = InMemoryTracer()
+bc3 = Basecamp3(tracer=tracer)
+bc3.projects.find("Marketing")
+for span in tracer.spans:
+    print(span)
+```
+
+Use `OpenTelemetryTracer` to send spans to OpenTelemetry (requires the `opentelemetry-api` package).
+
+Spans are tracked per thread. Work a method hands to other threads (i.e. `VaultWalker` listings) starts new root
+spans in those threads.
+"""
+import abc
+import functools
+import inspect
+import itertools
+import threading
+import time
+
+import six
+
+from . import constants
+
+_local = threading.local()
+
+
+class Span(object):
+    """
+    A unit of traced work. This base class is also the span handed out when tracing is disabled, and ignores
+    everything it is told.
+    """
+
+    def set_attribute(self, key, value):
+        """
+        :param key: the attribute name, i.e. "http.status_code"
+        :type key: str
+        :param value: a string, number, or boolean
+        """
+
+    def record_exception(self, exception):
+        """
+        Mark the span as failed because of `exception`.
+
+        :type exception: BaseException
+        """
+
+    def end(self):
+        """
+        Finish the span. Called exactly once.
+        """
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Tracer(object):
+    """
+    Extend this class to send spans somewhere.
+    """
+
+    enabled = True
+    """Endpoints are only instrumented when their API object's tracer is enabled."""
+
+    @abc.abstractmethod
+    def start_span(self, name, parent=None, attributes=None):
+        """
+        :param name: what the span is for, i.e. "Todos.list"
+        :type name: str
+        :param parent: the span this one is a part of, or None for a root span
+        :type parent: Span|None
+        :param attributes: attributes to start the span with
+        :type attributes: dict|None
+        :return: a started span
+        :rtype: Span
+        """
+        raise NotImplementedError()
+
+
+_NOOP_SPAN = Span()
+
+
+class NoOpTracer(Tracer):
+    """
+    The default tracer. Disabled, so endpoints are not instrumented at all.
+    """
+
+    enabled = False
+
+    def start_span(self, name, parent=None, attributes=None):
+        return _NOOP_SPAN
+
+
+class RecordedSpan(Span):
+    """
+    A span kept in memory by `InMemoryTracer`.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, tracer, name, parent, attributes):
+        self._tracer = tracer
+        self.name = name
+        self.span_id = next(self._ids)
+        self.parent_id = parent.span_id if isinstance(parent, RecordedSpan) else None
+        self.attributes = dict(attributes or {})
+        self.exception = None
+        self.start_time = time.time()
+        self.end_time = None
+        self.thread = threading.current_thread().name
+
+    @property
+    def duration(self):
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exception):
+        self.exception = exception
+
+    def end(self):
+        self.end_time = time.time()
+        self._tracer._finished(self)
+
+    def __repr__(self):
+        return "RecordedSpan(%r, id=%s, parent=%s, duration=%s, attributes=%r)" % (
+            self.name, self.span_id, self.parent_id, self.duration, self.attributes)
+
+
+class InMemoryTracer(Tracer):
+    """
+    Keeps finished spans in a list, in the order they ended. Handy for tests and for seeing how many requests a call
+    really makes.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name, parent=None, attributes=None):
+        return RecordedSpan(self, name, parent, attributes)
+
+    def children(self, span):
+        """
+        :return: the finished spans whose parent is `span`
+        :rtype: list[RecordedSpan]
+        """
+        with self._lock:
+            return [s for s in self.spans if s.parent_id == span.span_id]
+
+    def clear(self):
+        with self._lock:
+            del self.spans[:]
+
+    def _finished(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Sends spans to OpenTelemetry. Root spans become children of whatever OpenTelemetry span is current when the
+    endpoint method is called, so basecampy3's spans show up inside your application's traces.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        :param tracer: an OpenTelemetry Tracer. By default one named "basecampy3" is taken from the global
+                       TracerProvider.
+        :type tracer: opentelemetry.trace.Tracer
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError("OpenTelemetryTracer requires the opentelemetry-api package. "
+                              "Try `pip install basecampy3[opentelemetry]`.")
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("basecampy3", constants.VERSION)
+
+    def start_span(self, name, parent=None, attributes=None):
+        context = None
+        if isinstance(parent, _OpenTelemetrySpan):
+            context = self._trace.set_span_in_context(parent.span)
+        span = self._tracer.start_span(name, context=context, attributes=attributes)
+        return _OpenTelemetrySpan(span, self._trace)
+
+
+class _OpenTelemetrySpan(Span):
+    def __init__(self, span, trace):
+        self.span = span
+        self._trace = trace
+
+    def set_attribute(self, key, value):
+        self.span.set_attribute(key, value)
+
+    def record_exception(self, exception):
+        self.span.record_exception(exception)
+        self.span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(exception)))
+
+    def end(self):
+        self.span.end()
+
+
+def current_span():
+    """
+    :return: the innermost span active in this thread, or None if nothing is being traced
+    :rtype: Span|None
+    """
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+class _Activation(object):
+    """
+    Makes a span the current span of this thread for the duration of a `with` block.
+    """
+    __slots__ = ("span",)
+
+    def __init__(self, span):
+        self.span = span
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _local.stack.pop()
+
+
+class _SpanContext(object):
+    """
+    Starts a span as a child of the current span, makes it current, and ends it when the `with` block exits.
+    """
+    __slots__ = ("tracer", "name", "attributes", "span", "_activation")
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.span = self.tracer.start_span(self.name, parent=current_span(), attributes=self.attributes)
+        self._activation = _Activation(self.span)
+        return self._activation.__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._activation.__exit__(exc_type, exc_val, exc_tb)
+        if exc_val is not None:
+            self.span.record_exception(exc_val)
+        self.span.end()
+
+
+class _NullContext(object):
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+def span(tracer, name, attributes=None):
+    """
+    A `with` block traced as a child of the current span. Does nothing if `tracer` is disabled.
+
+    :param tracer: the tracer to start the span with
+    :type tracer: Tracer
+    :param name: what the span is for
+    :type name: str
+    :param attributes: attributes to start the span with
+    :type attributes: dict|None
+    :return: a context manager that gives the new Span (or None if disabled)
+    """
+    if not tracer.enabled:
+        return _NULL_CONTEXT
+    return _SpanContext(tracer, name, attributes)
+
+
+def set_attribute(key, value):
+    """
+    Set an attribute on the current span of this thread, if there is one.
+    """
+    current = current_span()
+    if current is not None:
+        current.set_attribute(key, value)
+
+
+def instrument(endpoint, tracer):
+    """
+    Wrap every public method of an endpoint object in a span named after its class and method (i.e. "Todos.list").
+    Methods that return a generator (or a ListResult) keep their span open until the generator is exhausted or closed,
+    and each step of the generator runs with the span as current, so the pages it fetches become children of it.
+
+    :param endpoint: the endpoint object to instrument. Its methods are replaced with wrapped ones on the instance.
+    :type endpoint: basecampy3.endpoints._base.BasecampEndpoint
+    :param tracer: the tracer to start spans with
+    :type tracer: Tracer
+    """
+    cls = type(endpoint)
+    for name in dir(cls):
+        if name.startswith("_") or isinstance(getattr(cls, name, None), property):
+            continue
+        method = getattr(endpoint, name)
+        if inspect.ismethod(method):
+            setattr(endpoint, name, _traced(method, tracer, "%s.%s" % (cls.__name__, name)))
+
+
+def _traced(method, tracer, span_name):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = tracer.start_span(span_name, parent=current_span())
+        try:
+            with _Activation(started):
+                result = method(*args, **kwargs)
+        except BaseException as ex:
+            started.record_exception(ex)
+            started.end()
+            raise
+        if inspect.isgenerator(result):
+            return _traced_generator(result, started)
+        if hasattr(result, "_trace_with"):  # i.e. a ListResult, which fetches its pages later like a generator
+            result._trace_with(started)
+            return result
+        started.end()
+        return result
+    return wrapper
+
+
+def _traced_generator(generator, started):
+    try:
+        while True:
+            with _Activation(started):
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+            yield item
+    except BaseException as ex:
+        if not isinstance(ex, GeneratorExit):
+            started.record_exception(ex)
+        raise
+    finally:
+        generator.close()
+        started.end()
@@ -1,8 +1,16 @@
-from requests import adapters
+import threading
+import time
+
+from requests import Response, adapters
+from requests.structures import CaseInsensitiveDict
 from .constants import RATE_LIMIT_PER_SECONDS, RATE_LIMIT_REQUESTS
 from .log import logger
-from .cache import DictionaryCache
-from .rated_semaphore import RatedSemaphore
+from .metrics import RequestSample, endpoint_template
+from . import freshness, retry, tracing
+from .cache import DictionaryCache, invalidation
+from .rated_semaphore import PriorityRatedSemaphore, current_priority
+from .request_context import request_context
+from .single_flight import SingleFlight
 
 
 class Basecamp3TransportAdapter(adapters.HTTPAdapter):
@@ -10,23 +18,44 @@ class Basecamp3TransportAdapter(adapters.HTTPAdapter):
     Handles API request caching and rate-limiting.
     """
 
-    SEMAPHORE = RatedSemaphore(RATE_LIMIT_REQUESTS, RATE_LIMIT_PER_SECONDS)
+    SEMAPHORE = PriorityRatedSemaphore(RATE_LIMIT_REQUESTS, RATE_LIMIT_PER_SECONDS)
     """
     Used to keep us under the limits defined here 
     https://github.com/basecamp/bc3-api#rate-limiting-429-too-many-requests
-    A `RatedSemaphore` allows us to block if we hit the API limits.
+    A `PriorityRatedSemaphore` allows us to block if we hit the API limits, letting requests tagged with a higher
+    priority (see `basecampy3.rated_semaphore.priority`) through first.
     """
 
-    def __init__(self, cache_backend=None, *args, **kwargs):
+    def __init__(self, cache_backend=None, metrics=None, coalesce=True, freshness_policy=None, retry_policy=None, *args,
+                 **kwargs):
         """
         Applied to a requests.Session object to implement caching and rate-limiting
 
         :param cache_backend: stores responses for later retrieval if the response is unchanged
         :type cache_backend: basecampy3.response_cache.ResponseCache
+        :param metrics: told about the timing, size, and cache status of every request
+        :type metrics: basecampy3.metrics.MetricsHook
+        :param coalesce: when several threads GET the same URL with the same credentials at the same time, make one
+                         request and give each thread a copy of the response
+        :type coalesce: bool
+        :param freshness_policy: when a GET can be answered from the cache without contacting Basecamp. Either one
+                                 FreshnessPolicy for every GET or per-endpoint rules (see `basecampy3.freshness`).
+                                 By default, every GET is revalidated.
+        :type freshness_policy: basecampy3.freshness.FreshnessPolicy|basecampy3.freshness.FreshnessRules|dict
+        :param retry_policy: which failed requests are sent again, and after how long. Every attempt waits on the rate
+                             limiter like any other request. Defaults to `RetryPolicy()`; use
+                             `basecampy3.retry.NO_RETRIES` to turn retrying off.
+        :type retry_policy: basecampy3.retry.RetryPolicy
         :param args: whatever args are supported by requests.adapters.HTTPAdapter
         :param kwargs: whatever kwargs are supported by requests.adapters.HTTPAdapter
         """
         self._cache = DictionaryCache() if cache_backend is None else cache_backend
+        self.metrics = metrics
+        self._single_flight = SingleFlight() if coalesce else None
+        self.freshness = freshness.FreshnessRules.coerce(freshness_policy)
+        self.retry_policy = retry.RetryPolicy() if retry_policy is None else retry_policy
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
         super(Basecamp3TransportAdapter, self).__init__(*args, **kwargs)
 
     def send(self, request, *args, **kwargs):
@@ -36,24 +65,221 @@ class Basecamp3TransportAdapter(adapters.HTTPAdapter):
         See also:
         https://github.com/basecamp/bc3-api#using-http-caching
 
+        A GET whose cached response is fresh enough under the freshness policy is answered from the cache, possibly
+        revalidating it in the background. Identical GETs that are already in flight are not sent again. They wait for
+        the response to the first one instead (see `coalesce`).
+
         :param request: The :class:`PreparedRequest <PreparedRequest>` being sent.
         :type request: requests.PreparedRequest
         """
+        if request.method != "GET" or request.body or kwargs.get("stream"):
+            return self._send(request, *args, **kwargs)
+        response = self._send_from_cache(request, args, kwargs)
+        if response is not None:
+            return response
+        return self._send_coalesced(request, args, kwargs)
+
+    def _send_from_cache(self, request, args, kwargs):
+        """
+        Answer a GET from the cache if its freshness policy allows, starting a background revalidation if the cached
+        response is stale.
+
+        :return: the cached response, or None if the request has to go to Basecamp
+        :rtype: requests.Response|None
+        """
+        policy = freshness.current_policy() or self.freshness.policy_for(request.url)
+        if policy is None:
+            return None
+        age = self._cache.get_cached_age(request.method, request.url)
+        if age is None:
+            return None
+        if policy.is_fresh(age):
+            state = "fresh"
+        elif policy.can_serve_stale(age):
+            state = "stale"
+        else:
+            return None
+        try:
+            response = self._cache.get_cached_response(request.method, request.url)
+        except KeyError:  # evicted since we checked its age
+            return None
+        if response is None or not response.ok:
+            return None
+
+        if state == "stale":
+            self._revalidate_in_background(request, args, kwargs)
+        logger.debug("Answering from the cache (%s, %.1f seconds old) for %s", state, age, request.url)
+        if tracing.current_span() is not None:
+            tracing.set_attribute("http.status_code", response.status_code)
+            tracing.set_attribute("basecamp.cache", state)
+        if self.metrics is not None:
+            now = time.time()
+            self._record(request, response, True, now, now, now, False, from_cache=True)
+        return response
+
+    def _revalidate_in_background(self, request, args, kwargs):
+        """
+        Send a copy of this GET from a background thread so that the cache is refreshed, with the `priority` and
+        `retry_policy` of the thread that asked for it. At most one background revalidation per URL and credentials
+        runs at a time.
+        """
+        key = (request.url, request.headers.get("Authorization"))
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        request = request.copy()
+        context = request_context()
+
+        def revalidate():
+            try:
+                with context:
+                    self._send_coalesced(request, args, kwargs)
+            except Exception as ex:
+                logger.warning("Unable to revalidate the cached response for %s in the background: %s", request.url, ex)
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        thread = threading.Thread(target=revalidate, name="bc3-revalidate")
+        thread.daemon = True
+        thread.start()
+
+    def _send_coalesced(self, request, args, kwargs):
+        """
+        Send a GET, or wait for an identical one that is already in flight and share its response.
+        """
+        if self._single_flight is None:
+            return self._send(request, *args, **kwargs)
+
+        started = time.time()
+        key = (request.url, request.headers.get("Authorization"), request.headers.get("Range"))
+        response, shared = self._single_flight.do(key, lambda: self._send_and_read(request, *args, **kwargs))
+        if not shared:
+            return response
+
+        logger.debug("Shared the response to an identical request already in flight for %s", request.url)
+        if tracing.current_span() is not None:
+            tracing.set_attribute("http.status_code", response.status_code)
+            tracing.set_attribute("basecamp.coalesced", True)
+        if self.metrics is not None:
+            self._record(request, response, False, started, started, time.time(), False, coalesced=True)
+        return self._copy_response(response, request)
+
+    def _send_and_read(self, request, *args, **kwargs):
+        response = self._send(request, *args, **kwargs)
+        response.content  # so that threads sharing this response can each have a copy of the body
+        return response
+
+    def _copy_response(self, response, request):
+        """
+        A copy of a response for a different (but identical) request. requests.Session modifies the responses it
+        gets, so threads sharing a response each get their own.
+        """
+        clone = Response()
+        clone.__setstate__(response.__getstate__())
+        clone.headers = CaseInsensitiveDict(clone.headers)
+        clone.request = request
+        clone.connection = self
+        return clone
+
+    def _send(self, request, *args, **kwargs):
         self._set_cache_headers(request)
         method = request.method
         url = request.url
-        logger.debug("Consulting with Semaphore")
-        with Basecamp3TransportAdapter.SEMAPHORE:  # blocks here until rate limit has cooled off
-            logger.debug("OK we can request now.")
-            response = super(Basecamp3TransportAdapter, self).send(request, *args, **kwargs)
-        if response.status_code == 304:  # not modified; cache hit
+        policy = retry.current_policy() or self.retry_policy
+        attempt = 1
+        while True:
+            started = time.time()
+            logger.debug("Consulting with Semaphore")
+            try:
+                with Basecamp3TransportAdapter.SEMAPHORE:  # blocks here until rate limit has cooled off
+                    logger.debug("OK we can request now.")
+                    acquired = time.time()
+                    response = super(Basecamp3TransportAdapter, self).send(request, *args, **kwargs)
+                    if self.metrics is not None and not kwargs.get("stream"):
+                        response.content  # read the body now so that it counts as network time
+            except Exception as ex:
+                if not policy.should_retry(request, attempt, exception=ex):
+                    raise
+                delay = policy.delay(attempt)
+                logger.warning("%s %s failed (%s). Retrying in %.1f seconds.", method, url, ex, delay)
+            else:
+                finished = time.time()
+                if not policy.should_retry(request, attempt, response=response):
+                    break
+                delay = policy.delay(attempt, response)
+                if self.metrics is not None:
+                    self._record(request, response, False, started, acquired, finished, kwargs.get("stream"),
+                                 attempt=attempt)
+                logger.warning("%s %s answered %s. Retrying in %.1f seconds.", method, url, response.status_code,
+                               delay)
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+        cache_hit = response.status_code == 304  # not modified; cache hit
+        if tracing.current_span() is not None:
+            tracing.set_attribute("http.status_code", response.status_code)
+            tracing.set_attribute("basecamp.cache", "hit" if cache_hit else "miss")
+            tracing.set_attribute("basecamp.rate_limit_wait", acquired - started)
+            tracing.set_attribute("basecamp.priority", current_priority())
+            if attempt > 1:
+                tracing.set_attribute("basecamp.attempts", attempt)
+        if self.metrics is not None:
+            self._record(request, response, cache_hit, started, acquired, finished, kwargs.get("stream"),
+                         attempt=attempt)
+        if cache_hit:
+            self._cache.touch(method, url)
             cached_response = self._cache.get_cached_response(method, url)
             logger.debug("Returning a cached response for %s, %s", method, url)
             return cached_response
+        elif kwargs.get("stream"):
+            # the body hasn't been read, and whoever reads it won't keep it, so it can't be cached. What is cached for
+            # this URL has changed though, so don't let a freshness policy answer with it.
+            if response.ok and self._cache.get_cached_age(method, url) is not None:
+                self._cache.invalidate(lambda m, u: m == method and u == url)
+            return response
         else:
             self._cache_this_response(response)
+            if method in invalidation.WRITE_METHODS and response.ok:
+                self._invalidate_after_write(request, response)
             return response
 
+    def _invalidate_after_write(self, request, response):
+        """
+        Make sure nothing a successful write may have changed is answered from the cache without revalidating.
+        """
+        try:
+            invalidation.invalidate_for_write(self._cache, request.method, request.url, response)
+        except Exception:
+            logger.exception("Unable to invalidate cached responses after a %s to %s", request.method, request.url)
+
+    def _record(self, request, response, cache_hit, started, acquired, finished, stream, coalesced=False,
+                from_cache=False, attempt=1):
+        """
+        Pass the measurements of one request to our MetricsHook.
+        """
+        try:
+            bytes_sent = int(request.headers.get("Content-Length") or 0)
+        except ValueError:
+            bytes_sent = 0
+        if coalesced or from_cache:
+            bytes_received = 0  # nothing was downloaded for this request
+        elif stream:
+            bytes_received = int(response.headers.get("Content-Length") or 0)
+        else:
+            bytes_received = len(response.content or b"")
+        sample = RequestSample(method=request.method, endpoint=endpoint_template(request.url),
+                               status_code=response.status_code, duration=finished - started,
+                               wait=acquired - started, network=finished - acquired, cache_hit=cache_hit,
+                               bytes_sent=bytes_sent, bytes_received=bytes_received, attempt=attempt,
+                               coalesced=coalesced)
+        try:
+            self.metrics.record_request(sample)
+        except Exception:
+            logger.exception("Metrics hook %r failed to record a request.", self.metrics)
+
     def _cache_this_response(self, response):
         """
         Cache the given HTTP response in the cache backend.
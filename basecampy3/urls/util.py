@@ -5,9 +5,6 @@
 import logging as _logging
 from datetime import date, datetime
 
-import pytz
-from tzlocal import get_localzone
-
 _logger = _logging.getLogger(__name__)
 
 
@@ -75,6 +72,7 @@ def fix_naive_datetime(dt, warn=True):
     :rtype: datetime
     """
     if dt.tzinfo is None:
+        from tzlocal import get_localzone  # slow to import and rarely needed
         local_timezone = get_localzone()
         if warn:
             _logger.warning("Naive (no timezone) datetime is being converted to "
@@ -110,6 +108,7 @@ def to_date_string(d):
         d.date()  # is this a datetime?
         # set timezone to UTC and return date
         dt = fix_naive_datetime(d)  # warn if naive
+        import pytz
         dt = dt.astimezone(pytz.utc)
         return dt.strftime("%Y-%m-%d")
     except AttributeError:
@@ -0,0 +1,320 @@
+"""
+Receive Basecamp 3 webhooks instead of polling for changes. Register a webhook pointing at this server with
+`Basecamp3.urls.webhooks.create(...)`, then run a `WebhookReceiver` with a function that accepts a list of
+`WebhookEvent` objects.
+
+Each delivery is acknowledged as soon as it is queued. A dispatcher thread then hands the queued events to your handler
+in batches. Deliveries Basecamp retries are dropped if their event ID was seen recently. When the queue is full, a
+delivery waits briefly for room and is otherwise refused with "503 Service Unavailable", so Basecamp delivers it again
+later instead of the server buffering without limit.
+
+https://github.com/basecamp/bc3-api/blob/master/sections/webhooks.md
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from six.moves import queue
+from six.moves.urllib_parse import urlparse
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+
+from . import constants
+from .endpoints import registry
+from .endpoints._base import BasecampObject
+from .log import logger
+
+
+class WebhookEvent(BasecampObject):
+    """
+    A single webhook delivery. `kind` tells you what happened (i.e. "todo_created") and `recording` is the object it
+    happened to.
+    """
+
+    def __init__(self, json_dict, api=None):
+        """
+        :param json_dict: the parsed JSON body of the webhook delivery
+        :type json_dict: dict
+        :param api: optionally bind `recording` to this Basecamp3 object so its methods can call the API
+        :type api: basecampy3.bc3_api.Basecamp3
+        """
+        super(WebhookEvent, self).__init__(json_dict, None)
+        self._api = api
+        self._recording = None
+
+    @property
+    def recording(self):
+        """
+        :return: the object this event is about, as the matching BasecampObject subclass (i.e. a TodoItem for a Todo)
+        :rtype: BasecampObject
+        """
+        if self._recording is None and self._values.get("recording") is not None:
+            self._recording = registry.object_from_json(self._values["recording"], self._api)
+        return self._recording
+
+    def __str__(self):
+        try:
+            return "WebhookEvent {0.id}: {0.kind}".format(self)
+        except AttributeError:
+            return super(WebhookEvent, self).__str__()
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    """
+    Accepts POSTed webhook payloads and passes them to the `WebhookReceiver` that owns the server.
+    """
+
+    def do_POST(self):
+        receiver = self.server.receiver
+        if receiver.path is not None and urlparse(self.path).path != receiver.path:
+            self._respond(404)
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self._respond(400)
+            return
+        if length > receiver.max_body_size:
+            self._respond(413)
+            return
+        body = self.rfile.read(length)
+        try:
+            payload = json.loads(body.decode("utf-8"))
+            if not isinstance(payload, dict):
+                raise ValueError("Webhook payload is not a JSON object")
+        except ValueError:
+            logger.warning("Ignoring a webhook delivery that is not valid JSON.")
+            self._respond(400)
+            return
+
+        if receiver.submit(payload):
+            self._respond(200)
+        else:
+            self._respond(503, headers={"Retry-After": "%d" % max(1, receiver.batch_interval)})
+
+    def log_message(self, format, *args):
+        logger.debug("Webhook %s - %s", self.address_string(), format % args)
+
+    def _respond(self, code, headers=None):
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class WebhookHTTPServer(ThreadingMixIn, HTTPServer, object):
+    """
+    An HTTPServer that handles each delivery in its own thread and knows which WebhookReceiver it belongs to.
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address, receiver, RequestHandlerClass=WebhookRequestHandler):
+        """
+        :param server_address: a tuple of the form (local_ip_address, listen_port)
+        :type server_address: tuple[str, int]
+        :param receiver: the WebhookReceiver to pass deliveries to
+        :type receiver: WebhookReceiver
+        :param RequestHandlerClass: the class that will be instantiated for each request to handle the request
+        :type RequestHandlerClass: type[WebhookRequestHandler]
+        """
+        self.receiver = receiver
+        super(WebhookHTTPServer, self).__init__(server_address, RequestHandlerClass)
+
+
+class WebhookReceiver(object):
+    """
+    An embeddable HTTP server that receives Basecamp webhooks and calls `handler` with batches of WebhookEvents.
+
+    ```
+    def handle(events):
+        for event in events:
+            print(event.kind, event.recording)
+
+    with WebhookReceiver(handle, api=bc3, listen_addr="0.0.0.0", path="/hooks/some-secret"):
+        ...  # events are handled in the background until the block exits
+    ```
+    """
+
+    def __init__(self, handler, api=None, listen_addr=None, listen_port=None, path=None, batch_size=50,
+                 batch_interval=1.0, max_queue=1000, enqueue_timeout=5.0, dedupe_window=10000,
+                 max_body_size=1024 * 1024):
+        """
+        :param handler: called from the dispatcher thread with a list of WebhookEvent objects
+        :type handler: typing.Callable[[list[WebhookEvent]], typing.Any]
+        :param api: optionally bind the events' recordings to this Basecamp3 object
+        :type api: basecampy3.bc3_api.Basecamp3
+        :param listen_addr: the address to bind to (defaults to `constants.WEBHOOK_LOCAL_BIND_ADDRESS`)
+        :type listen_addr: str
+        :param listen_port: the port to listen on (defaults to `constants.WEBHOOK_LOCAL_BIND_PORT`). Use 0 to have the
+                            operating system pick a free port; `server_address` tells you which one it picked.
+        :type listen_port: int
+        :param path: if given, only deliveries POSTed to this exact path are accepted. Basecamp does not sign webhook
+                     payloads, so a hard-to-guess path is the usual way to keep strangers out.
+        :type path: str
+        :param batch_size: the most events passed to `handler` in one call
+        :type batch_size: int
+        :param batch_interval: how many seconds to wait for a batch to fill up once its first event arrives
+        :type batch_interval: float
+        :param max_queue: how many events can wait for the handler before deliveries are refused
+        :type max_queue: int
+        :param enqueue_timeout: how many seconds a delivery waits for room in a full queue before being refused
+        :type enqueue_timeout: float
+        :param dedupe_window: how many recent event IDs to remember for dropping repeated deliveries
+        :type dedupe_window: int
+        :param max_body_size: deliveries larger than this many bytes are refused
+        :type max_body_size: int
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if listen_addr is None:
+            listen_addr = constants.WEBHOOK_LOCAL_BIND_ADDRESS
+        if listen_port is None:
+            listen_port = constants.WEBHOOK_LOCAL_BIND_PORT
+
+        self.handler = handler
+        self.api = api
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.dedupe_window = dedupe_window
+        self.max_body_size = max_body_size
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._seen = OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._server = WebhookHTTPServer((listen_addr, listen_port), self)
+        self._serving = False
+        self._server_thread = None
+        self._dispatcher_thread = None
+        self._stop_lock = threading.Lock()
+
+    @property
+    def server_address(self):
+        """
+        :return: the (address, port) the server is actually bound to
+        :rtype: tuple[str, int]
+        """
+        return self._server.server_address
+
+    def submit(self, payload):
+        """
+        Queue a webhook payload for the handler. Called by the HTTP server for each delivery, but can also be called
+        directly (i.e. to replay payloads stored elsewhere).
+
+        :param payload: the parsed JSON body of a webhook delivery
+        :type payload: dict
+        :return: False if the queue stayed full for `enqueue_timeout` seconds and the payload was not accepted
+        :rtype: bool
+        """
+        event_id = payload.get("id")
+        if event_id is not None and self._already_seen(event_id):
+            logger.debug("Dropping repeated webhook delivery for event %s", event_id)
+            return True
+        try:
+            self._queue.put(WebhookEvent(payload, self.api), timeout=self.enqueue_timeout)
+        except queue.Full:
+            logger.warning("Webhook queue is full. Refusing event %s so that Basecamp retries it later.", event_id)
+            self._forget(event_id)
+            return False
+        return True
+
+    def start(self):
+        """
+        Start serving and dispatching in background threads and return immediately.
+        """
+        self._start_dispatcher()
+        self._serving = True
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name="bc3-webhook-server")
+        self._server_thread.daemon = True
+        self._server_thread.start()
+        logger.info("Listening for Basecamp webhooks on %s:%s", *self.server_address[:2])
+
+    def serve_forever(self):
+        """
+        Serve in the current thread until `stop()` is called from another thread (or CTRL+C is pressed).
+        """
+        self._start_dispatcher()
+        self._serving = True
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._serving = False
+            self.stop()
+
+    def stop(self, timeout=None):
+        """
+        Stop accepting deliveries, hand any events still queued to the handler, and release the listening socket.
+
+        :param timeout: the most seconds to wait for queued events to be handled
+        :type timeout: float
+        """
+        with self._stop_lock:
+            if self._serving:  # by `start` or `serve_forever`, so it has to be told to stop
+                self._server.shutdown()  # returns once the serving thread has left serve_forever
+                self._serving = False
+            if self._server_thread is not None:
+                self._server_thread.join(timeout)
+                self._server_thread = None
+            self._server.server_close()
+            self._stopping.set()
+            if self._dispatcher_thread is not None:
+                self._dispatcher_thread.join(timeout)
+                self._dispatcher_thread = None
+
+    def _start_dispatcher(self):
+        self._stopping.clear()
+        self._dispatcher_thread = threading.Thread(target=self._dispatch_loop, name="bc3-webhook-dispatcher")
+        self._dispatcher_thread.daemon = True
+        self._dispatcher_thread.start()
+
+    def _dispatch_loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            batch = [first]
+            deadline = time.time() + self.batch_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0 or self._stopping.is_set():
+                    remaining = 0
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.handler(batch)
+            except Exception:
+                logger.exception("Webhook handler raised an error on a batch of %d event(s).", len(batch))
+
+    def _already_seen(self, event_id):
+        """
+        Remember `event_id` and report whether it was already remembered.
+        """
+        with self._seen_lock:
+            if event_id in self._seen:
+                return True
+            self._seen[event_id] = None
+            while len(self._seen) > self.dedupe_window:
+                self._seen.popitem(last=False)
+            return False
+
+    def _forget(self, event_id):
+        with self._seen_lock:
+            self._seen.pop(event_id, None)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -16,6 +16,7 @@ setup(
     version=about['__version__'],
     packages=find_packages(exclude=["tests"]),
     install_requires=[
+        "futures; python_version < '3'",
         "python-dateutil",
         "pytz",
         "requests",
@@ -23,6 +24,10 @@ setup(
         "urllib3<2.0.0",
         "tzlocal<=2.1",
     ],
+    extras_require={
+        "opentelemetry": ["opentelemetry-api"],
+        "orjson": ["orjson"],
+    },
     entry_points={
         'console_scripts': [
             'bc3 = basecampy3.bc3_cli:main',
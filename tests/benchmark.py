@@ -0,0 +1,287 @@
+"""
+Benchmarks the real Basecamp3 client against the fake Basecamp server in `tests.fake_basecamp`. No Basecamp account or
+network connection is needed, so the numbers can be compared between versions of basecampy3 on the same machine.
+
+Run from the root of the repository:
+
+```
+python -m tests.benchmark                          # every scenario
+python -m tests.benchmark list find --repeat 10    # only some scenarios
+python -m tests.benchmark --json before.json       # save results...
+python -m tests.benchmark --compare before.json    # ...and compare a later run against them
+```
+
+The client's own rate limiter (50 requests per 10 seconds) would dominate every timing, so it is replaced with an
+unlimited semaphore and the fake server does not rate limit either, unless `--rate-limit` is given.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from basecampy3.constants import VERSION
+from basecampy3.pagination import parallel_pages
+from basecampy3.transport_adapter import Basecamp3TransportAdapter
+
+from .fake_basecamp import FakeBasecamp
+
+SCENARIOS = []
+
+
+def scenario(name, description):
+    """
+    Register a benchmark scenario. The decorated function receives a `Context` and returns a callable to time, so
+    that anything it does beforehand is not part of the measurement.
+    """
+    def decorator(func):
+        SCENARIOS.append((name, description, func))
+        return func
+    return decorator
+
+
+class Context(object):
+    """
+    What a scenario has to work with: the fake server, its seeded data, and a fresh client with an empty cache.
+    """
+
+    def __init__(self, fake, data, workdir):
+        self.fake = fake
+        self.data = data
+        self.workdir = workdir
+        self.bc3 = fake.client()
+
+
+@scenario("list", "list all 401 Projects (7 geared pages)")
+def list_projects(ctx):
+    return lambda: sum(1 for _ in ctx.bc3.projects.list())
+
+
+@scenario("list_par", "list all 401 Projects, fetching pages 2-7 four at a time")
+def list_projects_parallel(ctx):
+    def run():
+        with parallel_pages(max_workers=4):
+            return sum(1 for _ in ctx.bc3.projects.list())
+    return run
+
+
+@scenario("find", "find the oldest Project by name")
+def find_project(ctx):
+    needle = ctx.data["projects"][0]["name"]
+    return lambda: ctx.bc3.projects.find(name=needle)
+
+
+@scenario("count", "count the 500 to-dos in a to-do list")
+def count_todos(ctx):
+    todolist = ctx.bc3.todolists.get(ctx.data["todolist"]["id"], project=ctx.data["big_project"]["id"])
+    return lambda: todolist.list().count()
+
+
+@scenario("bulk_create", "create 100 to-dos in a new to-do list")
+def bulk_create(ctx):
+    big_project = ctx.data["big_project"]
+    created = ctx.fake.create_child(ctx.fake.dock_id(big_project, "todoset"), "todolists", name="Bulk List")
+    todolist = ctx.bc3.todolists.get(created["id"], project=big_project["id"])
+
+    def run():
+        for n in range(100):
+            todolist.create("Benchmark to-do %d" % n)
+    return run
+
+
+@scenario("cache_hit", "list 500 to-dos again when nothing changed (every page is a 304)")
+def cache_hit(ctx):
+    todolist = ctx.bc3.todolists.get(ctx.data["todolist"]["id"], project=ctx.data["big_project"]["id"])
+    list(todolist.list())  # warm the cache
+    return lambda: sum(1 for _ in todolist.list())
+
+
+@scenario("upload", "upload a 1 MiB file and create an Upload from it, 10 times")
+def upload(ctx):
+    project_id = ctx.data["big_project"]["id"]
+    vault_id = ctx.fake.dock_id(ctx.data["big_project"], "vault")
+    filepath = os.path.join(ctx.workdir, "benchmark.bin")
+    with open(filepath, "wb") as outfile:
+        outfile.write(os.urandom(1024 * 1024))
+
+    def run():
+        for _ in range(10):
+            resp = ctx.bc3.urls.attachments.create(filepath, content_type="application/octet-stream") \
+                .request(ctx.bc3.session)
+            resp.raise_for_status()
+            sgid = resp.json()["attachable_sgid"]
+            ctx.bc3.urls.uploads.create(project_id, vault_id, sgid).request(ctx.bc3.session).raise_for_status()
+    return run
+
+
+def _todo_page(ctx):
+    """
+    :return: a page of 100 to-dos (the 4th page of the 500-to-do list)
+    :rtype: requests.Response
+    """
+    resp = ctx.bc3.session.get(ctx.data["todolist"]["todos_url"], params={"page": 4})
+    resp.raise_for_status()
+    assert len(resp.json()) == 100
+    return resp
+
+
+@scenario("parse_page", "parse a page of 100 to-dos 1000 times with Basecamp3.json_decoder")
+def parse_page(ctx):
+    resp = _todo_page(ctx)
+    decoder = ctx.bc3.json_decoder
+
+    def run():
+        for _ in range(1000):
+            decoder(resp.content)
+    return run
+
+
+@scenario("parse_text", "parse a page of 100 to-dos 1000 times with Response.json(), for comparison")
+def parse_text(ctx):
+    resp = _todo_page(ctx)
+
+    def run():
+        for _ in range(1000):
+            resp.json()
+    return run
+
+
+@scenario("import", "import basecampy3 and Basecamp3 in a new Python process")
+def import_time(ctx):
+    return lambda: _run_python("-c", "from basecampy3 import Basecamp3")
+
+
+@scenario("cli_version", "run `bc3 version` in a new Python process")
+def cli_version(ctx):
+    return lambda: _run_python("-m", "basecampy3.bc3_cli", "version")
+
+
+def _run_python(*args):
+    """
+    Run this Python in a subprocess, so that nothing is already imported. The time includes starting the interpreter,
+    as a cold start does.
+    """
+    with open(os.devnull, "wb") as devnull:
+        subprocess.check_call((sys.executable,) + args, stdout=devnull)
+
+
+def seed(fake):
+    """
+    Fill the fake server with the data every scenario relies on.
+    """
+    projects = fake.seed(projects=400)
+    big_project = fake.create_project("Big Project")
+    todolist = fake.create_child(fake.dock_id(big_project, "todoset"), "todolists", name="Big List")
+    for n in range(500):
+        fake.create_child(todolist["id"], "todos", content="To-do %d" % n)
+    return {"projects": projects, "big_project": big_project, "todolist": todolist}
+
+
+def run_scenario(fake, data, workdir, func, repeat):
+    """
+    :return: the duration of each run in seconds and the number of requests each run made
+    :rtype: tuple[list[float], int]
+    """
+    timings = []
+    requests = 0
+    for _ in range(repeat):
+        ctx = Context(fake, data, workdir)
+        timed = func(ctx)
+        fake.reset_stats()
+        start = time.time()
+        timed()
+        timings.append(time.time() - start)
+        requests = fake.request_count
+    return timings, requests
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        "min": timings[0],
+        "median": timings[len(timings) // 2],
+        "max": timings[-1],
+    }
+
+
+def print_results(results, baseline=None):
+    header = "%-12s %9s %9s %9s %9s" % ("scenario", "min (s)", "median", "max", "requests")
+    if baseline:
+        header += "  %s" % "vs. baseline"
+    print(header)
+    print("-" * len(header))
+    for name, result in sorted(results["scenarios"].items()):
+        line = "%-12s %9.4f %9.4f %9.4f %9d" % (name, result["min"], result["median"], result["max"],
+                                                result["requests"])
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous:
+            line += "  %+.1f%%" % ((result["median"] / previous["median"] - 1) * 100)
+        print(line)
+
+
+def main(argv=None):
+    names = [name for name, _, _ in SCENARIOS]
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmark", description=__doc__.split("\n\n")[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog="\n".join("  %-12s %s" % (n, d) for n, d, _ in SCENARIOS))
+    parser.add_argument("scenarios", nargs="*", metavar="scenario", help="which scenarios to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="how many times to run each scenario (default: 5)")
+    parser.add_argument("--latency", type=float, default=0.002,
+                        help="seconds the fake server waits before each response (default: 0.002)")
+    parser.add_argument("--rate-limit", action="store_true",
+                        help="keep the client's rate limiter and have the server enforce 50 requests per 10 seconds")
+    parser.add_argument("--json", metavar="PATH", help="also write the results to this JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="show the change in median time from an earlier --json file")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.scenarios) - set(names)
+    if unknown:
+        parser.error("unknown scenario(s): %s (choose from %s)" % (", ".join(sorted(unknown)), ", ".join(names)))
+    selected = [s for s in SCENARIOS if not args.scenarios or s[0] in args.scenarios]
+
+    if not args.rate_limit:
+        Basecamp3TransportAdapter.SEMAPHORE = threading.BoundedSemaphore(1024)
+
+    results = {
+        "basecampy3": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.utcnow().isoformat() + "Z",
+        "latency": args.latency,
+        "repeat": args.repeat,
+        "rate_limit": args.rate_limit,
+        "scenarios": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="bc3-benchmark-")
+    try:
+        with FakeBasecamp(latency=args.latency, rate_limit=(50, 10) if args.rate_limit else None) as fake:
+            data = seed(fake)
+            for name, description, func in selected:
+                print("Running %s: %s..." % (name, description), file=sys.stderr)
+                timings, requests = run_scenario(fake, data, workdir, func, args.repeat)
+                result = summarize(timings)
+                result["requests"] = requests
+                results["scenarios"][name] = result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as infile:
+            baseline = json.load(infile)
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, "w") as outfile:
+            json.dump(results, outfile, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,743 @@
+"""
+A fake Basecamp 3 API server for offline tests and benchmarks.
+
+It keeps Projects and their recordings in memory and mimics the parts of the real API that matter to a client's
+performance:
+
+- geared pagination (15, 30, 50, then 100 items per page) with `Link` and `X-Total-Count` headers
+- `ETag` headers and "304 Not Modified" responses to a matching `If-None-Match`
+- "429 Too Many Requests" with `Retry-After` once a client exceeds the rate limit
+- a configurable delay before each response, standing in for network latency
+- Project Templates whose project constructions stay "pending" for `construction_polls` status checks
+
+```
+with FakeBasecamp(latency=0.01) as fake:
+    fake.seed(projects=100, todolists=2, todos=30)
+    bc3 = fake.client()
+    print(len(list(bc3.projects.list())))
+```
+"""
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from six.moves.socketserver import ThreadingMixIn
+from six.moves.urllib_parse import parse_qsl, urlencode, urlparse
+
+DOCK = (
+    # (dock name, recording type, title)
+    ("message_board", "Message::Board", "Message Board"),
+    ("todoset", "Todoset", "To-dos"),
+    ("vault", "Vault", "Docs & Files"),
+    ("chat", "Chat::Transcript", "Campfire"),
+    ("schedule", "Schedule", "Schedule"),
+    ("questionnaire", "Questionnaire", "Automatic Check-ins"),
+    ("inbox", "Inbox", "Email Forwards"),
+)
+"""The tools every new Project gets, in the order Basecamp puts them in the dock."""
+
+KINDS = {
+    # recording type: (URL path segment, {child collection: child recording type})
+    "Chat::Lines::Text": ("lines", {}),
+    "Chat::Transcript": ("chats", {"lines": "Chat::Lines::Text"}),
+    "Comment": ("comments", {}),
+    "Document": ("documents", {}),
+    "Inbox": ("inboxes", {"forwards": "Inbox::Forward"}),
+    "Inbox::Forward": ("inbox_forwards", {"replies": "Inbox::Reply"}),
+    "Inbox::Reply": ("inbox_replies", {}),
+    "Message": ("messages", {}),
+    "Message::Board": ("message_boards", {"messages": "Message"}),
+    "Question": ("questions", {"answers": "Question::Answer"}),
+    "Question::Answer": ("question_answers", {}),
+    "Questionnaire": ("questionnaires", {"questions": "Question"}),
+    "Schedule": ("schedules", {"entries": "Schedule::Entry"}),
+    "Schedule::Entry": ("schedule_entries", {}),
+    "Todo": ("todos", {}),
+    "Todolist": ("todolists", {"todos": "Todo", "groups": "Todolist"}),
+    "Todoset": ("todosets", {"todolists": "Todolist"}),
+    "Upload": ("uploads", {}),
+    "Vault": ("vaults", {"vaults": "Vault", "documents": "Document", "uploads": "Upload"}),
+}
+
+TITLE_FIELDS = {
+    "Todo": "content",
+    "Todolist": "name",
+    "Message": "subject",
+    "Upload": "base_name",
+}
+"""Recording types whose `title` comes from a field other than `title` when they are created or updated."""
+
+
+class FakeBasecamp(object):
+    """
+    An in-memory Basecamp 3 account served over HTTP on localhost. Any Bearer token is accepted.
+    """
+
+    PAGE_SIZES = (15, 30, 50, 100)
+    """Items on page 1, 2, 3 and every page after that."""
+
+    def __init__(self, account_id=999999999, latency=0.0, rate_limit=(50, 10), host="127.0.0.1", port=0):
+        """
+        :param account_id: the ID of the one Basecamp 3 account this server pretends to host
+        :type account_id: int
+        :param latency: seconds to wait before answering each request
+        :type latency: float
+        :param rate_limit: allow this many requests per this many seconds before answering with 429. None disables it.
+        :type rate_limit: tuple[int, float]|None
+        :param host: the address to listen on
+        :type host: str
+        :param port: the port to listen on. 0 lets the operating system pick a free one.
+        :type port: int
+        """
+        self.account_id = account_id
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.stats = defaultdict(int)
+        self.uploaded_bytes = 0
+        self.construction_polls = 1
+        """How many status checks a new project construction answers "pending" to before it completes."""
+
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1000000)
+        self._clock = datetime(2020, 1, 1)
+        self._records = {}
+        self._children = defaultdict(list)
+        self._projects = []
+        self._templates = []
+        self._constructions = {}
+        self._people = []
+        self._attachments = {}
+        self._recent_requests = deque()
+        self._failures = deque()
+
+        self._server = _FakeHTTPServer((host, port), self)
+        self._thread = None
+        self.me = self.create_person("Fake User", "fake.user@example.com")
+
+    @property
+    def url(self):
+        """
+        :return: the root URL of this server. Pass this as `oauth_url` to Basecamp3.
+        :rtype: str
+        """
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    @property
+    def api_url(self):
+        """
+        :return: the API root URL. Pass this as `api_url` to Basecamp3.
+        :rtype: str
+        """
+        return self.url + "/"
+
+    @property
+    def base_url(self):
+        return "%s/%s" % (self.url, self.account_id)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-basecamp")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def client(self, **kwargs):
+        """
+        :param kwargs: any other keyword arguments to pass to Basecamp3
+        :return: a real Basecamp3 client pointed at this server
+        :rtype: basecampy3.Basecamp3
+        """
+        from basecampy3 import Basecamp3
+        return Basecamp3(access_token="fake-access-token", account_id=self.account_id, api_url=self.api_url,
+                         oauth_url=self.url, **kwargs)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+            self.uploaded_bytes = 0
+
+    def fail_next(self, count=1, status=503):
+        """
+        Answer the next `count` requests with `status` instead of handling them, like an overloaded server would.
+        """
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    @property
+    def request_count(self):
+        return self.stats["requests"]
+
+    # region Seeding
+    def seed(self, projects=0, todolists=0, todos=0, name="Project %d"):
+        """
+        Create `projects` Projects, each with `todolists` to-do lists of `todos` to-dos.
+
+        :return: the JSON of the new Projects, oldest first
+        :rtype: list[dict]
+        """
+        created = []
+        for p in range(projects):
+            project = self.create_project(name % (p + 1))
+            todoset_id = self.dock_id(project, "todoset")
+            for t in range(todolists):
+                todolist = self.create_child(todoset_id, "todolists", name="List %d" % (t + 1))
+                for n in range(todos):
+                    self.create_child(todolist["id"], "todos", content="To-do %d" % (n + 1))
+            created.append(project)
+        return created
+
+    def create_person(self, name, email_address):
+        with self._lock:
+            person_id = next(self._ids)
+            person = {
+                "id": person_id,
+                "attachable_sgid": "person-%d" % person_id,
+                "name": name,
+                "email_address": email_address,
+                "personable_type": "User",
+                "title": None,
+                "bio": None,
+                "created_at": self._now(),
+                "updated_at": self._now(),
+                "admin": True,
+                "owner": False,
+                "time_zone": "America/Chicago",
+                "avatar_url": "%s/people/%d/avatar" % (self.url, person_id),
+            }
+            self._records[person_id] = person
+            self._people.insert(0, person_id)
+            return person
+
+    def create_project(self, name, description=""):
+        with self._lock:
+            project_id = next(self._ids)
+            now = self._now()
+            project = {
+                "id": project_id,
+                "status": "active",
+                "created_at": now,
+                "updated_at": now,
+                "name": name,
+                "description": description,
+                "purpose": "topic",
+                "clients_enabled": False,
+                "bookmark_url": "%s/my/bookmarks/%d.json" % (self.base_url, project_id),
+                "url": "%s/projects/%d.json" % (self.base_url, project_id),
+                "app_url": "%s/projects/%d" % (self.base_url, project_id),
+                "dock": [],
+                "type": "Project",
+            }
+            self._records[project_id] = project
+            self._projects.insert(0, project_id)
+            for position, (dock_name, rectype, title) in enumerate(DOCK, 1):
+                tool = self._new_recording(project, rectype, parent=None, fields={"title": title})
+                project["dock"].append({
+                    "id": tool["id"],
+                    "title": title,
+                    "name": dock_name,
+                    "enabled": True,
+                    "position": position,
+                    "url": tool["url"],
+                    "app_url": tool["app_url"],
+                })
+            return project
+
+    def create_template(self, name, description=""):
+        with self._lock:
+            template_id = next(self._ids)
+            now = self._now()
+            template = {
+                "id": template_id,
+                "status": "active",
+                "created_at": now,
+                "updated_at": now,
+                "name": name,
+                "description": description,
+                "url": "%s/templates/%d.json" % (self.base_url, template_id),
+                "app_url": "%s/templates/%d" % (self.base_url, template_id),
+                "dock": [],
+                "type": "Template",
+            }
+            self._records[template_id] = template
+            self._templates.insert(0, template_id)
+            return template
+
+    def create_child(self, parent_id, collection, **fields):
+        """
+        :param parent_id: the ID of the recording to create a child of
+        :type parent_id: int
+        :param collection: which of the parent's collections to add to (i.e. "todos" for a Todolist)
+        :type collection: str
+        :return: the JSON of the new recording
+        :rtype: dict
+        """
+        with self._lock:
+            parent = self._records[parent_id]
+            if collection == "comments":
+                rectype = "Comment"
+            else:
+                rectype = KINDS[parent["type"]][1][collection]
+            project = self._records[parent["bucket"]["id"]]
+            child = self._new_recording(project, rectype, parent=parent, fields=fields)
+            self._children[(parent_id, collection)].insert(0, child["id"])
+            count_field = "%s_count" % collection
+            if count_field in parent:
+                parent[count_field] += 1
+            parent["updated_at"] = child["updated_at"]
+            return child
+
+    def replace_tool(self, project, dock_name):
+        """
+        Swap a tool in a Project's dock for a new, empty one, as if it had been turned off and on again. Requests for
+        the old tool are answered with "404 Not Found".
+
+        :return: the JSON of the new tool
+        :rtype: dict
+        """
+        with self._lock:
+            project = self._records[project["id"]]
+            tool = [t for t in project["dock"] if t["name"] == dock_name][0]
+            old = self._records.pop(tool["id"])
+            new = self._new_recording(project, old["type"], parent=None, fields={"title": old["title"]})
+            tool.update(id=new["id"], url=new["url"], app_url=new["app_url"])
+            project["updated_at"] = self._now()
+            return new
+
+    def dock_id(self, project, dock_name):
+        for tool in project["dock"]:
+            if tool["name"] == dock_name:
+                return tool["id"]
+        raise KeyError(dock_name)
+
+    def _new_recording(self, project, rectype, parent, fields):
+        record_id = next(self._ids)
+        now = self._now()
+        kind, collections = KINDS[rectype]
+        url = "%s/buckets/%d/%s/%d" % (self.base_url, project["id"], kind, record_id)
+        record = {
+            "id": record_id,
+            "status": "active",
+            "visible_to_clients": False,
+            "created_at": now,
+            "updated_at": now,
+            "title": "",
+            "inherits_status": True,
+            "type": rectype,
+            "url": url + ".json",
+            "app_url": url,
+            "bookmark_url": "%s/my/bookmarks/%d.json" % (self.base_url, record_id),
+            "comments_count": 0,
+            "comments_url": "%s/buckets/%d/recordings/%d/comments.json" % (self.base_url, project["id"], record_id),
+            "bucket": {"id": project["id"], "name": project["name"], "type": "Project"},
+            "creator": self._person_summary(self.me),
+        }
+        if parent is not None:
+            record["parent"] = {"id": parent["id"], "title": parent["title"], "type": parent["type"],
+                                "url": parent["url"], "app_url": parent["app_url"]}
+        for collection in collections:
+            record["%s_url" % collection] = "%s/%s.json" % (url, collection)
+            if rectype == "Vault":
+                record["%s_count" % collection] = 0
+        if rectype == "Todo":
+            record.update({"content": "", "description": "", "completed": False, "assignees": [],
+                           "completion_subscribers": [], "due_on": None, "starts_on": None,
+                           "completion_url": url + "/completion.json"})
+        elif rectype == "Todolist":
+            record.update({"name": "", "description": "", "completed": False, "completed_ratio": "0/0"})
+        elif rectype == "Upload":
+            attachment = self._attachments.get(fields.pop("attachable_sgid", None), {})
+            record.update({"filename": attachment.get("name", ""), "content_type": attachment.get("content_type"),
+                           "byte_size": attachment.get("byte_size", 0), "description": "",
+                           "download_url": url + "/download"})
+            record["title"] = record["filename"]
+        self._apply(record, fields)
+        self._records[record_id] = record
+        return record
+
+    def _apply(self, record, fields):
+        """
+        Update a recording with the fields of a create or update request.
+        """
+        for key, value in fields.items():
+            if key.endswith("_ids"):
+                continue
+            record[key] = value
+        title_field = TITLE_FIELDS.get(record["type"], "title")
+        if fields.get(title_field):
+            record["title"] = fields[title_field]
+        if record["type"] == "Project" and "name" in fields:
+            record["name"] = fields["name"]
+
+    def _now(self):
+        """
+        A timestamp strictly after the previous one, so `updated_at` ordering is never ambiguous.
+        """
+        with self._lock:
+            self._clock += timedelta(milliseconds=1)
+            return self._clock.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+    def _person_summary(self, person):
+        return {k: person[k] for k in ("id", "attachable_sgid", "name", "email_address", "avatar_url")}
+    # endregion
+
+    # region Request handling
+    def handle(self, method, path, query, headers, body):
+        """
+        Answer one request.
+
+        :return: (status code, response headers, JSON-serializable body or None)
+        :rtype: tuple[int, dict, object]
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[method] += 1
+            retry_after = self._rate_limited()
+            failure = self._failures.popleft() if self._failures else None
+        if retry_after is not None:
+            return 429, {"Retry-After": "%d" % retry_after}, None
+        if failure is not None:
+            return failure, {}, None
+        if self.latency:
+            time.sleep(self.latency)
+        if not headers.get("Authorization", "").startswith("Bearer "):
+            return 401, {}, {"error": "OAuth token is missing"}
+
+        if path == "/authorization.json":
+            return 200, {}, self._authorization()
+        prefix = "/%s/" % self.account_id
+        if not path.startswith(prefix):
+            return 404, {}, None
+        path = path[len(prefix):]
+        try:
+            payload = json.loads(body.decode("utf-8")) if body and headers.get("Content-Type", "").startswith(
+                "application/json") else {}
+        except ValueError:
+            return 400, {}, {"error": "Invalid JSON"}
+
+        with self._lock:
+            for pattern, verbs in _ROUTES:
+                match = pattern.match(path)
+                if match is None:
+                    continue
+                handler = verbs.get(method)
+                if handler is None:
+                    return 405, {}, None
+                try:
+                    return handler(self, *match.groups(), query=query, payload=payload, body=body, headers=headers)
+                except KeyError:
+                    return 404, {}, None
+        return 404, {}, None
+
+    def _rate_limited(self):
+        """
+        Record a request against the rate limit.
+
+        :return: seconds the client should wait before retrying, or None if the request is allowed
+        :rtype: int|None
+        """
+        if not self.rate_limit:
+            return None
+        limit, period = self.rate_limit
+        now = time.time()
+        recent = self._recent_requests
+        while recent and recent[0] <= now - period:
+            recent.popleft()
+        if len(recent) >= limit:
+            self.stats["throttled"] += 1
+            return max(1, int(recent[0] + period - now + 0.999))
+        recent.append(now)
+        return None
+
+    def _authorization(self):
+        expires_at = (datetime.utcnow() + timedelta(days=14)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        return {
+            "expires_at": expires_at,
+            "identity": {"id": self.me["id"], "first_name": "Fake", "last_name": "User",
+                         "email_address": self.me["email_address"]},
+            "accounts": [{"product": "bc3", "id": self.account_id, "name": "Fake Basecamp",
+                          "href": self.base_url, "app_href": self.base_url}],
+        }
+
+    def _paginate(self, items, query, base_path):
+        """
+        Return one geared page of `items` along with `Link` and `X-Total-Count` headers.
+        """
+        page = max(1, int(query.get("page", 1)))
+        sizes = self.PAGE_SIZES
+        start = sum(sizes[min(p, len(sizes) - 1)] for p in range(page - 1))
+        end = start + sizes[min(page - 1, len(sizes) - 1)]
+        headers = {"X-Total-Count": "%d" % len(items)}
+        if end < len(items):
+            next_query = dict(query, page=page + 1)
+            headers["Link"] = '<%s/%s?%s>; rel="next"' % (self.base_url, base_path, urlencode(sorted(next_query.items())))
+        return 200, headers, items[start:end]
+
+    @staticmethod
+    def _status_filter(query):
+        return query.get("status") or "active"
+
+    def _list_projects(self, query, **_):
+        status = self._status_filter(query)
+        items = [self._records[i] for i in self._projects if self._records[i]["status"] == status]
+        return self._paginate(items, query, "projects.json")
+
+    def _create_project(self, payload, **_):
+        if not payload.get("name"):
+            return 422, {}, {"error": "Name can't be blank"}
+        project = self.create_project(payload["name"], payload.get("description") or "")
+        return 201, {}, project
+
+    def _get_project(self, project_id, **_):
+        return 200, {}, self._records[int(project_id)]
+
+    def _update_project(self, project_id, payload, **_):
+        project = self._records[int(project_id)]
+        self._apply(project, payload)
+        project["updated_at"] = self._now()
+        return 200, {}, project
+
+    def _trash_project(self, project_id, **_):
+        self._records[int(project_id)]["status"] = "trashed"
+        return 204, {}, None
+
+    def _template(self, template_id):
+        if int(template_id) not in self._templates:
+            raise KeyError(template_id)
+        return self._records[int(template_id)]
+
+    def _list_templates(self, query, **_):
+        status = self._status_filter(query)
+        items = [self._records[i] for i in self._templates if self._records[i]["status"] == status]
+        return self._paginate(items, query, "templates.json")
+
+    def _create_template(self, payload, **_):
+        if not payload.get("name"):
+            return 422, {}, {"error": "Name can't be blank"}
+        return 201, {}, self.create_template(payload["name"], payload.get("description") or "")
+
+    def _get_template(self, template_id, **_):
+        return 200, {}, self._template(template_id)
+
+    def _update_template(self, template_id, payload, **_):
+        template = self._template(template_id)
+        self._apply(template, payload)
+        template["updated_at"] = self._now()
+        return 200, {}, template
+
+    def _trash_template(self, template_id, **_):
+        self._template(template_id)["status"] = "trashed"
+        return 204, {}, None
+
+    def _create_construction(self, template_id, payload, **_):
+        template = self._template(template_id)
+        project = payload.get("project") or {}
+        if not project.get("name"):
+            return 422, {}, {"error": "Name can't be blank"}
+        construction_id = next(self._ids)
+        construction = {
+            "id": construction_id,
+            "status": "pending",
+            "url": "%s/templates/%d/project_constructions/%d.json" % (self.base_url, template["id"], construction_id),
+        }
+        self._records[construction_id] = construction
+        self._constructions[construction_id] = [self.construction_polls, project["name"],
+                                                project.get("description") or ""]
+        return 201, {}, construction
+
+    def _get_construction(self, template_id, construction_id, **_):
+        self._template(template_id)
+        construction_id = int(construction_id)
+        construction = self._records[construction_id]
+        pending = self._constructions.get(construction_id)
+        if pending is not None:
+            if pending[0] > 0:
+                pending[0] -= 1
+            else:
+                del self._constructions[construction_id]
+                construction["status"] = "completed"
+                construction["project"] = self.create_project(pending[1], pending[2])
+        return 200, {}, construction
+
+    def _list_people(self, project_id=None, query=None, **_):
+        items = [self._records[i] for i in self._people]
+        path = "projects/%s/people.json" % project_id if project_id else "people.json"
+        return self._paginate(items, query, path)
+
+    def _get_person(self, person_id, **_):
+        return 200, {}, self._records[int(person_id)]
+
+    def _my_profile(self, **_):
+        return 200, {}, self.me
+
+    def _list_recordings(self, query, **_):
+        types = query.get("type")
+        if not types:
+            return 400, {}, {"error": "type is required"}
+        buckets = set(int(b) for b in query["bucket"].split(",")) if query.get("bucket") else None
+        status = self._status_filter(query)
+        items = [r for r in self._records.values()
+                 if r.get("type") == types and r.get("status") == status and "bucket" in r
+                 and (buckets is None or r["bucket"]["id"] in buckets)]
+        sort = query.get("sort") or "created_at"
+        items.sort(key=lambda r: (r[sort], r["id"]), reverse=query.get("direction", "desc") == "desc")
+        return self._paginate(items, query, "projects/recordings.json")
+
+    def _create_attachment(self, query, body, headers, **_):
+        sgid = "attachment-%d" % next(self._ids)
+        self._attachments[sgid] = {"name": query.get("name", ""), "content_type": headers.get("Content-Type"),
+                                   "byte_size": len(body)}
+        self.uploaded_bytes += len(body)
+        return 201, {}, {"attachable_sgid": sgid}
+
+    def _get_recording(self, project_id, record_id, **_):
+        record = self._records[int(record_id)]
+        if record.get("bucket", {}).get("id") != int(project_id):
+            raise KeyError(record_id)
+        return 200, {}, record
+
+    def _update_recording(self, project_id, record_id, payload, **_):
+        record = self._get_recording(project_id, record_id)[2]
+        self._apply(record, payload)
+        record["updated_at"] = self._now()
+        return 200, {}, record
+
+    def _delete_recording(self, project_id, record_id, **_):
+        self._get_recording(project_id, record_id)[2]["status"] = "trashed"
+        return 204, {}, None
+
+    def _set_status(self, project_id, record_id, status, **_):
+        record = self._get_recording(project_id, record_id)[2]
+        record["status"] = status
+        record["updated_at"] = self._now()
+        return 204, {}, None
+
+    def _complete(self, project_id, record_id, **_):
+        record = self._get_recording(project_id, record_id)[2]
+        record["completed"] = True
+        record["updated_at"] = self._now()
+        return 204, {}, None
+
+    def _uncomplete(self, project_id, record_id, **_):
+        record = self._get_recording(project_id, record_id)[2]
+        record["completed"] = False
+        record["updated_at"] = self._now()
+        return 204, {}, None
+
+    def _list_children(self, project_id, record_id, collection, query, **_):
+        self._get_recording(project_id, record_id)
+        status = self._status_filter(query)
+        items = [self._records[i] for i in self._children[(int(record_id), collection)]]
+        items = [r for r in items if r["status"] == status]
+        if "completed" in query:
+            completed = query["completed"] == "true"
+            items = [r for r in items if r.get("completed", False) == completed]
+        elif collection == "todos":
+            items = [r for r in items if not r.get("completed")]
+        path = urlparse(self._records[int(record_id)]["url"]).path
+        path = "%s/%s.json" % (path[len("/%s/" % self.account_id):-len(".json")], collection)
+        return self._paginate(items, query, path)
+
+    def _list_comments(self, project_id, record_id, query, **_):
+        return self._list_children(project_id, record_id, "comments", query)
+
+    def _create_child(self, project_id, record_id, collection, payload, **_):
+        self._get_recording(project_id, record_id)
+        return 201, {}, self.create_child(int(record_id), collection, **payload)
+
+    def _create_comment(self, project_id, record_id, payload, **_):
+        return self._create_child(project_id, record_id, "comments", payload)
+    # endregion
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+_ROUTES = [(re.compile(pattern + r"$"), verbs) for pattern, verbs in (
+    (r"projects\.json", {"GET": FakeBasecamp._list_projects, "POST": FakeBasecamp._create_project}),
+    (r"projects/recordings\.json", {"GET": FakeBasecamp._list_recordings}),
+    (r"projects/(\d+)\.json", {"GET": FakeBasecamp._get_project, "PUT": FakeBasecamp._update_project,
+                               "DELETE": FakeBasecamp._trash_project}),
+    (r"projects/(\d+)/people\.json", {"GET": FakeBasecamp._list_people}),
+    (r"templates\.json", {"GET": FakeBasecamp._list_templates, "POST": FakeBasecamp._create_template}),
+    (r"templates/(\d+)\.json", {"GET": FakeBasecamp._get_template, "PUT": FakeBasecamp._update_template,
+                                "DELETE": FakeBasecamp._trash_template}),
+    (r"templates/(\d+)/project_constructions\.json", {"POST": FakeBasecamp._create_construction}),
+    (r"templates/(\d+)/project_constructions/(\d+)\.json", {"GET": FakeBasecamp._get_construction}),
+    (r"people\.json", {"GET": FakeBasecamp._list_people}),
+    (r"people/(\d+)\.json", {"GET": FakeBasecamp._get_person}),
+    (r"my/profile\.json", {"GET": FakeBasecamp._my_profile}),
+    (r"attachments\.json", {"POST": FakeBasecamp._create_attachment}),
+    (r"buckets/(\d+)/recordings/(\d+)/status/(active|archived|trashed)\.json", {"PUT": FakeBasecamp._set_status}),
+    (r"buckets/(\d+)/recordings/(\d+)/comments\.json", {"GET": FakeBasecamp._list_comments,
+                                                        "POST": FakeBasecamp._create_comment}),
+    (r"buckets/(\d+)/todos/(\d+)/completion\.json", {"POST": FakeBasecamp._complete,
+                                                     "DELETE": FakeBasecamp._uncomplete}),
+    (r"buckets/(\d+)/(?:[a-z_]+/\d+/)?[a-z_]+/(\d+)\.json", {"GET": FakeBasecamp._get_recording,
+                                                            "PUT": FakeBasecamp._update_recording,
+                                                            "DELETE": FakeBasecamp._delete_recording}),
+    (r"buckets/(\d+)/[a-z_]+/(\d+)/([a-z_]+)\.json", {"GET": FakeBasecamp._list_children,
+                                                     "POST": FakeBasecamp._create_child}),
+)]
+
+
+class _FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True  # otherwise small responses sit behind delayed ACKs for ~40ms
+
+    def _handle(self):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        query = dict(parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        code, headers, data = fake.handle(self.command, url.path, query, self.headers, body)
+
+        content = b""
+        if data is not None:
+            content = json.dumps(data, sort_keys=True).encode("utf-8")
+            etag = 'W/"%s"' % hashlib.md5(content).hexdigest()
+            headers["ETag"] = etag
+            headers["Cache-Control"] = "max-age=0, private, must-revalidate"
+            headers["Content-Type"] = "application/json; charset=utf-8"
+            if self.command == "GET" and code == 200 and self.headers.get("If-None-Match") == etag:
+                code, content = 304, b""
+                headers.pop("Content-Type")
+        with fake._lock:
+            fake.stats[code] += 1
+
+        self.send_response(code)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "%d" % len(content))
+        self.end_headers()
+        if content:
+            self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _FakeHTTPServer(ThreadingMixIn, HTTPServer, object):
+    daemon_threads = True
+
+    def __init__(self, server_address, fake):
+        self.fake = fake
+        super(_FakeHTTPServer, self).__init__(server_address, _FakeRequestHandler)
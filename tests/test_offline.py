@@ -0,0 +1,653 @@
+"""
+Tests that run the real client against the fake Basecamp server in `tests.fake_basecamp` instead of a live account.
+"""
+import gc
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from basecampy3.change_feed import ChangeFeed
+from basecampy3.endpoints.project_constructions import ConstructionPoller
+from basecampy3.export import ProjectExporter
+from basecampy3.freshness import FreshnessPolicy, allow_stale
+from basecampy3.json_decoding import stdlib_decoder
+from basecampy3.exc import Basecamp3Error, ProjectCreationTimedOutError
+from basecampy3.metrics import FanOutHook, HistogramCollector, RequestSample, StatsDExporter
+from basecampy3.pagination import parallel_pages
+from basecampy3.retry import NO_RETRIES, RetryPolicy, retry_policy
+from basecampy3.todo_store import TodoStore
+from basecampy3.tracing import InMemoryTracer
+from basecampy3.transport_adapter import Basecamp3TransportAdapter
+
+from .fake_basecamp import FakeBasecamp
+
+
+class FakeBasecampTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # the fake server is local, so don't let the client's rate limiter make later tests wait on earlier ones
+        cls._semaphore = Basecamp3TransportAdapter.SEMAPHORE
+        Basecamp3TransportAdapter.SEMAPHORE = threading.BoundedSemaphore(1024)
+
+    @classmethod
+    def tearDownClass(cls):
+        Basecamp3TransportAdapter.SEMAPHORE = cls._semaphore
+
+    def setUp(self):
+        self.fake = FakeBasecamp(rate_limit=None).start()
+        self.api = self.fake.client()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def test_endpoints_use_api_url(self):
+        assert self.api.projects.url == self.fake.base_url
+
+    def test_geared_pagination(self):
+        self.fake.seed(projects=200)
+        self.fake.reset_stats()
+        projects = list(self.api.projects.list())
+        assert len(projects) == 200
+        assert len(set(p.id for p in projects)) == 200
+        assert self.fake.request_count == 5  # 15 + 30 + 50 + 100 + 5
+
+    def test_parallel_pages(self):
+        self.fake.seed(projects=400)
+        expected = [p.id for p in self.api.projects.list()]
+        for ordered in (True, False):
+            api = self.fake.client()
+            self.fake.reset_stats()
+            with parallel_pages(max_workers=3, ordered=ordered):
+                projects = api.projects.list()
+            found = [p.id for p in projects]
+            assert found == expected if ordered else sorted(found) == sorted(expected)
+            assert self.fake.request_count == 7  # 15 + 30 + 50 + 100 * 3 + 5
+
+    def test_parallel_pages_keep_callers_settings(self):
+        self.fake.seed(projects=200)
+        decoded = []
+
+        def decoder(content):
+            decoded.append(content)
+            return stdlib_decoder(content)
+        api = self.fake.client(json_decoder=decoder, retry=RetryPolicy(max_attempts=3, backoff=0.01))
+        list(api.projects.list())
+        self.fake.reset_stats()
+        decoded[:] = []
+        with parallel_pages(max_workers=2), allow_stale(max_age=60):
+            projects = api.projects.list()
+            assert projects.count() == 200
+            assert len(list(projects)) == 200
+        assert self.fake.request_count == 0  # every page was fresh enough, not just the first
+        assert len(decoded) == 5  # the first page was only parsed once
+
+        with parallel_pages(max_workers=2), retry_policy(NO_RETRIES):
+            projects = api.projects.list()
+            next(projects)
+            self.fake.fail_next(1, status=503)
+            self.assertRaises(Basecamp3Error, list, projects)
+
+    def test_list_count_first_exists(self):
+        self.fake.seed(projects=200)
+        self.fake.reset_stats()
+        projects = self.api.projects.list()
+        assert projects.count() == 200
+        assert projects.exists()
+        newest = projects.first()
+        assert self.fake.request_count == 1
+        assert next(projects).id == newest.id  # iterating uses the first page that was already fetched
+        assert sum(1 for _ in projects) == 199
+        assert self.fake.request_count == 5
+        assert not self.api.projects.list(status="trashed").exists()
+        assert self.api.projects.list(status="trashed").first() is None
+
+    def test_resume_list(self):
+        self.fake.seed(projects=200)
+        expected = [p.id for p in self.api.projects.list()]
+
+        def take_and_resume(projects):
+            found = [next(projects).id for _ in range(60)]  # part way through the third page
+            saved = projects.cursor.to_json()
+            api = self.fake.client()  # as if in a new process
+            return found + [p.id for p in api.resume_list(saved)]
+
+        assert take_and_resume(self.api.projects.list()) == expected
+        with parallel_pages(max_workers=2):
+            projects = self.api.projects.list()
+        assert take_and_resume(projects) == expected
+
+    def test_identity_map(self):
+        seeded = self.fake.seed(projects=20)
+        api = self.fake.client(identity_map=True)
+        project = api.projects.get(seeded[0]["id"])
+        assert api.projects.get(project.id) is project
+        assert any(p is project for p in api.projects.list())
+
+        self.api.projects.update(project.id, name="Renamed")  # by another client
+        same = api.projects.get(project.id)
+        assert same is project and project.name == "Renamed"
+        project.refresh()
+        assert project.name == "Renamed"
+
+        del project, same
+        gc.collect()
+        assert len(api.identity_map) == 0
+
+    def test_relations(self):
+        self.fake.seed(projects=20)
+        api = self.fake.client()
+        project = api.projects.list().first()
+        self.fake.reset_stats()
+        assert project.todoset is project.todoset
+        assert self.fake.request_count == 1
+        project.invalidate_relations("todoset")
+        project.todoset
+        assert self.fake.request_count == 2
+
+        api.relation_ttl = 0
+        project.todoset
+        assert self.fake.request_count == 3
+        list(api.projects.list().prefetch(("todoset",)))
+        assert self.fake.request_count == 5  # the two pages, but nothing prefetched that would be thrown away
+
+        api.relation_ttl = None
+        self.fake.reset_stats()
+        projects = list(api.projects.list().prefetch(("todoset", "people")))
+        assert len(projects) == 20
+        assert self.fake.request_count == 2 + 20 * 2  # two pages, then a TodoSet and a People list per Project
+        for p in projects:
+            assert p.todoset.id == self.fake.dock_id(p._values, "todoset")
+            assert isinstance(p.people, list)
+        assert self.fake.request_count == 2 + 20 * 2
+        with self.assertRaises(ValueError):
+            api.projects.list().prefetch(("name",))
+
+    def test_dock_index(self):
+        seeded = self.fake.seed(projects=3, todolists=2)
+        api = self.fake.client()
+        self.fake.reset_stats()
+        assert len(list(api.todolists.list(project=seeded[0]["id"]))) == 2
+        assert self.fake.request_count == 2  # the unknown Project, then its TodoLists
+
+        list(api.projects.list())
+        self.fake.reset_stats()
+        for project in seeded:
+            assert len(list(api.todolists.list(project=project["id"]))) == 2
+        assert self.fake.request_count == 3  # no Project GETs
+        with self.assertRaises(AttributeError):
+            api.dock_index.section(seeded[1]["id"], "no_such_tool")
+
+        api.dock_index.ttl = 0
+        self.fake.reset_stats()
+        list(api.todolists.list(project=seeded[0]["id"]))
+        assert self.fake.request_count == 2  # an expired entry is revalidated first
+        assert self.fake.stats[304] == 2  # but nothing changed
+        api.dock_index.ttl = None
+
+        replaced = self.fake.replace_tool(seeded[1], "todoset")
+        with self.assertRaises(Basecamp3Error):
+            list(api.todolists.list(project=seeded[1]["id"]))  # the To-dos the index knew of is gone
+        self.fake.reset_stats()
+        assert api.todosets.get(seeded[1]["id"]).id == replaced["id"]
+        assert self.fake.request_count == 2  # the 404 made the index fetch the Project again
+
+        api.projects.trash(seeded[2]["id"])
+        assert seeded[2]["id"] not in api.dock_index
+
+    def test_json_decoder(self):
+        self.fake.seed(projects=20)
+        decoded = []
+
+        def decoder(content):
+            assert isinstance(content, bytes)
+            decoded.append(content)
+            return stdlib_decoder(content)
+        api = self.fake.client(json_decoder=decoder)
+        decoded[:] = []
+        project = api.projects.create(u"Caf\u00e9")
+        assert project.name == u"Caf\u00e9"
+        assert len(list(api.projects.list())) == 21
+        assert len(decoded) == 3  # the create and two pages
+
+    def test_stream_pages(self):
+        self.fake.seed(projects=200)
+        expected = [p.name for p in self.api.projects.list()]
+        api = self.fake.client(stream_pages=True)
+        self.fake.reset_stats()
+        assert [p.name for p in api.projects.list()] == expected
+        assert [p.name for p in api.projects.list()] == expected
+        assert self.fake.stats[200] == 9  # only the first page isn't streamed, so only it is cached
+        projects = api.projects.list()
+        assert next(projects).name == expected[0]
+        projects.close()  # stopping part way through a page releases its connection
+
+    def test_not_modified_is_served_from_cache(self):
+        self.fake.seed(projects=20)
+        first = [p.id for p in self.api.projects.list()]
+        self.fake.reset_stats()
+        second = [p.id for p in self.api.projects.list()]
+        assert first == second
+        assert self.fake.stats[304] == 2
+
+    def test_rate_limit(self):
+        self.fake.rate_limit = (3, 60)
+        with retry_policy(NO_RETRIES):
+            codes = [self.api.session.get(self.fake.base_url + "/projects.json").status_code for _ in range(4)]
+        assert codes[-1] == 429
+
+    def test_retries(self):
+        project_id = self.fake.seed(projects=1)[0]["id"]
+        collector = HistogramCollector()
+        api = self.fake.client(metrics=collector, retry=RetryPolicy(max_attempts=3, backoff=0.01))
+        self.fake.fail_next(2, status=503)
+        assert api.projects.get(project_id).id == project_id
+        assert collector.summary()["retries"] == 2
+
+        self.fake.fail_next(3, status=502)
+        self.assertRaises(Basecamp3Error, api.projects.get, project_id)  # gave up after 3 attempts
+
+        self.fake.reset_stats()
+        self.fake.fail_next(1, status=503)
+        self.assertRaises(Basecamp3Error, api.projects.create, "Not retried")  # POSTs aren't, by default
+        assert self.fake.stats["POST"] == 1
+        with retry_policy(RetryPolicy(backoff=0.01, retry_posts=True)):
+            self.fake.fail_next(1, status=503)
+            assert api.projects.create("Retried").name == "Retried"
+
+    def test_metrics(self):
+        self.fake.seed(projects=20)
+        collector = HistogramCollector()
+        api = self.fake.client(metrics=collector)
+        list(api.projects.list())
+        list(api.projects.list())
+        summary = collector.summary()
+        assert summary["endpoints"]["GET /projects.json"]["count"] == 4
+        assert summary["cache_hits"] == 2
+        assert summary["bytes_received"] > 0
+        assert "basecampy3_cache_hits_total 2" in collector.to_prometheus()
+
+        collector = HistogramCollector(buckets=(0.1, 1.0))
+        for duration in (0.05, 0.2, 2.0):
+            collector.record_request(RequestSample("GET", "/projects.json", 200, duration))
+        lines = collector.to_prometheus().splitlines()
+        labels = 'method="GET",endpoint="/projects.json"'
+        start = lines.index('basecampy3_request_duration_seconds_bucket{%s,le="0.1"} 1' % labels)
+        assert lines[start:start + 5] == [
+            'basecampy3_request_duration_seconds_bucket{%s,le="0.1"} 1' % labels,
+            'basecampy3_request_duration_seconds_bucket{%s,le="1"} 2' % labels,
+            'basecampy3_request_duration_seconds_bucket{%s,le="+Inf"} 3' % labels,
+            'basecampy3_request_duration_seconds_sum{%s} 2.250000' % labels,
+            'basecampy3_request_duration_seconds_count{%s} 3' % labels,
+        ]
+
+    def test_statsd_exporter(self):
+        self.fake.seed(projects=20)
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(receiver.close)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(2)
+        exporter = StatsDExporter(*receiver.getsockname()[:2], prefix="bc3")
+        self.addCleanup(exporter.close)
+        collector = HistogramCollector()
+        api = self.fake.client(metrics=FanOutHook(collector, exporter))
+        list(api.projects.list())
+        list(api.projects.list())
+
+        packets = []
+        while len(packets) < collector.summary()["endpoints"]["GET /projects.json"]["count"]:
+            packet = receiver.recv(65536).decode("utf-8").splitlines()
+            if any(line.startswith("bc3.request.get.projects:") for line in packet):
+                packets.append(packet)
+        assert len(packets) == 4
+        first, last = packets[0], packets[-1]
+        assert first[0].startswith("bc3.request.get.projects:") and first[0].endswith("|ms")
+        assert "bc3.status.200:1|c" in first and "bc3.cache.miss:1|c" in first
+        assert "bc3.status.304:1|c" in last and "bc3.cache.hit:1|c" in last  # served from the cache
+        assert all(line.startswith("bc3.") and line.count("|") == 1 for packet in packets for line in packet)
+
+    def test_tracing(self):
+        self.fake.seed(projects=20)
+        tracer = InMemoryTracer()
+        api = self.fake.client(tracer=tracer)
+        api.projects.find("Project 3")
+        find, = [s for s in tracer.spans if s.name == "Projects.find"]
+        listing, = tracer.children(find)
+        assert listing.name == "Projects.list"
+        pages = tracer.children(listing)
+        assert [p.attributes["page"] for p in pages] == [1, 2]
+        assert pages[0].attributes["basecamp.cache"] == "miss"
+
+    def test_identical_gets_are_coalesced(self):
+        project_id = self.fake.seed(projects=1)[0]["id"]
+        self.fake.latency = 0.2
+        self.fake.reset_stats()
+        names = []
+        threads = [threading.Thread(target=lambda: names.append(self.api.projects.get(project_id).name))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert names == ["Project 1"] * 10
+        assert self.fake.request_count == 1
+
+    def test_stale_while_revalidate(self):
+        project_id = self.fake.seed(projects=1)[0]["id"]
+        api = self.fake.client(freshness={"/projects/*": FreshnessPolicy(max_age=0.2)},
+                               retry=RetryPolicy(max_attempts=3, backoff=0.01))
+        api.projects.get(project_id)
+        self.fake.reset_stats()
+        api.projects.get(project_id)
+        assert self.fake.request_count == 0  # fresh enough
+
+        self.fake._records[project_id]["name"] = "Renamed"
+        time.sleep(0.25)
+        assert api.projects.get(project_id).name == "Project 1"  # stale copy, revalidated in the background
+        for _ in range(50):
+            if self.fake.request_count:
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert api.projects.get(project_id).name == "Renamed"
+
+        time.sleep(0.25)
+        self.fake.reset_stats()
+        self.fake.fail_next(1, status=503)
+        with retry_policy(NO_RETRIES):
+            api.projects.get(project_id)
+        time.sleep(0.2)
+        assert self.fake.request_count == 1  # the background revalidation kept the caller's retry policy
+
+    def test_writes_invalidate_related_responses(self):
+        project = self.fake.seed(projects=1, todolists=1, todos=3)[0]
+        api = self.fake.client(freshness=FreshnessPolicy(max_age=60))
+        todolist = list(api.todolists.list(project=api.projects.get(project["id"])))[0]
+        assert len(list(todolist.list())) == 3
+
+        todolist.create("Another one")
+        todos = list(todolist.list())
+        assert len(todos) == 4  # the cached list was revalidated, not served as-is
+
+        self.fake.reset_stats()
+        assert len(list(todolist.list())) == 4
+        assert self.fake.request_count == 0  # and is fresh again
+
+        todos[0].check()
+        assert len(list(todolist.list())) == 3
+
+    def test_export_resumes(self):
+        project = self.fake.seed(projects=1, todolists=2, todos=20)[0]
+        todo = self.fake.create_child(self.fake.dock_id(project, "todoset"), "todolists", name="Done")
+        todo = self.fake.create_child(todo["id"], "todos", content="Finished", completed=True)
+        self.fake.create_child(todo["id"], "comments", content="Nice work")
+        todo["comments_count"] = 1
+        expected = set(i for i, r in self.fake._records.items() if r.get("bucket", {}).get("id") == project["id"])
+        expected.add(project["id"])
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = os.path.join(folder, "export.jsonl")
+        project = self.api.projects.get(project["id"])
+        exporter = ProjectExporter(project, path, max_workers=2)
+        fetch = exporter._fetch
+        calls = []
+
+        def interrupted(url):
+            calls.append(url)
+            if len(calls) == 6:
+                raise KeyboardInterrupt()
+            return fetch(url)
+        exporter._fetch = interrupted
+        self.assertRaises(KeyboardInterrupt, exporter.run)
+
+        project.export(path, max_workers=2)
+        with open(path) as f:
+            ids = [json.loads(line)["id"] for line in f]
+        assert len(ids) == len(set(ids))  # nothing written twice
+        assert set(ids) == expected
+        assert not os.path.exists(path + ProjectExporter.JOURNAL_SUFFIX)
+
+        calls[:] = []
+        self.assertRaises(KeyboardInterrupt, exporter.run)
+        os.remove(path)  # the journal is left without what it describes
+        project.export(path, max_workers=2)
+        with open(path) as f:
+            assert sorted(json.loads(line)["id"] for line in f) == sorted(expected)
+
+    def test_iter_all_todos(self):
+        project = self.fake.seed(projects=1, todolists=3, todos=20)[0]
+        todolist = self.fake.create_child(self.fake.dock_id(project, "todoset"), "todolists", name="Grouped")
+        group = self.fake.create_child(todolist["id"], "groups", name="Group")
+        for n in range(5):
+            self.fake.create_child(group["id"], "todos", content="Grouped %d" % n)
+        self.fake.create_child(todolist["id"], "todos", content="Finished", completed=True)
+
+        project = self.api.projects.get(project["id"])
+        todos = list(project.iter_all_todos())
+        assert len(todos) == 65
+        assert len(set(t.id for t in todos)) == 65
+        grouped = [t for t in todos if t.todolist_group is not None]
+        assert len(grouped) == 5
+        assert all(t.todolist.id == todolist["id"] and t.todolist_group.id == group["id"] for t in grouped)
+        assert len(list(project.todoset.iter_all_todos(completed=None, max_workers=1))) == 66
+
+    def test_vault_walker(self):
+        project = self.fake.seed(projects=1)[0]
+        root_id = self.fake.dock_id(project, "vault")
+        self.fake.create_child(root_id, "documents", title="Top")
+        outer = self.fake.create_child(root_id, "vaults", title="Outer")
+        inner = self.fake.create_child(outer["id"], "vaults", title="Inner")
+        for n in range(3):
+            self.fake.create_child(outer["id"], "documents", title="Outer %d" % n)
+            self.fake.create_child(inner["id"], "documents", title="Inner %d" % n)
+        for n in range(4):
+            self.fake.create_child(root_id, "vaults", title="Empty %d" % n)
+
+        in_flight, most = [0], [0]
+        lock = threading.Lock()
+        handle = self.fake.handle
+
+        def counting(*args, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                most[0] = max(most[0], in_flight[0])
+            try:
+                return handle(*args, **kwargs)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+        self.fake.handle = counting
+        self.fake.latency = 0.02
+
+        walker = self.api.vaults.walk(project["id"], max_workers=2)
+        paths = sorted((path, item.title) for path, item in walker)
+        assert paths == sorted([("Docs & Files", "Top")] +
+                               [("Docs & Files/Outer", "Outer %d" % n) for n in range(3)] +
+                               [("Docs & Files/Outer/Inner", "Inner %d" % n) for n in range(3)])
+        assert most[0] == 2
+        assert len(walker.state) == 7
+
+        # a change two levels down does not touch the Vaults above it, but is still found
+        self.fake.create_child(inner["id"], "documents", title="Inner new")
+        self.fake.reset_stats()
+        walker = self.api.vaults.walk(project["id"], previous_state=walker.state)
+        paths = sorted((path, item.title) for path, item in walker)
+        assert paths == sorted([("Docs & Files/Outer/Inner", "Inner %d" % n) for n in range(3)] +
+                               [("Docs & Files/Outer/Inner", "Inner new")])
+        # only Outer's vault listing (where Inner's updated_at shows) and Inner's documents are sent in full
+        assert self.fake.stats[200] == 2
+        assert self.fake.stats[304] == 2
+
+    def test_create_projects(self):
+        template = self.fake.create_template("Template")
+        api = self.fake.client(identity_map=True)
+        constructions = api.project_constructions
+        constructions.poller = ConstructionPoller(initial_delay=0.01, max_delay=0.05)
+        self.fake.construction_polls = 2
+
+        pending = constructions.create_projects(template["id"], ["Client A", ("Client B", "Second")])
+        created = [f.result(5) for f in pending]
+        assert [(p.name, p.description) for p in created] == [("Client A", ""), ("Client B", "Second")]
+        assert api.projects.get(created[0].id) is created[0]  # wrapped through the Projects endpoint
+        assert all(p.id in api.dock_index for p in created)
+
+        refused = constructions.create_projects(template["id"], [""])[0]
+        assert isinstance(refused.exception(5), Basecamp3Error)  # the construction request itself failed
+
+        self.fake.construction_polls = 1000
+        slow = constructions.create_projects(template["id"], ["Client C"], timeout=0.1)[0]
+        assert isinstance(slow.exception(5), ProjectCreationTimedOutError)
+
+        construction = constructions.create_project(template["id"], "Client D")
+        self.fake.fail_next(1, status=404)
+        assert isinstance(constructions.wait(construction).exception(5), Basecamp3Error)  # a status check failed
+
+        construction = constructions.create_project(template["id"], "Client E")
+        unwanted = constructions.wait(construction)
+        assert unwanted.cancel()
+        self.fake.reset_stats()
+        time.sleep(0.1)
+        assert self.fake.request_count == 0  # no longer polled
+
+        self.fake.construction_polls = 0
+        record = api.dock_index.record
+        api.dock_index.record = None  # wrapping the finished Project fails
+        broken = constructions.wait(constructions.create_project(template["id"], "Client F"))
+        assert isinstance(broken.exception(5), TypeError)
+        api.dock_index.record = record
+        assert constructions.wait(constructions.create_project(template["id"], "Client G")).result(5).name == "Client G"
+
+    def test_construction_poller_backoff(self):
+        template = self.fake.create_template("Template")
+        poller = ConstructionPoller(initial_delay=0.05, max_delay=0.4, backoff=4.0)
+        self.fake.construction_polls = 3
+        slow_construction = self.api.project_constructions.create_project(template["id"], "Slow")
+        self.fake.reset_stats()
+        slow = poller.watch(slow_construction)
+        for _ in range(200):
+            if self.fake.stats["GET"] == 2:
+                break
+            time.sleep(0.01)
+        assert self.fake.stats["GET"] == 2  # checked after 0.05s and 0.2s more; the next check is 0.4s away
+
+        self.fake.construction_polls = 0
+        fast = poller.watch(self.api.project_constructions.create_project(template["id"], "Fast"))
+        assert fast.result(2).name == "Fast"  # due sooner, so it is checked ahead of the backed off construction
+        assert not slow.done()
+        assert slow.result(3).name == "Slow"
+        assert self.fake.stats["GET"] == 5
+        assert not poller._pending
+
+    def test_change_feed(self):
+        self.fake.seed(projects=2, todolists=1, todos=30)
+        fail_second_page = []
+
+        def decoder(content):
+            if fail_second_page:
+                self.fake.fail_next(1, status=503)
+                del fail_second_page[:]
+            return stdlib_decoder(content)
+        api = self.fake.client(json_decoder=decoder, retry=NO_RETRIES)
+        feed = ChangeFeed(api, types=["Todo"], backfill=True)
+        fail_second_page.append(True)
+        self.assertRaises(Basecamp3Error, feed.poll, True)
+        assert feed.checkpoint == {}
+        assert len(feed.poll(force=True)) == 60  # the failed poll is repeated in full
+
+        self.fake.reset_stats()
+        assert feed.poll(force=True) == []
+        assert self.fake.request_count == 1  # the first page's ETag hadn't changed, so no other pages were read
+
+        todo = [r for r in self.fake._records.values() if r.get("type") == "Todo"][10]
+        todo.update(content="Changed", updated_at=self.fake._now())
+        changed, = feed.poll(force=True)
+        assert changed.id == todo["id"] and changed.content == "Changed"
+        assert feed.checkpoint["Todo/active"] == {"updated_at": todo["updated_at"], "ids": [todo["id"]]}
+        assert ChangeFeed(api, types=["Todo"], checkpoint=feed.checkpoint).poll(force=True) == []
+
+    def test_change_feed_streams_move_together(self):
+        project = self.fake.seed(projects=1, todolists=1, todos=5)[0]
+        board_id = self.fake.dock_id(project, "message_board")
+        self.fake.create_child(board_id, "messages", subject="Hello")
+        api = self.fake.client(retry=NO_RETRIES)
+        feed = ChangeFeed(api, types=["Todo", "Message"])
+        assert feed.poll(force=True) == []  # just records where each stream is
+        checkpoint = feed.checkpoint
+
+        todo = [r for r in self.fake._records.values() if r.get("type") == "Todo"][0]
+        todo.update(content="Changed", updated_at=self.fake._now())
+        self.fake.create_child(board_id, "messages", subject="Goodbye")
+        self.fake.reset_stats()
+        poll_stream = feed._poll_stream
+
+        def fail_messages(stream):
+            if stream["type"] == "Message":
+                self.fake.fail_next(1, status=503)
+            return poll_stream(stream)
+        feed._poll_stream = fail_messages
+        self.assertRaises(Basecamp3Error, feed.poll, True)
+        assert feed.checkpoint == checkpoint  # the To-do stream did not move past the change it read
+
+        del feed._poll_stream
+        changed = feed.poll(force=True)
+        assert sorted(type(c).__name__ for c in changed) == ["Message", "TodoItem"]
+        assert feed.poll(force=True) == []
+
+    def test_todo_store(self):
+        self.fake.seed(projects=3, todolists=1, todos=20)
+        todos = [r for r in self.fake._records.values() if r.get("type") == "Todo"]
+        me = {"id": self.fake.me["id"], "name": self.fake.me["name"]}
+        for todo in todos[:5]:
+            todo.update(assignees=[me], due_on="2001-01-01")
+        todos[0]["completed"] = True
+
+        store = TodoStore(self.api, refresh=FreshnessPolicy(max_age=60))
+        assert len(store.query(assignee=me["id"], overdue=True)) == 4
+        assert len(store) == 60
+        self.fake.reset_stats()
+        assert len(store.query(assignee=me["id"], completed=None)) == 5
+        assert self.fake.request_count == 0  # answered locally
+
+        todos[1].update(status="trashed", updated_at=self.fake._now())
+        assert store.sync() == 1
+        assert len(store.query(assignee=me["id"], overdue=True)) == 3
+
+    def test_todo_store_sync_fails_without_skipping(self):
+        self.fake.seed(projects=1, todolists=1, todos=5)
+        fail_after_page = []
+
+        def decoder(content):
+            if fail_after_page:
+                self.fake.fail_next(1, status=503)
+                del fail_after_page[:]
+            return stdlib_decoder(content)
+        store = TodoStore(self.fake.client(json_decoder=decoder, retry=NO_RETRIES))
+        assert store.sync() == 5
+
+        todo = [r for r in self.fake._records.values() if r.get("type") == "Todo"][0]
+        todo.update(content="Changed", updated_at=self.fake._now())
+        fail_after_page.append(True)  # the active to-dos are read, then the archived ones fail
+        self.assertRaises(Basecamp3Error, store.sync)
+        assert store.sync() == 1
+        assert [t.content for t in store.query() if t.id == todo["id"]] == ["Changed"]
+
+    def test_campfire_writer_coalesces(self):
+        project = self.api.projects.get(self.fake.seed(projects=1)[0]["id"])
+        campfire = project.campfire
+        self.fake.reset_stats()
+        with campfire.writer(max_lines=10) as writer:
+            posted = [writer.post("Alert %d" % n) for n in range(100)]
+        assert self.fake.stats[201] <= 11  # the first line on its own, then up to 10 per message
+        assert all(f.done() for f in posted)
+        lines = list(campfire.lines)
+        assert sum(line.content.count("Alert") for line in lines) == 100
+        self.assertRaises(ValueError, writer.post, "Too late")
+
+
+if __name__ == "__main__":
+    unittest.main()
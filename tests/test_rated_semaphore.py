@@ -0,0 +1,60 @@
+"""
+Tests for the rate limiters in `basecampy3.rated_semaphore`. No network access is needed.
+"""
+import threading
+import time
+import unittest
+
+from basecampy3.rated_semaphore import BULK, INTERACTIVE, NORMAL, PriorityRatedSemaphore, priority
+
+
+class PriorityRatedSemaphoreTest(unittest.TestCase):
+    def test_rate(self):
+        semaphore = PriorityRatedSemaphore(5, 0.5)
+        started = time.time()
+        for _ in range(10):
+            with semaphore:
+                pass
+        assert 0.45 < time.time() - started < 0.8  # a burst of 5, then one every 0.1 seconds
+
+    def test_non_blocking_and_timeout(self):
+        semaphore = PriorityRatedSemaphore(1, 10)
+        assert semaphore.acquire()
+        assert not semaphore.acquire(blocking=False)
+        assert not semaphore.acquire(timeout=0.05)
+        stats = semaphore.stats()[NORMAL]
+        assert stats["waiting"] == 0 and stats["acquired"] == 1
+
+    def test_interactive_goes_before_bulk(self):
+        semaphore = PriorityRatedSemaphore(10, 0.5)
+        order = []
+        lock = threading.Lock()
+
+        def worker(name):
+            with priority(name):
+                with semaphore:
+                    with lock:
+                        order.append(name)
+
+        for _ in range(10):
+            semaphore.acquire()  # use up the burst so everyone below has to wait
+        threads = [threading.Thread(target=worker, args=(BULK,)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+        threads.append(threading.Thread(target=worker, args=(INTERACTIVE,)))
+        threads[-1].start()
+        for thread in threads:
+            thread.join()
+        assert order.index(INTERACTIVE) <= 1  # at most one BULK request that was already due goes first
+        stats = semaphore.stats()
+        assert stats[BULK]["acquired"] == 5 and stats[INTERACTIVE]["acquired"] == 1
+        assert stats[BULK]["waiting"] == 0
+
+    def test_unknown_class(self):
+        with priority("urgent"):
+            self.assertRaises(ValueError, PriorityRatedSemaphore(1, 1).acquire)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for `basecampy3.webhook_server`. The receiver listens on a free local port, so no network access is needed.
+"""
+import threading
+import time
+import unittest
+
+import requests
+
+from basecampy3.webhook_server import WebhookReceiver
+
+
+class WebhookReceiverTest(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.receivers = []
+
+    def tearDown(self):
+        for receiver in self.receivers:
+            receiver.stop(timeout=2)
+
+    def receiver(self, handler=None, **kwargs):
+        kwargs.setdefault("batch_interval", 0.05)
+        receiver = WebhookReceiver(handler or self.batches.append, listen_addr="127.0.0.1", listen_port=0, **kwargs)
+        self.receivers.append(receiver)
+        return receiver
+
+    @staticmethod
+    def post(receiver, payload, path="/"):
+        url = "http://%s:%d%s" % (receiver.server_address[0], receiver.server_address[1], path)
+        if isinstance(payload, dict):
+            return requests.post(url, json=payload, timeout=5)
+        return requests.post(url, data=payload, timeout=5)
+
+    def handled_ids(self):
+        return [event.id for batch in self.batches for event in batch]
+
+    def test_path_and_repeated_deliveries(self):
+        receiver = self.receiver(path="/hooks/secret")
+        receiver.start()
+        assert self.post(receiver, {"id": 1, "kind": "todo_created"}).status_code == 404
+        assert self.post(receiver, {"id": 1, "kind": "todo_created"}, "/hooks/secret").status_code == 200
+        assert self.post(receiver, {"id": 1, "kind": "todo_created"}, "/hooks/secret").status_code == 200  # a retry
+        assert self.post(receiver, b"not json", "/hooks/secret").status_code == 400
+        assert self.post(receiver, {"id": 2, "kind": "todo_completed"}, "/hooks/secret").status_code == 200
+        receiver.stop(timeout=2)
+        assert self.handled_ids() == [1, 2]
+
+    def test_batches(self):
+        receiver = self.receiver(batch_size=10)
+        for n in range(25):
+            assert receiver.submit({"id": n, "kind": "todo_created"})
+        receiver.start()
+        receiver.stop(timeout=2)
+        assert [len(batch) for batch in self.batches] == [10, 10, 5]
+        assert self.handled_ids() == list(range(25))
+
+    def test_full_queue_is_refused(self):
+        entered, release = threading.Event(), threading.Event()
+
+        def slow(batch):
+            self.batches.append(batch)
+            entered.set()
+            release.wait(5)
+        receiver = self.receiver(slow, batch_size=1, max_queue=1, enqueue_timeout=0.05)
+        receiver.start()
+        assert self.post(receiver, {"id": 1}).status_code == 200
+        assert entered.wait(2)  # the handler is busy with it
+        assert self.post(receiver, {"id": 2}).status_code == 200  # fills the queue
+        refused = self.post(receiver, {"id": 3})
+        assert refused.status_code == 503
+        assert refused.headers["Retry-After"] == "1"
+        release.set()
+        for _ in range(50):  # Basecamp delivers it again later
+            if self.post(receiver, {"id": 3}).status_code == 200:
+                break
+            time.sleep(0.05)
+        receiver.stop(timeout=2)
+        assert self.handled_ids() == [1, 2, 3]
+
+    def test_stop_after_start(self):
+        receiver = self.receiver()
+        receiver.start()
+        assert self.post(receiver, {"id": 1}).status_code == 200
+        receiver.stop(timeout=2)
+        assert not [t for t in threading.enumerate() if t.name.startswith("bc3-webhook")]
+        assert self.handled_ids() == [1]
+
+    def test_stop_serve_forever_from_another_thread(self):
+        receiver = self.receiver()
+        thread = threading.Thread(target=receiver.serve_forever)
+        thread.start()
+        assert self.post(receiver, {"id": 1}).status_code == 200
+        receiver.stop(timeout=2)
+        thread.join(3)
+        assert not thread.is_alive()
+        assert self.handled_ids() == [1]
+
+
+if __name__ == "__main__":
+    unittest.main()